@@ -1,39 +1,110 @@
-from PyQt5.QtWidgets import QStackedWidget
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QLabel, QStackedWidget, QWidget
 
 from double_league_menu import DoubleLeagueMenu
+from instrumentation import Instrumentation
 from main_menu import MainMenu
 from league_database import LeagueDatabase
+from league_events import LeagueChange
 from player_data_view import PlayerDataView
 from single_league_menu import SingleLeagueMenu
+from utils import create_label
+from view_data_loader import ViewDataLoader
+
+View = TypeVar('View', bound=QWidget)
 
 
 class ApplicationWindow(QStackedWidget):
-    def __init__(self, database: LeagueDatabase):
+    # changes of the league may be published in other threads, the signal passes them to the GUI thread
+    league_changed = pyqtSignal(object)
+
+    def __init__(self, open_database: Callable[[], LeagueDatabase],
+                 instrumentation: Optional[Instrumentation] = None):
         super().__init__()
         self.setWindowTitle("RTSL (Rybnicka Table Soccer League)")
-        self._main_menu = MainMenu(self, database)
-        self.addWidget(self._main_menu)
-        self._single_league_menu = SingleLeagueMenu(self, database)
-        self.addWidget(self._single_league_menu)
-        self._double_league_menu = DoubleLeagueMenu(self, database)
-        self.addWidget(self._double_league_menu)
-        self._player_data_view = PlayerDataView(self, database)
-        self.addWidget(self._player_data_view)
-        self.switch_to_main_menu()
+        self._database: Optional[LeagueDatabase] = None
+        self._instrumentation = instrumentation
+        self._view_data_loader = ViewDataLoader()
+        # views are created when they are shown for the first time
+        self._views: Dict[type, QWidget] = {}
+        # data version of the database at which the data shown by a view was computed
+        self._view_data_versions: Dict[QWidget, int] = {}
+        self._opening_label = create_label("Opening the league...")
+        self.addWidget(self._opening_label)
         self.show()
+        # the league is loaded in the background, so the window appears at once regardless of its size
+        self._open_database(open_database)
+
+    def get_database(self) -> Optional[LeagueDatabase]:
+        return self._database
 
     def switch_to_single_league_menu(self) -> None:
-        self._single_league_menu.update()
-        self.setCurrentWidget(self._single_league_menu)
+        self._switch_to(self._get_view(SingleLeagueMenu))
 
     def switch_to_double_league_menu(self) -> None:
-        self._double_league_menu.update()
-        self.setCurrentWidget(self._double_league_menu)
+        self._switch_to(self._get_view(DoubleLeagueMenu))
 
     def switch_to_main_menu(self) -> None:
-        self._main_menu.update()
-        self.setCurrentWidget(self._main_menu)
+        self._switch_to(self._get_view(MainMenu))
 
     def switch_to_player_data_view(self, name: str) -> None:
-        self._player_data_view.update(name)
-        self.setCurrentWidget(self._player_data_view)
+        player_data_view = self._get_view(PlayerDataView)
+        if name != player_data_view.get_name() or not self._is_view_data_current(player_data_view):
+            player_data_view.update(name)
+        self.setCurrentWidget(player_data_view)
+
+    def load_view_data(self, view: QWidget, loading_label: QLabel, compute: Callable[[], Any],
+                       on_loaded: Callable[[Any], None]) -> None:
+        # data of the previously requested view is no longer needed once user navigates again
+        self._view_data_versions.pop(view, None)
+        data_version = self._database.get_data_version()
+
+        def show_data(data: Any) -> None:
+            on_loaded(data)
+            self._view_data_versions[view] = data_version
+
+        loading_label.show()
+        self._view_data_loader.load(compute, show_data, loading_label.hide)
+
+    def _open_database(self, open_database: Callable[[], LeagueDatabase]) -> None:
+        self._view_data_loader.load(open_database, self._on_database_opened, self._on_database_open_finished)
+
+    def _on_database_opened(self, database: LeagueDatabase) -> None:
+        self._database = database
+        self.league_changed.connect(self._on_league_changed)
+        database.subscribe(self.league_changed.emit)
+        self.switch_to_main_menu()
+
+    def _on_league_changed(self, change: LeagueChange) -> None:
+        for view in self._views.values():
+            # views showing the data from right before the change are patched, other views
+            # are loaded again when they are shown
+            was_data_current = self._view_data_versions.get(view) == change.data_version - 1
+            if view.apply_change(change) and was_data_current:
+                self._view_data_versions[view] = change.data_version
+            elif view is self.currentWidget():
+                view.update()
+
+    def _on_database_open_finished(self) -> None:
+        if self._database is None:
+            self._opening_label.setText("Couldn't open the league")
+
+    def _get_view(self, view_class: Type[View]) -> View:
+        if view_class not in self._views:
+            view = view_class(self, self._database)
+            if self._instrumentation is not None:
+                self._instrumentation.attach_views([view])
+            self.addWidget(view)
+            self._views[view_class] = view
+        return self._views[view_class]
+
+    def _is_view_data_current(self, view: QWidget) -> bool:
+        return self._view_data_versions.get(view) == self._database.get_data_version()
+
+    def _switch_to(self, view: QWidget) -> None:
+        # views keep their data between navigations, it's computed again only if the league has changed since
+        if not self._is_view_data_current(view):
+            view.update()
+        self.setCurrentWidget(view)
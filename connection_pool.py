@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Queue
+import sqlite3
+from typing import Iterator
+
+
+def connect_read_only(db_name: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"{Path(db_name).absolute().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+
+class ReadOnlyConnectionPool:
+    def __init__(self, db_name: str, size: int = 4):
+        self._connections: Queue = Queue()
+        for _ in range(size):
+            self._connections.put(connect_read_only(db_name))
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get().close()
@@ -4,5 +4,3 @@ from PyQt5.QtGui import QFont
 TITLE_FONT = QFont('Times New Roman', 18, QFont.Bold)
 SECTION_TITLE_FONT = QFont('Times New Roman', 14)
 NORMAL_TEXT_FONT = QFont('Times New Roman', 10)
-
-POSSIBLE_GOAL_BALANCES = [str(i) for i in range(11)]
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+import heapq
+from itertools import combinations, islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from league_database import calculate_diff, calculate_moved_points
+
+
+# the average goal factor of calculate_moved_points over all possible goal balances
+AVERAGE_GOAL_BALANCE = 5
+
+
+@dataclass
+class MatchupPredictions:
+    # one entry of every array per ordered pair of disjoint teams (team1, team2), teams are pairs of player indexes
+    players: List[str]
+    team1: np.ndarray
+    team2: np.ndarray
+    team1_win_points: np.ndarray
+    team2_win_points: np.ndarray
+    # makes the expected points moved by a match the same for both teams
+    team1_win_probability: np.ndarray
+    expected_moved_points: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.team1)
+
+    def get_teams(self, index: int) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+        return (tuple(self.players[player] for player in self.team1[index]),
+                tuple(self.players[player] for player in self.team2[index]))
+
+    def get_most_balanced(self, num: int) -> List[int]:
+        return np.argsort(np.abs(self.team1_win_probability - 0.5), kind='stable')[:num].tolist()
+
+
+def _get_disjoint_team_pairs(num_players: int) -> Tuple[np.ndarray, np.ndarray]:
+    # every team is paired with the teams of the other players, without a grid of all pairs of teams
+    teams = np.array(list(combinations(range(num_players), 2)), dtype=np.intp).reshape(-1, 2)
+    other_teams = np.array(list(combinations(range(num_players - 2), 2)), dtype=np.intp).reshape(-1, 2)
+    team1 = np.repeat(teams, len(other_teams), axis=0)
+    team2 = np.empty_like(team1)
+    for index, (player1, player2) in enumerate(teams):
+        other_players = np.delete(np.arange(num_players), [player1, player2])
+        team2[index * len(other_teams):(index + 1) * len(other_teams)] = other_players[other_teams]
+    return team1, team2
+
+
+def _iter_balanced_team_pairs(points: np.ndarray) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    # disjoint pairs of teams by ascending difference of their points, the weaker team first.
+    # Every team is merged with the stronger teams after it in the sorted sums of points through a heap,
+    # so only one candidate per team is kept at a time
+    teams = list(combinations(range(len(points)), 2))
+    team_points = [points[player1] + points[player2] for player1, player2 in teams]
+    order = sorted(range(len(teams)), key=team_points.__getitem__)
+    sums = [team_points[team] for team in order]
+    candidates = [(sums[index + 1] - sums[index], index, index + 1) for index in range(len(order) - 1)]
+    heapq.heapify(candidates)
+    while candidates:
+        _, index1, index2 = candidates[0]
+        if index2 + 1 < len(order):
+            heapq.heapreplace(candidates, (sums[index2 + 1] - sums[index1], index1, index2 + 1))
+        else:
+            heapq.heappop(candidates)
+        team1, team2 = teams[order[index1]], teams[order[index2]]
+        if team1[0] not in team2 and team1[1] not in team2:
+            yield team1, team2
+
+
+def predict_matchups(player_to_dl_points: Dict[str, float], goal_balance: int = AVERAGE_GOAL_BALANCE,
+                     num: Optional[int] = None) -> MatchupPredictions:
+    # scores all C(N, 2) * C(N - 2, 2) matchups of the players at once with the model of DL points.
+    # With num only the num most balanced games are scored, each once with the weaker team as team1,
+    # and memory stays O(N^2) instead of O(N^4)
+    players = list(player_to_dl_points)
+    points = np.array([player_to_dl_points[player] for player in players], dtype=np.float64)
+    if num is None:
+        team1, team2 = _get_disjoint_team_pairs(len(players))
+    else:
+        team_pairs = list(islice(_iter_balanced_team_pairs(points), num))
+        team1 = np.array([team1 for team1, _ in team_pairs], dtype=np.intp).reshape(-1, 2)
+        team2 = np.array([team2 for _, team2 in team_pairs], dtype=np.intp).reshape(-1, 2)
+    team1_points, team2_points = points[team1], points[team2]
+    team1_win_points = calculate_moved_points(
+        calculate_diff(team1_points[:, 0], team1_points[:, 1], team2_points[:, 0], team2_points[:, 1]), goal_balance)
+    team2_win_points = calculate_moved_points(
+        calculate_diff(team2_points[:, 0], team2_points[:, 1], team1_points[:, 0], team1_points[:, 1]), goal_balance)
+    team1_win_probability = team2_win_points / (team1_win_points + team2_win_points)
+    return MatchupPredictions(
+        players, team1, team2, team1_win_points, team2_win_points, team1_win_probability,
+        team1_win_probability * team1_win_points + (1 - team1_win_probability) * team2_win_points)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence, Union
+
+import numpy as np
+
+from match import DoubleLeagueMatch
+from match_store import DELETED, MatchStore
+
+
+@dataclass(frozen=True)
+class RatingConstants:
+    # constants of calculate_moved_points
+    diff_scale: float = 2720
+    diff_offset: float = 1.7
+    exponent: float = 7.25
+    goal_balance_scale: float = 10
+    goal_balance_offset: float = 0.5
+
+
+DEFAULT_RATING_CONSTANTS = RatingConstants()
+
+# distance of points * 100 from a tie below which they're rounded by Python, far above the error of the product
+_TIE_TOLERANCE = 1e-6
+
+
+def _round_points(points: np.ndarray) -> np.ndarray:
+    # round(points, 2) of every element, as LeagueDatabase.get_player_dl_points rounds them. np.round rounds
+    # the binary product points * 100, which differs from the exact rounding of Python for values close to a tie
+    scaled_points = points * 100
+    rounded_points = np.round(scaled_points) / 100
+    close_to_tie = np.abs(scaled_points - np.floor(scaled_points) - 0.5) < _TIE_TOLERANCE
+    if close_to_tie.any():
+        rounded_points[close_to_tie] = [round(float(value), 2) for value in points[close_to_tie]]
+    return rounded_points
+
+
+class DLMatchLog:
+    # matches encoded once as indexes of their players, so that any number of scenarios
+    # (starting points and rating constants) can be replayed over them at once
+    def __init__(self, players: Sequence[str], matches: Iterable[DoubleLeagueMatch]):
+        self.players = list(players)
+        self._player_to_index = {player: index for index, player in enumerate(self.players)}
+        player_indexes, goal_balances = [], []
+        for match in matches:
+            player_indexes.append([self._player_to_index[player] for player in (
+                match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2)])
+            goal_balances.append(match.goal_balance)
+        self.player_indexes = np.array(player_indexes, dtype=np.intp).reshape(-1, 4)
+        self.goal_balances = np.array(goal_balances, dtype=np.float64)
+
+    @classmethod
+    def from_match_store(cls, players: Sequence[str], match_store: MatchStore) -> 'DLMatchLog':
+        # maps the interned player indexes of the store to indexes of players without a loop over matches
+        match_log = cls(players, [])
+        store_to_log_index = np.array(
+            [match_log.player_index(player) for player in match_store.player_names], dtype=np.intp)
+        goal_balances = np.frombuffer(match_store.goal_balances, dtype=np.int8)
+        played = goal_balances != DELETED
+        player_indexes = np.frombuffer(match_store.player_indexes, dtype=np.intc).reshape(-1, 4)[played]
+        match_log.player_indexes = store_to_log_index[player_indexes]
+        match_log.goal_balances = goal_balances[played].astype(np.float64)
+        return match_log
+
+    def player_index(self, player: str) -> int:
+        return self._player_to_index[player]
+
+    def replay(self, starting_points: np.ndarray,
+               constants: Union[RatingConstants, Sequence[RatingConstants]] = DEFAULT_RATING_CONSTANTS) -> np.ndarray:
+        # starting_points has a row of points of all players for every scenario, returns unrounded final points
+        points = np.array(starting_points, dtype=np.float64, ndmin=2)
+        if points.shape[1] != len(self.players):
+            raise ValueError(f"expected points of {len(self.players)} players, got {points.shape[1]}")
+        if isinstance(constants, RatingConstants):
+            constants = [constants] * points.shape[0]
+        if len(constants) != points.shape[0]:
+            raise ValueError(f"expected rating constants of {points.shape[0]} scenarios, got {len(constants)}")
+        diff_scale, diff_offset, exponent, goal_balance_scale, goal_balance_offset = (
+            np.array([getattr(scenario_constants, field) for scenario_constants in constants], dtype=np.float64)
+            for field in ('diff_scale', 'diff_offset', 'exponent', 'goal_balance_scale', 'goal_balance_offset'))
+        for match_players, goal_balance in zip(self.player_indexes, self.goal_balances):
+            # the same steps as LeagueDatabase._update_dl_points_after_match, for all scenarios at once
+            winning_player1, winning_player2, loser_player1, loser_player2 = _round_points(points[:, match_players]).T
+            winning_player2_ratio = winning_player1 / (winning_player1 + winning_player2)
+            loser_player1_ratio = loser_player1 / (loser_player1 + loser_player2)
+            diff = loser_player1 + loser_player2 - winning_player1 - winning_player2
+            points_to_add = (np.power(diff / diff_scale + diff_offset, exponent)
+                             * (goal_balance / goal_balance_scale + goal_balance_offset))
+            points[:, match_players] = np.stack((
+                winning_player1 + (1 - winning_player2_ratio) * points_to_add,
+                winning_player2 + winning_player2_ratio * points_to_add,
+                loser_player1 - loser_player1_ratio * points_to_add,
+                loser_player2 - (1 - loser_player1_ratio) * points_to_add), axis=1)
+        return points
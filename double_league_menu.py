@@ -1,33 +1,145 @@
-from functools import partial
-from itertools import combinations
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from PyQt5.QtWidgets import QComboBox, QLineEdit, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QComboBox, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QPushButton
 
-from constants import POSSIBLE_GOAL_BALANCES, SECTION_TITLE_FONT, TITLE_FONT
+from constants import SECTION_TITLE_FONT, TITLE_FONT
 from error_window import ErrorWindow
-from league_menu import LeagueMenu
-from match import DoubleLeagueMatch
+from league_events import LeagueChange
+from league_menu import RECENT_MATCHES_NUM, LeagueMenu
+from match import POSSIBLE_GOAL_BALANCES, DoubleLeagueMatch
+from matchmaker import schedule_balanced_games
+from table_models import ColumnarTableModel, Columns, create_table_view, to_columns, update_sorted_rows
+from team_standings import Team, team
 from utils import create_label
 
 
+def _team_standing_key(values: Sequence[Any]) -> Tuple[float, Team]:
+    return (-values[2], (values[0], values[1]))
+
+
+@dataclass
+class DoubleLeagueData:
+    player_names: List[str]
+    players_statistics: Columns
+    ranked_players: List[str]
+    teams_statistics: Columns
+    ranked_teams: List[Team]
+    recent_matches: Columns
+    recent_match_ids: List[int]
+
+
 class DoubleLeagueMenu(LeagueMenu):
     def __init__(self, window, database):
         super().__init__(window, database)
         self._layout = QVBoxLayout()
         self._layout.addWidget(create_label("Double League", TITLE_FONT))
         self._add_return_button(self._window.switch_to_main_menu)
+        self._loading_label = self._add_loading_label()
         self._players_statistics = self._add_player_statistics_table()
         self._teams_statistics = self._add_teams_statistics_table()
+        self._add_matchmaker_interaction()
         self._add_new_match_interaction()
-        self._recent_matches = self._add_recent_matches_table()
+        self._recent_matches = self._add_recent_matches_table(
+            ('Winning Player 1', 'Winning Player 2', 'Loser Player 1', 'Loser Player 2', 'Goal Balance'),
+            lambda match_id: self._database.delete_dl_match(match_id))
         self.setLayout(self._layout)
 
     def update(self) -> None:
-        self._update_player_statistcs()
-        self._update_teams_statistics()
-        self._update_recent_matches()
-        self._update_name_boxes()
+        self._window.load_view_data(self, self._loading_label, self._load_data, self._show_data)
+
+    def apply_change(self, change: LeagueChange) -> bool:
+        # updates only rows of changed players, teams and matches, returns False if the data has to be loaded again
+        if change.is_full:
+            return False
+        self._update_players_statistics([*change.dl_players, *change.added_players], change.renamed_players,
+                                        self._database.get_player_dl_points)
+        self._update_teams_statistics(change.teams, change.renamed_players)
+        self._update_recent_matches(change.added_dl_matches, change.deleted_dl_matches, change.renamed_players,
+                                    self._database.get_double_league_matches)
+        self._update_name_boxes_after_change(self._name_boxes, change)
+        for old_name, new_name in change.renamed_players:
+            for item in self._present_players.findItems(old_name, Qt.MatchExactly):
+                item.setText(new_name)
+        for player in change.added_players:
+            self._add_present_player(player, False)
+        return True
+
+    def _load_data(self) -> DoubleLeagueData:
+        players = self._database.get_player_names()
+        top_players = self._database.get_top_dl_players()
+        teams_dl_points = sorted(self._database.get_teams_dl_points().items(),
+                                 key=lambda record: (-record[1], record[0]))
+        matches = self._database.get_double_league_matches(RECENT_MATCHES_NUM)
+        return DoubleLeagueData(
+            players,
+            to_columns(top_players, 2),
+            [player for player, _ in top_players],
+            to_columns([(player1, player2, dl_points) for (player1, player2), dl_points in teams_dl_points], 3),
+            [key for key, _ in teams_dl_points],
+            to_columns([self._to_recent_match_row(match) for match in matches], 6),
+            [match.id for match in matches])
+
+    def _show_data(self, data: DoubleLeagueData) -> None:
+        self._players_statistics.set_columns(data.players_statistics, data.ranked_players)
+        self._teams_statistics.set_columns(data.teams_statistics, data.ranked_teams)
+        self._recent_matches.set_columns(data.recent_matches, data.recent_match_ids)
+        self._update_name_boxes(data.player_names)
+        self._update_present_players(data.player_names)
+
+    def _update_teams_statistics(self, teams: Sequence[Team], renamed_players: Sequence[Tuple[str, str]]) -> None:
+        rows: Dict[Team, Optional[Tuple[str, str, float]]] = {key: None for key in teams}
+        for old_name, new_name in renamed_players:
+            for row in range(self._teams_statistics.rowCount()):
+                old_key = self._teams_statistics.row_id(row)
+                if old_name in old_key:
+                    rows[old_key] = None
+                    rows[team(*[new_name if player == old_name else player for player in old_key])] = None
+        # teams which no longer have any matches are left out of the standings
+        rows.update({key: (*key, dl_points) for key, dl_points in self._database.get_teams_dl_points(
+            [key for key, values in rows.items() if values is None]).items()})
+        update_sorted_rows(self._teams_statistics, rows, _team_standing_key)
+
+    def _add_matchmaker_interaction(self) -> None:
+        self._layout.addWidget(create_label("Balance teams of present players", SECTION_TITLE_FONT))
+        self._present_players = QListWidget()
+        self._layout.addWidget(self._present_players)
+        balance_button = QPushButton('Balance Teams')
+        balance_button.clicked.connect(self._fill_balanced_teams)
+        self._layout.addWidget(balance_button)
+        self._schedule_label = create_label("")
+        self._layout.addWidget(self._schedule_label)
+
+    def _update_present_players(self, player_names: List[str]) -> None:
+        present_players = set(self._get_present_players())
+        self._present_players.clear()
+        for player_name in player_names:
+            self._add_present_player(player_name, player_name in present_players)
+
+    def _add_present_player(self, player_name: str, is_present: bool) -> None:
+        item = QListWidgetItem(player_name)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked if is_present else Qt.Unchecked)
+        self._present_players.addItem(item)
+
+    def _get_present_players(self) -> List[str]:
+        items = [self._present_players.item(row) for row in range(self._present_players.count())]
+        return [item.text() for item in items if item.checkState() == Qt.Checked]
+
+    def _fill_balanced_teams(self) -> None:
+        present_players = self._get_present_players()
+        if len(present_players) < 4:
+            self._error_window = ErrorWindow("At least 4 players have to be present to balance teams")
+            return
+        games = schedule_balanced_games(
+            {player: self._database.get_player_dl_points(player) for player in present_players})
+        self._schedule_label.setText('\n'.join(
+            f"{game.team1[0]} & {game.team1[1]} vs {game.team2[0]} & {game.team2[1]} (diff {game.diff:.2f})"
+            for game in games))
+        # the first game is the most balanced one
+        for name_box, player in zip(self._name_boxes, games[0].players()):
+            name_box.setCurrentIndex(name_box.findText(player))
 
     def _add_new_match_interaction(self) -> None:
         self._layout.addWidget(create_label("Add new match", SECTION_TITLE_FONT))
@@ -56,8 +168,8 @@ class DoubleLeagueMenu(LeagueMenu):
         self._score_box.clear()
         return DoubleLeagueMatch(None, *player_names, int(goal_balance))
 
-    def _update_name_boxes(self) -> None:
-        palyer_names = [''] + self._database.get_player_names()
+    def _update_name_boxes(self, player_names: List[str]) -> None:
+        palyer_names = [''] + player_names
         for name_box in self._name_boxes:
             name_box.clear()
             name_box.addItems(palyer_names)
@@ -66,55 +178,9 @@ class DoubleLeagueMenu(LeagueMenu):
         if match is None:
             return
         self._database.insert_double_league_match(match)
-        self.update()
 
-    def _update_player_statistcs(self) -> None:
-        players = self._database.get_player_names()
-        self._players_statistics.setColumnCount(2)
-        self._players_statistics.setRowCount(len(players))
-        self._players_statistics.setHorizontalHeaderLabels(('Name', 'Points'))
-        teams_dl_points = {player: self._database.get_player_dl_points(player) for player in players}
-        for index, (player, dl_points) in enumerate(
-                sorted(teams_dl_points.items(), key=lambda record: record[1], reverse=True)):
-            self._players_statistics.setItem(index, 0, QTableWidgetItem(player))
-            self._players_statistics.setItem(index, 1, QTableWidgetItem(
-                str(dl_points)))
-
-    def _update_teams_statistics(self) -> None:
-        players = self._database.get_player_names()
-        teams = combinations(players, 2)
-        self._teams_statistics.setColumnCount(3)
-        self._teams_statistics.setRowCount(len(players))
-        self._teams_statistics.setHorizontalHeaderLabels(('Player1', 'Player2', 'Points'))
-        teams_dl_points = {team: self._database.get_team_dl_points(*team) for team in teams}
-        for index, ((player1, player2), dl_points) in enumerate(
-                sorted(teams_dl_points.items(), key=lambda record: record[1], reverse=True)):
-            self._teams_statistics.setItem(index, 0, QTableWidgetItem(player1))
-            self._teams_statistics.setItem(index, 1, QTableWidgetItem(player2))
-            self._teams_statistics.setItem(index, 2, QTableWidgetItem(str(dl_points)))
-
-    def _update_recent_matches(self) -> None:
-        matches = self._database.get_double_league_matches(10)
-        self._recent_matches.setColumnCount(6)
-        self._recent_matches.setRowCount(len(matches))
-        self._recent_matches.setHorizontalHeaderLabels(
-            ('Winning Player 1', 'Winning Player 2', 'Loser Player 1', 'Loser Player 2', 'Goal Balance', ''))
-        for index, match in enumerate(matches):
-            self._recent_matches.setItem(index, 0, QTableWidgetItem(match.winning_player1))
-            self._recent_matches.setItem(index, 1, QTableWidgetItem(match.winning_player2))
-            self._recent_matches.setItem(index, 2, QTableWidgetItem(match.loser_player1))
-            self._recent_matches.setItem(index, 3, QTableWidgetItem(match.loser_player2))
-            self._recent_matches.setItem(index, 4, QTableWidgetItem(str(match.goal_balance)))
-            self._recent_matches.setCellWidget(index, 5, QPushButton("Delete"))
-            self._recent_matches.cellWidget(index, 5).clicked.connect(
-                partial(self._delete_match, match.id))
-
-    def _delete_match(self, match_id: int) -> None:
-        self._database.delete_dl_match(match_id)
-        self.update()
-
-    def _add_teams_statistics_table(self) -> QTableWidget:
+    def _add_teams_statistics_table(self) -> ColumnarTableModel:
         self._layout.addWidget(create_label("Teams Statistics", SECTION_TITLE_FONT))
-        teams_statistics = QTableWidget()
-        self._layout.addWidget(teams_statistics)
+        teams_statistics = ColumnarTableModel(('Player1', 'Player2', 'Points'))
+        self._layout.addWidget(create_table_view(teams_statistics))
         return teams_statistics
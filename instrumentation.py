@@ -0,0 +1,122 @@
+from collections import defaultdict
+from functools import wraps
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+
+HISTOGRAM_BUCKETS = 40
+SQL_PROGRESS_STEPS = 1000
+SQL_STATEMENT_LENGTH = 120
+# statements are traced with their parameters already bound, these are replaced back by '?'
+SQL_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b")
+
+
+class LatencyHistogram:
+    # bucket i counts calls which took less than 2^i microseconds (and at least 2^(i-1))
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.buckets[min(int(seconds * 1000000).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        # upper bound of the bucket holding the percentile, never more than the slowest call
+        needed = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= needed:
+                return min((1 << bucket) / 1000000, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'total': self.total, 'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.percentile(0.5), 'p90': self.percentile(0.9), 'p99': self.percentile(0.99),
+                'max': self.max, 'buckets': self.buckets}
+
+
+class Instrumentation:
+    # opt-in: nothing is timed until objects are attached, and detaching them restores their own methods
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._sql_statements: Dict[str, int] = defaultdict(int)
+        self._sql_progress_steps: Dict[str, int] = defaultdict(int)
+        self._current_sql_statement = ''
+        self._attached: List[Any] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._histograms[name].record(seconds)
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return timed_function
+
+    def attach_database(self, database) -> None:
+        self._attach_methods(database, [name for name in dir(type(database))
+                                        if not name.startswith('_') and callable(getattr(database, name))])
+        database._conn.set_trace_callback(self._trace_sql)
+        database._conn.set_progress_handler(self._count_sql_progress, SQL_PROGRESS_STEPS)
+
+    def attach_views(self, views: Iterable[Any]) -> None:
+        # update() only schedules loading, the data is computed by _load_data and shown by _show_data
+        for view in views:
+            self._attach_methods(view, ['update', '_load_data', '_show_data'])
+
+    def detach(self) -> None:
+        for instance in self._attached:
+            for name in instance._instrumented_methods:
+                delattr(instance, name)
+            del instance._instrumented_methods
+            if hasattr(instance, '_conn'):
+                instance._conn.set_trace_callback(None)
+                instance._conn.set_progress_handler(None, 0)
+        self._attached = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'methods': {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())},
+                'sql': {statement: {'count': count, 'progress_steps': self._sql_progress_steps[statement]}
+                        for statement, count in sorted(self._sql_statements.items())},
+            }
+
+    def dump(self, file_name: str) -> None:
+        with open(file_name, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def _attach_methods(self, instance: Any, names: List[str]) -> None:
+        class_name = type(instance).__name__
+        for name in names:
+            # instance attributes shadow the methods of the class, so other instances aren't affected
+            setattr(instance, name, self.timed(f'{class_name}.{name}', getattr(instance, name)))
+        instance._instrumented_methods = names
+        self._attached.append(instance)
+
+    def _trace_sql(self, statement: str) -> None:
+        statement = SQL_LITERAL_PATTERN.sub('?', ' '.join(statement.split()))[:SQL_STATEMENT_LENGTH]
+        with self._lock:
+            self._current_sql_statement = statement
+            self._sql_statements[statement] += 1
+
+    def _count_sql_progress(self) -> int:
+        # called every SQL_PROGRESS_STEPS virtual machine instructions of the running statement
+        with self._lock:
+            self._sql_progress_steps[self._current_sql_statement] += SQL_PROGRESS_STEPS
+        return 0
@@ -0,0 +1,38 @@
+from PyQt5.QtWidgets import QPushButton, QVBoxLayout, QWidget
+
+from constants import SECTION_TITLE_FONT
+from instrumentation import Instrumentation
+from table_models import ColumnarTableModel, create_table_view, to_columns
+from utils import create_label
+
+
+class InstrumentationPanel(QWidget):
+    def __init__(self, instrumentation: Instrumentation):
+        super().__init__()
+        self.setWindowTitle("Instrumentation")
+        self._instrumentation = instrumentation
+        self._layout = QVBoxLayout()
+        refresh_button = QPushButton('Refresh')
+        refresh_button.clicked.connect(self.update)
+        self._layout.addWidget(refresh_button)
+        self._layout.addWidget(create_label("Methods", SECTION_TITLE_FONT))
+        self._methods = ColumnarTableModel(('Method', 'Calls', 'Total ms', 'Mean ms', 'p50 ms', 'p90 ms', 'p99 ms',
+                                            'Max ms'))
+        self._layout.addWidget(create_table_view(self._methods))
+        self._layout.addWidget(create_label("SQL Statements", SECTION_TITLE_FONT))
+        self._sql_statements = ColumnarTableModel(('Statement', 'Calls', 'Progress Steps'))
+        self._layout.addWidget(create_table_view(self._sql_statements))
+        self.setLayout(self._layout)
+        self.update()
+        self.show()
+
+    def update(self) -> None:
+        report = self._instrumentation.to_dict()
+        self._methods.set_columns(to_columns(
+            [(name, histogram['count'],
+              *[round(histogram[field] * 1000, 3) for field in ('total', 'mean', 'p50', 'p90', 'p99', 'max')])
+             for name, histogram in sorted(report['methods'].items(), key=lambda item: -item[1]['total'])], 8))
+        self._sql_statements.set_columns(to_columns(
+            [(statement, record['count'], record['progress_steps'])
+             for statement, record in sorted(report['sql'].items(), key=lambda item: -item[1]['progress_steps'])],
+            3))
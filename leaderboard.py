@@ -0,0 +1,82 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+# entries are sorted by descending points, ties by name
+_Key = Tuple[float, str]
+
+
+def _key(player: str, points: float) -> _Key:
+    return (-points, player)
+
+
+class Leaderboard:
+    # keeps players sorted by points, so only players whose points changed are repositioned.
+    # Keys of the players changed by the last update are kept, which is enough to tell ranks before it
+    def __init__(self, player_to_points: Dict[str, float]):
+        self._player_to_points = dict(player_to_points)
+        self._keys: List[_Key] = sorted(_key(player, points) for player, points in self._player_to_points.items())
+        self._last_old_keys: Dict[str, Optional[_Key]] = {}
+        self._sorted_last_old_keys: List[_Key] = []
+        self._sorted_last_new_keys: List[_Key] = []
+
+    def update(self, player_to_points: Dict[str, float]) -> List[str]:
+        # returns players whose points changed
+        changed = {player: points for player, points in player_to_points.items()
+                   if self._player_to_points.get(player) != points}
+        if not changed:
+            # ranks before the last update that changed anything are kept, e.g. through reloads of views
+            return []
+        self._last_old_keys = {player: self._get_key(player) for player in changed}
+        if len(changed) * 8 > len(self._keys):
+            self._player_to_points.update(changed)
+            self._keys = sorted(_key(player, points) for player, points in self._player_to_points.items())
+        else:
+            for player, points in changed.items():
+                if player in self._player_to_points:
+                    del self._keys[bisect_left(self._keys, self._get_key(player))]
+                self._player_to_points[player] = points
+                insort(self._keys, _key(player, points))
+        self._sorted_last_old_keys = sorted(key for key in self._last_old_keys.values() if key is not None)
+        self._sorted_last_new_keys = sorted(self._get_key(player) for player in changed)
+        return list(changed)
+
+    def add_player(self, player: str, points: float) -> None:
+        # unlike update, doesn't count as a change, the player is ranked as if they were always there
+        self._player_to_points[player] = points
+        insort(self._keys, _key(player, points))
+
+    def rename_player(self, old_name: str, new_name: str) -> None:
+        old_key = self._get_key(old_name)
+        del self._keys[bisect_left(self._keys, old_key)]
+        self._player_to_points[new_name] = self._player_to_points.pop(old_name)
+        insort(self._keys, self._get_key(new_name))
+        if old_name in self._last_old_keys:
+            last_old_key = self._last_old_keys.pop(old_name)
+            self._last_old_keys[new_name] = None if last_old_key is None else (last_old_key[0], new_name)
+            self._sorted_last_old_keys = sorted(key for key in self._last_old_keys.values() if key is not None)
+            self._sorted_last_new_keys = sorted(self._get_key(player) for player in self._last_old_keys)
+
+    def rank_of(self, player: str) -> int:
+        # 1 for the player with the most points
+        return bisect_left(self._keys, self._get_key(player)) + 1
+
+    def top_k(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        return [(player, -negative_points) for negative_points, player in self._keys[:k]]
+
+    def get_previous_rank(self, player: str) -> Optional[int]:
+        # rank before the last update, None if the player wasn't on the leaderboard yet
+        key = self._last_old_keys[player] if player in self._last_old_keys else self._get_key(player)
+        if key is None:
+            return None
+        # the list before the last update had the old keys of changed players instead of the new ones
+        return (bisect_left(self._keys, key) - bisect_left(self._sorted_last_new_keys, key)
+                + bisect_left(self._sorted_last_old_keys, key) + 1)
+
+    def get_rank_movement(self, player: str) -> int:
+        # positive when the player went up in the last update
+        previous_rank = self.get_previous_rank(player)
+        return 0 if previous_rank is None else previous_rank - self.rank_of(player)
+
+    def _get_key(self, player: str) -> Optional[_Key]:
+        return _key(player, self._player_to_points[player]) if player in self._player_to_points else None
@@ -0,0 +1,276 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+import hashlib
+import json
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from league_database import LeagueDatabase
+from match import POSSIBLE_GOAL_BALANCES, DoubleLeagueMatch, SingleLeagueMatch
+from match_store import MatchView
+
+
+DEFAULT_NUM_MATCHES = 10
+MAX_NUM_MATCHES = 100
+MAX_BODY_SIZE = 64 * 1024
+
+_STATUS_TEXTS = {200: 'OK', 201: 'Created', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def _to_json(data: Any) -> bytes:
+    return json.dumps(data).encode()
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass(frozen=True)
+class _JsonBody:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_data(cls, data: Any) -> '_JsonBody':
+        body = _to_json(data)
+        return cls(body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def _error_response(status: int, message: str) -> Response:
+    return status, {'Content-Type': 'application/json'}, _to_json({'error': message})
+
+
+def _match_to_dict(match: Union[MatchView, SingleLeagueMatch, DoubleLeagueMatch]) -> Dict[str, Any]:
+    if isinstance(match, (SingleLeagueMatch, DoubleLeagueMatch)):
+        return asdict(match)
+    return {'id': match.id, **dict(zip(match.PLAYER_FIELDS, match.players())), 'goal_balance': match.goal_balance}
+
+
+def _get_standings(ranking: List[Tuple[Any, float]], player_field: str) -> List[Dict[str, Any]]:
+    return [{'rank': rank, player_field: player, 'points': points}
+            for rank, (player, points) in enumerate(ranking, start=1)]
+
+
+class LeagueApi:
+    # serves the league as JSON over HTTP. Responses to GET requests are kept in a snapshot until the data
+    # version of the database changes, so polling clients share one computation of every response.
+    # All calls to the database run in a single thread, the event loop is never blocked by SQLite
+    def __init__(self, database: LeagueDatabase):
+        self._database = database
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='league_api')
+        self._snapshot_version: Optional[int] = None
+        # responses are futures, so requests arriving while a response is computed wait for the same one
+        self._snapshot: Dict[str, asyncio.Future] = {}
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    async def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes = b'') -> Response:
+        # headers have lower case names
+        try:
+            url = urlsplit(target)
+        except ValueError:
+            return _error_response(400, f"{target} isn't a valid request target")
+        path = unquote(url.path).rstrip('/')
+        query = parse_qs(url.query)
+        try:
+            if method == 'GET':
+                return await self._handle_get(path, query, headers)
+            if method == 'POST':
+                return await self._handle_post(path, body)
+            raise ApiError(405, f"method {method} isn't supported")
+        except ApiError as error:
+            return _error_response(error.status, error.message)
+        except Exception:
+            # a failing query still gets an answer, the server goes on serving other requests
+            traceback.print_exc()
+            return _error_response(500, "the request couldn't be handled")
+
+    async def _handle_get(self, path: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> Response:
+        key, compute = self._get_route(path, query)
+        json_body = await self._get_snapshot_body(key, compute)
+        response_headers = {'Content-Type': 'application/json', 'ETag': json_body.etag, 'Cache-Control': 'no-cache'}
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None and (
+                if_none_match.strip() == '*' or json_body.etag in (etag.strip() for etag in if_none_match.split(','))):
+            return 304, response_headers, b''
+        return 200, response_headers, json_body.body
+
+    async def _handle_post(self, path: str, body: bytes) -> Response:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "body must be a JSON object")
+        if path == '/matches/sl':
+            match = SingleLeagueMatch(None, *self._get_match_fields(data, SingleLeagueMatch))
+            record = self._record_single_league_match
+        elif path == '/matches/dl':
+            match = DoubleLeagueMatch(None, *self._get_match_fields(data, DoubleLeagueMatch))
+            record = self._record_double_league_match
+        else:
+            raise ApiError(404, f"there is no {path}")
+        match_id = await self._run(lambda: record(match))
+        return 201, {'Content-Type': 'application/json'}, _to_json({'id': match_id})
+
+    def _get_route(self, path: str, query: Dict[str, List[str]]) -> Tuple[str, Callable[[], Any]]:
+        # key of the response in the snapshot and the function computing its data
+        if path == '/standings/sl':
+            return path, lambda: _get_standings(self._database.get_top_sl_players(), 'player')
+        if path == '/standings/dl':
+            return path, lambda: _get_standings(self._database.get_top_dl_players(), 'player')
+        if path == '/standings/teams':
+            return path, self._get_team_standings
+        if path == '/players':
+            return path, lambda: sorted(self._database.get_player_names())
+        num = self._get_num(query)
+        if path == '/matches/sl':
+            return f"{path}?num={num}", lambda: [
+                _match_to_dict(match) for match in self._database.get_single_league_matches(num)]
+        if path == '/matches/dl':
+            return f"{path}?num={num}", lambda: [
+                _match_to_dict(match) for match in self._database.get_double_league_matches(num)]
+        if path.startswith('/players/'):
+            player = path[len('/players/'):]
+            return f"{path}?num={num}", lambda: self._get_player(player, num)
+        raise ApiError(404, f"there is no {path}")
+
+    def _get_team_standings(self) -> List[Dict[str, Any]]:
+        teams_dl_points = self._database.get_teams_dl_points()
+        return _get_standings(sorted(teams_dl_points.items(), key=lambda record: (-record[1], record[0])),
+                              'players')
+
+    def _get_player(self, player: str, num: int) -> Dict[str, Any]:
+        if not self._database.is_player_in_database(player):
+            raise ApiError(404, f"there is no player {player}")
+        return {
+            'name': player,
+            'try_hard_factor': self._database.get_player_try_hard_factor(player),
+            'starting_dl_points': self._database.get_player_starting_dl_points(player),
+            'sl_points': self._database.get_player_sl_points(player),
+            'sl_rank': self._database.get_player_sl_rank(player),
+            'dl_points': self._database.get_player_dl_points(player),
+            'dl_rank': self._database.get_player_dl_rank(player),
+            'recent_sl_matches': [_match_to_dict(match)
+                                  for match in self._database.get_player_single_league_matches(player, num)],
+            'recent_dl_matches': [_match_to_dict(match)
+                                  for match in self._database.get_player_double_league_matches(player, num)],
+        }
+
+    @staticmethod
+    def _get_num(query: Dict[str, List[str]]) -> int:
+        num = query.get('num', [str(DEFAULT_NUM_MATCHES)])[-1]
+        if not num.isdigit() or not 0 < int(num) <= MAX_NUM_MATCHES:
+            raise ApiError(400, f"num must be an integer between 1 and {MAX_NUM_MATCHES}")
+        return int(num)
+
+    @staticmethod
+    def _get_match_fields(data: Dict[str, Any],
+                          match_class: Type[Union[SingleLeagueMatch, DoubleLeagueMatch]]) -> List[Any]:
+        player_fields = [field.name for field in fields(match_class) if field.name not in ('id', 'goal_balance')]
+        players = [data.get(field) for field in player_fields]
+        if not all(isinstance(player, str) and player for player in players):
+            raise ApiError(400, f"{', '.join(player_fields)} must be names of players")
+        if len(set(players)) != len(players):
+            raise ApiError(400, "names of the players can't be repeated")
+        goal_balance = data.get('goal_balance')
+        if not isinstance(goal_balance, int) or str(goal_balance) not in POSSIBLE_GOAL_BALANCES:
+            raise ApiError(400, "goal_balance must be an integer between 0 and 10")
+        return [*players, goal_balance]
+
+    def _check_players(self, players: List[str]) -> None:
+        for player in players:
+            if not self._database.is_player_in_database(player):
+                raise ApiError(400, f"there is no player {player}")
+
+    def _record_single_league_match(self, match: SingleLeagueMatch) -> int:
+        self._check_players([match.winning_player, match.loser_player])
+        return self._database.insert_single_league_match(match)
+
+    def _record_double_league_match(self, match: DoubleLeagueMatch) -> int:
+        self._check_players([match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2])
+        return self._database.insert_double_league_match(match)
+
+    async def _run(self, function: Callable[[], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function)
+
+    async def _get_snapshot_body(self, key: str, compute: Callable[[], Any]) -> _JsonBody:
+        data_version = self._database.get_data_version()
+        if data_version != self._snapshot_version:
+            self._snapshot_version, self._snapshot = data_version, {}
+        snapshot = self._snapshot
+        if key not in snapshot:
+            snapshot[key] = asyncio.ensure_future(self._run(lambda: _JsonBody.from_data(compute())))
+        future = snapshot[key]
+        try:
+            # a client disconnecting doesn't cancel the computation other clients wait for
+            return await asyncio.shield(future)
+        except Exception:
+            # failed computations aren't kept, the next request tries again
+            if snapshot.get(key) is future:
+                del snapshot[key]
+            raise
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # HTTP/1.1 with keep-alive, requests of a connection are answered one by one
+        try:
+            while request_line := await reader.readline():
+                try:
+                    method, target, version, headers = await _read_request_head(request_line, reader)
+                    content_length = int(headers.get('content-length', 0))
+                    if content_length < 0:
+                        raise ValueError(f"negative Content-Length {content_length}")
+                except ValueError:
+                    # the rest of a malformed request can't be told apart from the next one
+                    writer.write(_format_response(*_error_response(400, "malformed request"), keep_alive=False))
+                    await writer.drain()
+                    break
+                if content_length > MAX_BODY_SIZE:
+                    status, response_headers, body = 413, {}, b''
+                    keep_alive = False
+                else:
+                    status, response_headers, body = await self.handle(
+                        method, target, headers, await reader.readexactly(content_length))
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(_format_response(status, response_headers, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # clients going away just end the connection
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request_head(request_line: bytes,
+                             reader: asyncio.StreamReader) -> Tuple[str, str, str, Dict[str, str]]:
+    # raises ValueError for a malformed request line or header, including ones longer than the reader's limit
+    method, target, version = request_line.decode('latin-1').split()
+    if not version.startswith('HTTP/'):
+        raise ValueError(f"{version} isn't an HTTP version")
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        name, separator, value = line.decode('latin-1').partition(':')
+        if not separator or not name.strip():
+            raise ValueError(f"malformed header {line!r}")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _format_response(status: int, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+    headers = {**headers, 'Content-Length': str(len(body)), 'Connection': 'keep-alive' if keep_alive else 'close'}
+    head = [f"HTTP/1.1 {status} {_STATUS_TEXTS[status]}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
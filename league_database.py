@@ -1,8 +1,25 @@
 from enum import Enum
+from functools import wraps
+from itertools import islice
+import os
 import sqlite3
-from typing import List, Optional
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
+from connection_pool import ReadOnlyConnectionPool
+from leaderboard import Leaderboard
+from league_events import LeagueChange, LeagueChangeSubscriber
 from match import DoubleLeagueMatch, SingleLeagueMatch
+from match_store import DoubleLeagueMatchView, MatchStore, SingleLeagueMatchView
+from migrations import create_archive_tables, migrate
+from player import PlayerStartingData
+from season import Season, SeasonStanding
+from single_league_engine import HeadToHead, SingleLeagueEngine
+from team_standings import Team, TeamStandings, team
+
+if TYPE_CHECKING:
+    from dl_predictions import MatchupPredictions
+    from dl_what_if import RatingConstants
 
 
 def calculate_moved_points(diff: float, bilans: int) -> float:
@@ -18,339 +35,836 @@ def calculate_diff(winning_player1_points: float, winning_player2_points: float,
     return loser_player1_points + loser_player2_points - winning_player1_points - winning_player2_points
 
 
+def _number_match_lines(lines: Iterable[Tuple[int, Union[SingleLeagueMatch, DoubleLeagueMatch]]]
+                        ) -> Iterator[Tuple[int, str, int, Union[SingleLeagueMatch, DoubleLeagueMatch]]]:
+    # adds the normalized line of every match and how many times the same line has been in the file so far
+    occurrences: Dict[str, int] = {}
+    for line_number, match in lines:
+        match_line = ' '.join(str(value) for field, value in vars(match).items() if field != 'id')
+        occurrences[match_line] = occurrences.get(match_line, 0) + 1
+        yield line_number, match_line, occurrences[match_line], match
+
+
+def _get_sl_matches_query(table: str) -> str:
+    return f"""
+SELECT sl_id, winner.name, loser.name, goal_balance FROM {table}
+INNER JOIN players winner ON winner.player_id = winning_player_id
+INNER JOIN players loser ON loser.player_id = loser_player_id
+"""
+
+
+def _get_dl_matches_query(table: str) -> str:
+    return f"""
+SELECT dl_id, winner1.name, winner2.name, loser1.name, loser2.name, goal_balance FROM {table}
+INNER JOIN players winner1 ON winner1.player_id = winning_player1_id
+INNER JOIN players winner2 ON winner2.player_id = winning_player2_id
+INNER JOIN players loser1 ON loser1.player_id = loser_player1_id
+INNER JOIN players loser2 ON loser2.player_id = loser_player2_id
+"""
+
+
+SL_MATCHES_QUERY = _get_sl_matches_query('single_league_matches')
+DL_MATCHES_QUERY = _get_dl_matches_query('double_league_matches')
+ARCHIVED_SL_MATCHES_QUERY = _get_sl_matches_query('archive.single_league_matches')
+ARCHIVED_DL_MATCHES_QUERY = _get_dl_matches_query('archive.double_league_matches')
+
+# DL points of players at the end of the latest closed season, starting points of players who joined later
+SEASON_STARTING_DL_POINTS_QUERY = """
+SELECT name, COALESCE(season_standings.dl_points, starting_dl_points) FROM players
+LEFT JOIN season_standings ON season_standings.player_id = players.player_id
+AND season_standings.season_id = (SELECT MAX(season_id) FROM seasons)
+"""
+
+SL_MATCH_RECORDS_QUERY = "SELECT sl_id, winning_player_id, loser_player_id, goal_balance FROM single_league_matches"
+
+DL_MATCH_RECORDS_QUERY = """
+SELECT dl_id, winning_player1_id, winning_player2_id, loser_player1_id, loser_player2_id, goal_balance
+FROM double_league_matches
+"""
+
+INSERT_SL_MATCH_QUERY = """
+INSERT INTO single_league_matches(winning_player_id, loser_player_id, goal_balance) VALUES (
+(SELECT player_id FROM players WHERE name = :winning_player),
+(SELECT player_id FROM players WHERE name = :loser_player),
+:goal_balance)
+"""
+
+INSERT_DL_MATCH_QUERY = """
+INSERT INTO double_league_matches(winning_player1_id, winning_player2_id, loser_player1_id, loser_player2_id,
+goal_balance) VALUES (
+(SELECT player_id FROM players WHERE name = :winning_player1),
+(SELECT player_id FROM players WHERE name = :winning_player2),
+(SELECT player_id FROM players WHERE name = :loser_player1),
+(SELECT player_id FROM players WHERE name = :loser_player2),
+:goal_balance)
+"""
+
+DL_CHECKPOINT_INTERVAL = 100
+IMPORT_CHUNK_SIZE = 1000
+DL_RATING_HISTORY_CHUNK_SIZE = 1000
+
+
+def _synchronized(method):
+    # views compute their data in background threads, so calls to the database can't interleave
+    @wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return synchronized_method
+
+
+def _changes_data(method):
+    # every change of the league gets a new data version and is published to subscribers,
+    # a change which isn't published by the method (e.g. it failed halfway) is published as a change of everything
+    @wraps(method)
+    def changing_method(self, *args, **kwargs):
+        with self._lock:
+            data_version = self._data_version
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self._data_version == data_version:
+                    self._publish_change(is_full=True)
+    return changing_method
+
+
 class Order(Enum):
     asc = 'ASC'
     desc = 'DESC'
 
 
 class LeagueDatabase:
-    def __init__(self, db_name: str):
-        self._conn = sqlite3.connect(db_name)
+    def __init__(self, db_name: str, archive_name: Optional[str] = None):
+        self._db_name = db_name
+        self._archive_name = archive_name or f"{os.path.splitext(db_name)[0]}_archive.db"
+        self._is_archive_attached = False
+        self._lock = threading.RLock()
+        self._data_version = 0
+        self._subscribers: List[LeagueChangeSubscriber] = []
+        self._conn = sqlite3.connect(db_name, check_same_thread=False)
         self._cursor = self._conn.cursor()
-        self._calculate_dl_points()
+        # lets readers on other connections work while matches are being recorded
+        self._cursor.execute("PRAGMA journal_mode=WAL").fetchone()
+        migrate(self._conn)
+        self._load_season_matches()
+        self._load_dl_points()
+        players = self.get_player_names()
+        self._dl_leaderboard = Leaderboard({player: self.get_player_dl_points(player) for player in players})
+        self._sl_leaderboard = Leaderboard({player: self.get_player_sl_points(player) for player in players})
         #self._load_dl_matches_from_file('dl_matches.txt')
 
+    @_synchronized
     def close_connection(self) -> None:
         self._conn.close()
 
+    def get_data_version(self) -> int:
+        # not synchronized, so the GUI thread isn't blocked by views computing their data
+        return self._data_version
+
+    @_synchronized
+    def subscribe(self, subscriber: LeagueChangeSubscriber) -> None:
+        # subscribers are called in the thread which changed the league, while the database is locked
+        self._subscribers.append(subscriber)
+
+    @_synchronized
+    def unsubscribe(self, subscriber: LeagueChangeSubscriber) -> None:
+        self._subscribers.remove(subscriber)
+
+    @_synchronized
+    def open_read_only_pool(self, size: int = 4) -> ReadOnlyConnectionPool:
+        return ReadOnlyConnectionPool(self._db_name, size)
+
+    @_synchronized
     def is_player_in_database(self, player: str) -> bool:
         self._cursor.execute("SELECT * FROM players WHERE name = :player",
                              {"player": player})
         return self._cursor.fetchone() is not None
 
-    def insert_player(self, player: str) -> None:
+    @_changes_data
+    def insert_player(self, player: PlayerStartingData) -> None:
         with self._conn:
              self._cursor.execute(
-                 "INSERT INTO players VALUES (:name, :starting_dl_points, :try_hard_factor)",
+                 """INSERT INTO players(name, starting_dl_points, try_hard_factor) VALUES
+                 (:name, :starting_dl_points, :try_hard_factor)""",
                  {'name': player.name, 'starting_dl_points': player.dl_points, 'try_hard_factor': player.try_hard_factor})
-        self._player_to_dl_points[player.name] = player.dl_points
+             self._update_player_dl_points(player.name, player.dl_points)
+             self._save_current_dl_points([player.name])
+        self._sl_engine.add_player(player.name, player.try_hard_factor)
+        self._dl_leaderboard.add_player(player.name, self.get_player_dl_points(player.name))
+        self._sl_leaderboard.add_player(player.name, self.get_player_sl_points(player.name))
+        self._publish_change(added_players=(player.name,))
 
+    @_changes_data
     def update_player_name(self, old_name: str, new_name: str) -> None:
         with self._conn:
             self._cursor.execute(
                 "UPDATE players SET name = :new_name WHERE name = :old_name",
                 {"old_name": old_name, "new_name": new_name}
             )
-            self._cursor.execute(
-                "UPDATE single_league_matches SET winning_player = :new_name WHERE winning_player = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
-            self._cursor.execute(
-                "UPDATE single_league_matches SET loser_player = :new_name WHERE loser_player = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
-            self._cursor.execute(
-                "UPDATE double_league_matches SET winning_player1 = :new_name WHERE winning_player1 = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
-            self._cursor.execute(
-                "UPDATE double_league_matches SET winning_player2 = :new_name WHERE winning_player2 = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
-            self._cursor.execute(
-                "UPDATE double_league_matches SET loser_player1 = :new_name WHERE loser_player1 = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
-            self._cursor.execute(
-                "UPDATE double_league_matches SET loser_player2 = :new_name WHERE loser_player2 = :old_name",
-                {"old_name": old_name, "new_name": new_name}
-            )
+        # the engines refer to players by their indexes in the match stores, renaming the stores renames them too
+        self._sl_matches.rename_player(old_name, new_name)
+        self._dl_matches.rename_player(old_name, new_name)
         self._player_to_dl_points[new_name] = self._player_to_dl_points[old_name]
         del self._player_to_dl_points[old_name]
+        self._sl_engine.rename_player(old_name, new_name)
+        self._dl_leaderboard.rename_player(old_name, new_name)
+        self._sl_leaderboard.rename_player(old_name, new_name)
+        self._publish_change(renamed_players=((old_name, new_name),))
 
+    @_changes_data
     def update_player_try_hard_factor(self, player: str, new_try_hard_factor: float) -> None:
         with self._conn:
             self._cursor.execute("UPDATE players SET try_hard_factor = :new_try_hard_factor WHERE name = :player",
                                  {"new_try_hard_factor": new_try_hard_factor, "player": player})
+        self._sl_engine.update_try_hard_factor(player, new_try_hard_factor)
+        changed_players = self._update_sl_leaderboard([player, *self._sl_engine.get_player_head_to_heads(player)])
+        self._publish_change(sl_players=frozenset(changed_players), updated_players=frozenset([player]))
 
+    @_synchronized
     def get_player_names(self) -> List[str]:
-        self._cursor.execute("SELECT name FROM players")
+        # views rely on the names being sorted, e.g. to patch rows of renamed players in place
+        self._cursor.execute("SELECT name FROM players ORDER BY name")
         return [record[0] for record in self._cursor.fetchall()]
 
-    def insert_single_league_match(self, match: SingleLeagueMatch) -> None:
+    @_changes_data
+    def insert_single_league_match(self, match: SingleLeagueMatch) -> int:
+        # returns the id of the match
         with self._conn:
-             self._cursor.execute(
-                """INSERT INTO single_league_matches(winning_player, loser_player, goal_balance) VALUES 
-                (:winning_player, :loser_player, :goal_balance)""",
-                {'winning_player': match.winning_player, 'loser_player': match.loser_player,
-                 'goal_balance': match.goal_balance})
+             self._cursor.execute(INSERT_SL_MATCH_QUERY, vars(match))
+             sl_id = self._cursor.lastrowid
+        players = (match.winning_player, match.loser_player)
+        self._sl_engine.add_match(self._sl_matches.append(sl_id, players, match.goal_balance))
+        self._update_sl_leaderboard(players)
+        self._publish_change(sl_players=frozenset(players), added_sl_matches=(sl_id,))
+        return sl_id
 
-    def get_single_league_matches(self, num: Optional[int] = None) -> List[SingleLeagueMatch]:
-        self._cursor.execute("SELECT * FROM single_league_matches ORDER BY sl_id DESC")
-        records = self._cursor.fetchall() if num is None else self._cursor.fetchmany(num)
-        return [SingleLeagueMatch(*record) for record in records]
+    @_changes_data
+    def import_single_league_matches(self, source: str, lines: Iterable[Tuple[int, SingleLeagueMatch]],
+                                     skip_imported: bool = False) -> int:
+        self._cursor.execute("SELECT MAX(sl_id) FROM single_league_matches")
+        last_sl_id = self._cursor.fetchone()[0] or 0
+        with self._conn:
+            imported = self._import_matches('sl', source, lines, skip_imported, INSERT_SL_MATCH_QUERY)
+        self._append_matches(self._sl_matches, SL_MATCH_RECORDS_QUERY, 'sl_id', last_sl_id)
+        for match in self._sl_matches.get_views_after(last_sl_id):
+            self._sl_engine.add_match(match)
+        self._update_sl_leaderboard(self.get_player_names())
+        self._publish_change(is_full=True)
+        return imported
 
+    @_synchronized
+    def get_single_league_matches(self, num: Optional[int] = None,
+                                  order: Order = Order.desc) -> List[SingleLeagueMatchView]:
+        return list(self._sl_matches.get_views(num, descending=order == Order.desc))
+
+    @_synchronized
     def get_player_single_league_matches(self, player: str,
                                          num: Optional[int] = None) -> List[SingleLeagueMatch]:
         self._cursor.execute(
-            """
-            SELECT * FROM single_league_matches
-            WHERE winning_player = :player OR loser_player = :player
+            f"""
+            {SL_MATCHES_QUERY}
+            WHERE winning_player_id = :player_id OR loser_player_id = :player_id
             ORDER BY sl_id DESC
             """,
-            {"player": player})
+            {"player_id": self._get_player_id(player)})
         records = self._cursor.fetchall() if num is None else self._cursor.fetchmany(num)
         return [SingleLeagueMatch(*record) for record in records]
     
-    def insert_double_league_match(self, match: DoubleLeagueMatch) -> None:
+    @_changes_data
+    def insert_double_league_match(self, match: DoubleLeagueMatch) -> int:
+        # returns the id of the match
         with self._conn:
-             self._cursor.execute(
-                """INSERT INTO double_league_matches(winning_player1, winning_player2, loser_player1, loser_player2, goal_balance) VALUES 
-                (:winning_player1, :winning_player2, :loser_player1, :loser_player2, :goal_balance)""",
-                {'winning_player1': match.winning_player1, 'winning_player2': match.winning_player2,
-                 'loser_player1': match.loser_player1, 'loser_player2': match.loser_player2,
-                 'goal_balance': match.goal_balance})
-        self._update_dl_points_after_match(match)
-
-    def get_double_league_matches(self, num: Optional[int] = None, order: Order = Order.desc) -> List[DoubleLeagueMatch]:
-        if order == Order.desc:
-            self._cursor.execute("SELECT * FROM double_league_matches ORDER BY dl_id DESC")
-        else:
-            self._cursor.execute("SELECT * FROM double_league_matches ORDER BY dl_id ASC")
-        records = self._cursor.fetchall() if num is None else self._cursor.fetchmany(num)
-        return [DoubleLeagueMatch(*record) for record in records]
+             self._cursor.execute(INSERT_DL_MATCH_QUERY, vars(match))
+             dl_id = self._cursor.lastrowid
+             players = (match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2)
+             self._save_dl_rating_history(self._replay_dl_match(dl_id, players, match.goal_balance))
+             self._save_current_dl_points(players)
+        self._team_standings.add_match(self._dl_matches.append(dl_id, players, match.goal_balance))
+        self._update_dl_leaderboard(players)
+        self._publish_change(dl_players=frozenset(players), teams=frozenset([team(*players[:2]), team(*players[2:])]),
+                             added_dl_matches=(dl_id,))
+        return dl_id
+
+    @_changes_data
+    def import_double_league_matches(self, source: str, lines: Iterable[Tuple[int, DoubleLeagueMatch]],
+                                     skip_imported: bool = False) -> int:
+        last_dl_id = self._last_dl_id
+        try:
+            with self._conn:
+                imported = self._import_matches('dl', source, lines, skip_imported, INSERT_DL_MATCH_QUERY)
+                self._append_matches(self._dl_matches, DL_MATCH_RECORDS_QUERY, 'dl_id', last_dl_id)
+                self._replay_dl_matches_after(last_dl_id)
+        except Exception:
+            self._dl_matches.truncate(last_dl_id)
+            self._load_dl_points()
+            raise
+        for match in self._dl_matches.get_views_after(last_dl_id):
+            self._team_standings.add_match(match)
+        self._update_dl_leaderboard(self._player_to_dl_points)
+        self._publish_change(is_full=True)
+        return imported
+
+    @_synchronized
+    def get_double_league_matches(self, num: Optional[int] = None,
+                                  order: Order = Order.desc) -> List[DoubleLeagueMatchView]:
+        return list(self._dl_matches.get_views(num, descending=order == Order.desc))
 
+    @_synchronized
     def get_player_double_league_matches(self, player: str,
                                          num: Optional[int] = None) -> List[DoubleLeagueMatch]:
         self._cursor.execute(
-            """
-            SELECT * FROM double_league_matches
-            WHERE (winning_player1 = :player OR winning_player2 = :player
-                   OR loser_player1 = :player OR loser_player2 = :player)
+            f"""
+            {DL_MATCHES_QUERY}
+            WHERE (winning_player1_id = :player_id OR winning_player2_id = :player_id
+                   OR loser_player1_id = :player_id OR loser_player2_id = :player_id)
             ORDER BY dl_id DESC
             """,
-            {"player": player})
+            {"player_id": self._get_player_id(player)})
         records = self._cursor.fetchall() if num is None else self._cursor.fetchmany(num)
         return [DoubleLeagueMatch(*record) for record in records]
 
+    @_changes_data
     def update_player_starting_dl_points(self, name, new_points: float) -> None:
-        with self._conn:
-            self._cursor.execute("UPDATE players SET starting_dl_points = :starting_dl_points WHERE name = :name",
-                                 {'starting_dl_points': new_points, 'name': name})
-        self._calculate_dl_points()
+        first_dl_id = self._get_player_first_dl_match_id(name)
+        try:
+            with self._conn:
+                self._cursor.execute("UPDATE players SET starting_dl_points = :starting_dl_points WHERE name = :name",
+                                     {'starting_dl_points': new_points, 'name': name})
+                # full checkpoints of databases migrated from older versions, taken before the first match
+                # of the player, still hold the old starting points
+                self._cursor.execute(
+                    "DELETE FROM dl_points_checkpoints WHERE player_id = :player_id AND (:dl_id IS NULL OR dl_id < :dl_id)",
+                    {'player_id': self._get_player_id(name), 'dl_id': first_dl_id})
+                if first_dl_id is None:
+                    # only matters if the player has no points from a closed season
+                    self._update_player_dl_points(name, self._get_player_season_starting_dl_points(name))
+                    self._save_current_dl_points([name])
+                else:
+                    self._replay_dl_points_from(first_dl_id)
+        except Exception:
+            self._load_dl_points()
+            raise
+        changed_players = self._update_dl_leaderboard(self._player_to_dl_points)
+        self._publish_change(dl_players=frozenset(changed_players), updated_players=frozenset([name]))
 
+    @_synchronized
     def get_player_starting_dl_points(self, name: str) -> float:
         self._cursor.execute("SELECT starting_dl_points FROM players WHERE name = :name",
                              {'name': name})
         return round(float(self._cursor.fetchone()[0]), 2)
 
+    @_synchronized
     def get_player_sl_points(self, name: str) -> float:
-        self._cursor.execute("DROP TABLE IF EXISTS player_won_matches")
-        self._cursor.execute("DROP TABLE IF EXISTS player_lost_matches")
-        self._cursor.execute("DROP TABLE IF EXISTS player_matches")
-        self._cursor.execute("DROP TABLE IF EXISTS player_scores")
-        self._cursor.execute("DROP TABLE IF EXISTS player_recent_scores")
-        self._cursor.execute(
-            """
-            CREATE TABLE player_matches AS
-            SELECT *
-            FROM single_league_matches
-            WHERE loser_player = :name OR winning_player = :name
-            """,
-            {"name": name}
-        )
-        self._cursor.execute(
-            """
-            CREATE TABLE player_lost_matches AS
-            SELECT sl_id, winning_player as player, goal_balance
-            FROM player_matches
-            WHERE loser_player = :name
-            """,
-            {"name": name}
-        )
-        self._cursor.execute(
-            """
-            CREATE TABLE player_won_matches AS
-            SELECT sl_id, loser_player as player, goal_balance
-            FROM player_matches
-            WHERE winning_player = :name
-            """,
-            {"name": name}
-        )
-        self._cursor.execute(
-            """
-            CREATE TABLE player_scores AS
-            SELECT player, score
-            FROM (
-                SELECT sl_id, player, - goal_balance / 10.0 + (try_hard_factor - :player_try_hard_factor) - (goal_balance / (goal_balance - 0.000001)) * 0.5 + 0.5 as score
-                FROM player_lost_matches
-                INNER JOIN players
-                ON player_lost_matches.player = players.name
-                UNION ALL
-                SELECT sl_id, player, goal_balance / 10.0 + 1 - (:player_try_hard_factor - try_hard_factor) + (goal_balance / (goal_balance - 0.000001)) * 0.5 - 0.5 as score
-                FROM player_won_matches
-                INNER JOIN players
-                ON player_won_matches.player = players.name)
-            ORDER BY sl_id DESC
-            """,
-            {"player_try_hard_factor": self.get_player_try_hard_factor(name), "name": name})
-        self._cursor.execute(
-            """
-            CREATE TABLE player_recent_scores AS
-            WITH CT AS
-            (
-                SELECT *,
-                    row_number() OVER (PARTITION BY player) rn
-                FROM   player_scores 
-            )
-            SELECT CT.player, score
-            FROM   CT
-            JOIN   (SELECT DISTINCT player FROM player_scores) cp
-            ON     CT.player = cp.player
-            WHERE  rn <=10
-            """
-        )
-        self._cursor.execute(
-            """
-            SELECT AVG(avg_score)
-            FROM (
-                SELECT player, AVG(score) as avg_score
-                FROM player_recent_scores
-                GROUP BY player)
-            """)
-        player_score = self._cursor.fetchone()[0]
-        return 0 if player_score is None else round(player_score * 100, 2)
+        return self._sl_engine.get_player_points(name)
     
+    @_synchronized
+    def get_sl_head_to_head(self, player: str, opponent: str) -> HeadToHead:
+        return self._sl_engine.get_head_to_head(player, opponent)
+
+    @_synchronized
+    def get_player_sl_head_to_heads(self, player: str) -> Dict[str, HeadToHead]:
+        return self._sl_engine.get_player_head_to_heads(player)
+
+    @_synchronized
     def get_team_dl_points(self, player1: str, player2: str) -> float:
-        self._cursor.execute("DROP TABLE IF EXISTS team_matches")
-        self._cursor.execute(
-            """
-            CREATE TABLE team_matches AS
-            SELECT *
-            FROM double_league_matches
-            WHERE
-                (loser_player1 = :player1 AND loser_player2 = :player2)
-                OR (loser_player1 = :player2 AND loser_player2 = :player1)
-                OR (winning_player1 = :player1 AND winning_player2 = :player2)
-                OR (winning_player1 = :player2 AND winning_player2 = :player1)
-            """,
-            {"player1": player1, "player2": player2}
-        )
-        self._cursor.execute("DROP TABLE IF EXISTS team_lost_matches")
-        self._cursor.execute(
-            """
-            CREATE TABLE team_lost_matches AS
-            SELECT dl_id, winning_player1 as player1, winning_player2 as player2, goal_balance
-            FROM team_matches
-            WHERE
-                (loser_player1 = :player1 AND loser_player2 = :player2)
-                OR (loser_player1 = :player2 AND loser_player2 = :player1)
-            """,
-            {"player1": player1, "player2": player2}
-        )
-        self._cursor.execute("DROP TABLE IF EXISTS team_won_matches")
-        self._cursor.execute(
-            """
-            CREATE TABLE team_won_matches AS
-            SELECT dl_id, loser_player1 as player1, loser_player2 as player2, goal_balance
-            FROM team_matches
-            WHERE
-                (winning_player1 = :player1 AND winning_player2 = :player2)
-                OR (winning_player1 = :player2 AND winning_player2 = :player1)
-            """,
-            {"player1": player1, "player2": player2}
-        )
-        self._cursor.execute("DROP TABLE IF EXISTS team_scores")
-        self._cursor.execute(
-            """
-            CREATE TABLE team_scores AS
-            SELECT player1, player2, score
-            FROM (
-                SELECT dl_id, player1, player2, - goal_balance / 10.0 - (goal_balance / (goal_balance - 0.000001)) * 0.5 + 0.5 as score
-                FROM team_lost_matches
-                UNION
-                SELECT dl_id, player1, player2, goal_balance / 10.0 + 1 + (goal_balance / (goal_balance - 0.000001)) * 0.5 - 0.5 as score
-                FROM team_won_matches)
-            ORDER BY dl_id DESC
-            """)
-        self._cursor.execute("DROP TABLE IF EXISTS team_recent_scores")
-        self._cursor.execute(
-            """
-            CREATE TABLE team_recent_scores AS
-            WITH CT AS
-            (
-                SELECT *,
-                    row_number() OVER (PARTITION BY player1, player2) rn
-                FROM   team_scores 
-            )
-            SELECT CT.player1, CT.player2, score
-            FROM   CT
-            JOIN   (SELECT DISTINCT player1, player2 FROM team_scores) cp
-            ON     CT.player1 = cp.player1 AND CT.player2 = cp.player2
-            WHERE  rn <=10
-            """
-        )
-        self._cursor.execute(
-            """
-            SELECT AVG(avg_score)
-            FROM (
-                SELECT player1, player2, AVG(score) as avg_score
-                FROM team_recent_scores
-                GROUP BY player1, player2)
-            """)
-        team_score = self._cursor.fetchone()[0]
-        return 0 if team_score is None else round(team_score * 100, 2)
+        return self._team_standings.get_team_points(player1, player2)
 
+    @_synchronized
+    def get_teams_dl_points(self, teams: Optional[Iterable[Team]] = None) -> Dict[Team, float]:
+        return self._team_standings.get_teams_points(teams)
+
+    @_synchronized
+    def get_player_sl_rank(self, player: str) -> int:
+        return self._sl_leaderboard.rank_of(player)
+
+    @_synchronized
+    def get_top_sl_players(self, num: Optional[int] = None) -> List[Tuple[str, float]]:
+        return self._sl_leaderboard.top_k(num)
+
+    @_synchronized
+    def get_player_sl_rank_movement(self, player: str) -> int:
+        return self._sl_leaderboard.get_rank_movement(player)
+
+    @_synchronized
+    def get_player_dl_rank(self, player: str) -> int:
+        return self._dl_leaderboard.rank_of(player)
+
+    @_synchronized
+    def get_top_dl_players(self, num: Optional[int] = None) -> List[Tuple[str, float]]:
+        return self._dl_leaderboard.top_k(num)
+
+    @_synchronized
+    def get_player_dl_rank_movement(self, player: str) -> int:
+        return self._dl_leaderboard.get_rank_movement(player)
+
+    @_synchronized
     def get_player_try_hard_factor(self, name: str) -> int:
         self._cursor.execute(
             "SELECT try_hard_factor FROM players WHERE name = :name", {"name": name})
         return self._cursor.fetchone()[0]
 
+    def _get_players_try_hard_factors(self) -> Dict[str, float]:
+        self._cursor.execute("SELECT name, try_hard_factor FROM players")
+        return dict(self._cursor.fetchall())
+
+    @_changes_data
     def delete_dl_match(self, match_id: int) -> None:
-        with self._conn:
-            self._cursor.execute("DELETE FROM double_league_matches WHERE dl_id = :dl_id",
-                                 {"dl_id": match_id})
-        self._calculate_dl_points()
+        # the standings read the match from the store, so they drop it before the store does
+        match = self._team_standings.remove_match(match_id)
+        self._dl_matches.delete(match_id)
+        try:
+            with self._conn:
+                self._cursor.execute("DELETE FROM double_league_matches WHERE dl_id = :dl_id",
+                                     {"dl_id": match_id})
+                self._replay_dl_points_from(match_id)
+        except Exception:
+            self._load_season_matches()
+            self._load_dl_points()
+            raise
+        changed_players = self._update_dl_leaderboard(self._player_to_dl_points)
+        if match is None:
+            self._publish_change(dl_players=frozenset(changed_players))
+            return
+        players = (match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2)
+        self._publish_change(dl_players=frozenset([*players, *changed_players]),
+                             teams=frozenset([team(*players[:2]), team(*players[2:])]), deleted_dl_matches=(match_id,))
 
+    @_changes_data
     def delete_sl_match(self, match_id: int) -> None:
         with self._conn:
             self._cursor.execute("DELETE FROM single_league_matches WHERE sl_id = :sl_id",
                                  {"sl_id": match_id})
+        match = self._sl_engine.remove_match(match_id)
+        self._sl_matches.delete(match_id)
+        if match is None:
+            self._publish_change()
+            return
+        players = (match.winning_player, match.loser_player)
+        self._update_sl_leaderboard(players)
+        self._publish_change(sl_players=frozenset(players), deleted_sl_matches=(match_id,))
 
+    @_synchronized
     def get_player_dl_points(self, player: str) -> float:
         return round(self._player_to_dl_points[player], 2)
+
+    @_synchronized
+    def get_player_dl_points_after_match(self, player: str, dl_id: int) -> float:
+        self._cursor.execute("SELECT MAX(last_dl_id) FROM seasons")
+        last_archived_dl_id = self._cursor.fetchone()[0]
+        if last_archived_dl_id is None or dl_id > last_archived_dl_id:
+            rating_history = 'dl_rating_history'
+        else:
+            # the match belongs to a closed season, its rating history was moved to the archive
+            self._attach_archive()
+            rating_history = 'archive.dl_rating_history'
+        player_id = self._get_player_id(player)
+        self._cursor.execute(
+            f"""SELECT dl_points FROM {rating_history} WHERE player_id = :player_id AND dl_id <= :dl_id
+            ORDER BY dl_id DESC LIMIT 1""",
+            {"player_id": player_id, "dl_id": dl_id})
+        record = self._cursor.fetchone()
+        if record is not None:
+            return round(record[0], 2)
+        # the player had no DL matches yet, so they had the starting points of the season of the match
+        self._cursor.execute(
+            """SELECT COALESCE(
+            (SELECT dl_points FROM season_standings WHERE player_id = :player_id
+             AND season_id = (SELECT MAX(season_id) FROM seasons WHERE last_dl_id < :dl_id)),
+            (SELECT starting_dl_points FROM players WHERE player_id = :player_id))""",
+            {"player_id": player_id, "dl_id": dl_id})
+        return round(float(self._cursor.fetchone()[0]), 2)
+
+    @_synchronized
+    def get_player_dl_rating_history(self, player: str, all_seasons: bool = False) -> List[Tuple[int, float]]:
+        query = "SELECT dl_id, dl_points FROM dl_rating_history WHERE player_id = :player_id"
+        if all_seasons:
+            self._attach_archive()
+            query = f"""SELECT dl_id, dl_points FROM archive.dl_rating_history WHERE player_id = :player_id
+            UNION ALL {query}"""
+        self._cursor.execute(f"{query} ORDER BY dl_id ASC", {"player_id": self._get_player_id(player)})
+        return [(dl_id, round(dl_points, 2)) for dl_id, dl_points in self._cursor.fetchall()]
+
+    @_synchronized
+    def get_player_lowest_and_peak_dl_points(self, player: str) -> Tuple[float, float]:
+        # of the current season
+        starting_dl_points = self._get_player_season_starting_dl_points(player)
+        self._cursor.execute(
+            "SELECT MIN(dl_points), MAX(dl_points) FROM dl_rating_history WHERE player_id = :player_id",
+            {"player_id": self._get_player_id(player)})
+        lowest, peak = self._cursor.fetchone()
+        if lowest is None:
+            return starting_dl_points, starting_dl_points
+        return round(min(lowest, starting_dl_points), 2), round(max(peak, starting_dl_points), 2)
+
+    @_synchronized
+    def simulate_dl_points(self, starting_dl_points_scenarios: Sequence[Dict[str, float]],
+                           constants: Optional[Sequence['RatingConstants']] = None) -> List[Dict[str, float]]:
+        # replays all matches for every scenario of starting points (missing players keep their own ones)
+        # and returns the final points without changing anything in the database
+        from dl_what_if import DEFAULT_RATING_CONSTANTS, DLMatchLog  # numpy is needed only here
+        if not starting_dl_points_scenarios:
+            return []
+        player_to_starting_dl_points = self._get_season_starting_dl_points()
+        match_log = DLMatchLog.from_match_store(list(player_to_starting_dl_points), self._dl_matches)
+        starting_points = [[round(float(scenario.get(player, starting_dl_points)), 2)
+                            for player, starting_dl_points in player_to_starting_dl_points.items()]
+                           for scenario in starting_dl_points_scenarios]
+        final_points = match_log.replay(
+            starting_points, DEFAULT_RATING_CONSTANTS if constants is None else constants)
+        return [{player: round(float(points), 2) for player, points in zip(match_log.players, scenario_points)}
+                for scenario_points in final_points]
+
+    @_synchronized
+    def predict_dl_matchups(self, players: Sequence[str], goal_balance: Optional[int] = None,
+                            num: Optional[int] = None) -> 'MatchupPredictions':
+        from dl_predictions import AVERAGE_GOAL_BALANCE, predict_matchups  # numpy is needed only here
+        return predict_matchups({player: self.get_player_dl_points(player) for player in players},
+                                AVERAGE_GOAL_BALANCE if goal_balance is None else goal_balance, num)
+
+    @_synchronized
+    def get_dl_match_rating_deltas(self, dl_id: int) -> Dict[str, float]:
+        self._cursor.execute(
+            """SELECT name, delta FROM dl_rating_history
+            INNER JOIN players ON players.player_id = dl_rating_history.player_id WHERE dl_id = :dl_id""",
+            {"dl_id": dl_id})
+        return {player: round(delta, 2) for player, delta in self._cursor.fetchall()}
             
+    @_changes_data
+    def close_season(self, name: str) -> Season:
+        # moves matches of the current season to the archive and freezes final points of all players,
+        # DL points carry over to the next season, SL points and team points start from scratch
+        self._attach_archive()
+        self._cursor.execute("SELECT MAX(sl_id) FROM single_league_matches")
+        last_sl_id = self._cursor.fetchone()[0]
+        self._cursor.execute("SELECT MAX(dl_id) FROM double_league_matches")
+        last_dl_id = self._cursor.fetchone()[0]
+        with self._conn:
+            self._cursor.execute(
+                "INSERT INTO seasons(name, last_sl_id, last_dl_id) VALUES (:name, :last_sl_id, :last_dl_id)",
+                {"name": name, "last_sl_id": last_sl_id, "last_dl_id": last_dl_id})
+            season_id = self._cursor.lastrowid
+            self._cursor.executemany(
+                """INSERT INTO season_standings VALUES
+                (:season_id, (SELECT player_id FROM players WHERE name = :player), :dl_points, :sl_points)""",
+                [{"season_id": season_id, "player": player, "dl_points": dl_points,
+                  "sl_points": self.get_player_sl_points(player)}
+                 for player, dl_points in self._player_to_dl_points.items()])
+            # in WAL mode the archive is committed separately from the main database, archived rows
+            # are replaced, so closing the season again after a failed commit doesn't duplicate them
+            self._cursor.execute(
+                """INSERT OR REPLACE INTO archive.single_league_matches
+                (sl_id, season_id, winning_player_id, loser_player_id, goal_balance)
+                SELECT sl_id, :season_id, winning_player_id, loser_player_id, goal_balance FROM single_league_matches""",
+                {"season_id": season_id})
+            self._cursor.execute(
+                """INSERT OR REPLACE INTO archive.double_league_matches
+                (dl_id, season_id, winning_player1_id, winning_player2_id, loser_player1_id, loser_player2_id,
+                goal_balance)
+                SELECT dl_id, :season_id, winning_player1_id, winning_player2_id, loser_player1_id, loser_player2_id,
+                goal_balance FROM double_league_matches""",
+                {"season_id": season_id})
+            self._cursor.execute(
+                """INSERT OR REPLACE INTO archive.dl_rating_history
+                SELECT player_id, dl_id, delta, dl_points FROM dl_rating_history""")
+            for table in ('single_league_matches', 'double_league_matches', 'dl_rating_history',
+                          'dl_points_checkpoints'):
+                self._cursor.execute(f"DELETE FROM {table}")
+            self._last_dl_id = 0
+            self._dl_matches_since_checkpoint = 0
+            self._save_current_dl_points(self._player_to_dl_points)
+        self._load_season_matches()
+        self._update_sl_leaderboard(self._player_to_dl_points)
+        self._publish_change(is_full=True)
+        return Season(season_id, name, last_sl_id, last_dl_id)
+
+    @_synchronized
+    def get_seasons(self) -> List[Season]:
+        self._cursor.execute("SELECT season_id, name, last_sl_id, last_dl_id FROM seasons ORDER BY season_id ASC")
+        return [Season(*record) for record in self._cursor.fetchall()]
+
+    @_synchronized
+    def get_season_standings(self, season_id: int) -> List[SeasonStanding]:
+        self._cursor.execute(
+            """SELECT name, dl_points, sl_points FROM season_standings INNER JOIN players USING (player_id)
+            WHERE season_id = :season_id ORDER BY dl_points DESC, name ASC""",
+            {"season_id": season_id})
+        return [SeasonStanding(name, round(dl_points, 2), sl_points)
+                for name, dl_points, sl_points in self._cursor.fetchall()]
+
+    @_synchronized
+    def get_archived_single_league_matches(self, season_id: Optional[int] = None) -> List[SingleLeagueMatch]:
+        # matches of closed seasons, of all of them if season_id is None
+        self._attach_archive()
+        self._cursor.execute(
+            f"{ARCHIVED_SL_MATCHES_QUERY} WHERE :season_id IS NULL OR season_id = :season_id ORDER BY sl_id ASC",
+            {"season_id": season_id})
+        return [SingleLeagueMatch(*record) for record in self._cursor.fetchall()]
+
+    @_synchronized
+    def get_archived_double_league_matches(self, season_id: Optional[int] = None) -> List[DoubleLeagueMatch]:
+        self._attach_archive()
+        self._cursor.execute(
+            f"{ARCHIVED_DL_MATCHES_QUERY} WHERE :season_id IS NULL OR season_id = :season_id ORDER BY dl_id ASC",
+            {"season_id": season_id})
+        return [DoubleLeagueMatch(*record) for record in self._cursor.fetchall()]
+
+    def _attach_archive(self) -> None:
+        # the archive is attached only once history of closed seasons is needed
+        if self._is_archive_attached:
+            return
+        self._cursor.execute("ATTACH DATABASE :archive_name AS archive", {"archive_name": self._archive_name})
+        with self._conn:
+            create_archive_tables(self._cursor, 'archive')
+        self._is_archive_attached = True
+
+    def _load_season_matches(self) -> None:
+        self._sl_matches = MatchStore(SingleLeagueMatchView)
+        self._append_matches(self._sl_matches, SL_MATCH_RECORDS_QUERY, 'sl_id', 0)
+        self._dl_matches = MatchStore(DoubleLeagueMatchView)
+        self._append_matches(self._dl_matches, DL_MATCH_RECORDS_QUERY, 'dl_id', 0)
+        self._sl_engine = SingleLeagueEngine(self._get_players_try_hard_factors(), self._sl_matches)
+        self._team_standings = TeamStandings(self._dl_matches)
+
+    def _get_season_starting_dl_points(self) -> Dict[str, float]:
+        self._cursor.execute(SEASON_STARTING_DL_POINTS_QUERY)
+        return {name: round(float(points), 2) for name, points in self._cursor.fetchall()}
+
+    def _get_player_season_starting_dl_points(self, player: str) -> float:
+        self._cursor.execute(f"{SEASON_STARTING_DL_POINTS_QUERY} WHERE name = :name", {"name": player})
+        return round(float(self._cursor.fetchone()[1]), 2)
+
+    def _update_sl_leaderboard(self, players: Iterable[str]) -> List[str]:
+        return self._sl_leaderboard.update({player: self.get_player_sl_points(player) for player in players})
+
+    def _update_dl_leaderboard(self, players: Iterable[str]) -> List[str]:
+        return self._dl_leaderboard.update({player: self.get_player_dl_points(player) for player in players})
+
+    def _publish_change(self, **change_fields) -> None:
+        self._data_version += 1
+        change = LeagueChange(self._data_version, **change_fields)
+        for subscriber in list(self._subscribers):
+            subscriber(change)
+
     def _update_player_dl_points(self, name: str, new_points: float) -> None:
         self._player_to_dl_points[name] = new_points
 
-    def _update_dl_points_after_match(self, match: DoubleLeagueMatch) -> None:
-        winning_player1_points = self.get_player_dl_points(match.winning_player1)
-        winning_player2_points = self.get_player_dl_points(match.winning_player2)
-        loser_player1_points = self.get_player_dl_points(match.loser_player1)
-        loser_player2_points = self.get_player_dl_points(match.loser_player2)
+    def _update_dl_points_after_match(self, players: Sequence[str], goal_balance: int) -> None:
+        winning_player1, winning_player2, loser_player1, loser_player2 = players
+        winning_player1_points = self.get_player_dl_points(winning_player1)
+        winning_player2_points = self.get_player_dl_points(winning_player2)
+        loser_player1_points = self.get_player_dl_points(loser_player1)
+        loser_player2_points = self.get_player_dl_points(loser_player2)
         winning_player2_ratio = calculate_ratio(winning_player1_points, winning_player2_points)
         winning_player1_ratio = 1 - winning_player2_ratio
         loser_player1_ratio = calculate_ratio(loser_player1_points, loser_player2_points)
         loser_player2_ratio = 1 - loser_player1_ratio
         diff = calculate_diff(winning_player1_points, winning_player2_points, loser_player1_points, loser_player2_points)
-        points_to_add = calculate_moved_points(diff, match.goal_balance)
-        self._update_player_dl_points(match.winning_player1, winning_player1_points + winning_player1_ratio * points_to_add)
-        self._update_player_dl_points(match.winning_player2, winning_player2_points + winning_player2_ratio * points_to_add)
-        self._update_player_dl_points(match.loser_player1, loser_player1_points - loser_player1_ratio * points_to_add)
-        self._update_player_dl_points(match.loser_player2, loser_player2_points - loser_player2_ratio * points_to_add)
-
-    def _calculate_dl_points(self) -> None:
-        self._player_to_dl_points = {player: self.get_player_starting_dl_points(player)
-                                     for player in self.get_player_names()}
-        for match in self.get_double_league_matches(order=Order.asc):
-            self._update_dl_points_after_match(match)
+        points_to_add = calculate_moved_points(diff, goal_balance)
+        self._update_player_dl_points(winning_player1, winning_player1_points + winning_player1_ratio * points_to_add)
+        self._update_player_dl_points(winning_player2, winning_player2_points + winning_player2_ratio * points_to_add)
+        self._update_player_dl_points(loser_player1, loser_player1_points - loser_player1_ratio * points_to_add)
+        self._update_player_dl_points(loser_player2, loser_player2_points - loser_player2_ratio * points_to_add)
+
+    def _load_dl_points(self) -> None:
+        # starts from the stored current points and replays only matches recorded after them,
+        # falls back to replaying everything if the stored points don't match the database
+        last_dl_id = self._load_current_dl_points()
+        if last_dl_id is None:
+            self._calculate_dl_points(from_dl_id=0)
+            return
+        self._cursor.execute(
+            "SELECT COUNT(*) FROM double_league_matches WHERE dl_id > :checkpoint_dl_id AND dl_id <= :dl_id",
+            {"checkpoint_dl_id": self._get_dl_checkpoint_id(None), "dl_id": last_dl_id})
+        self._dl_matches_since_checkpoint = self._cursor.fetchone()[0]
+        with self._conn:
+            self._replay_dl_matches_after(last_dl_id)
+
+    def _calculate_dl_points(self, from_dl_id: int = 0) -> None:
+        with self._conn:
+            self._replay_dl_points_from(from_dl_id)
+
+    def _replay_dl_points_from(self, from_dl_id: int) -> None:
+        # replays matches from the latest checkpoint taken before match from_dl_id,
+        # checkpoints after it are dropped and saved again on the way, so is the rating history from from_dl_id.
+        # Runs in the transaction of the change which made it necessary, so stored points never outlive the change
+        checkpoint_dl_id = self._get_dl_checkpoint_id(from_dl_id)
+        self._player_to_dl_points = self._get_season_starting_dl_points()
+        self._player_to_dl_points.update(self._get_dl_checkpoint(checkpoint_dl_id))
+        self._dl_matches_since_checkpoint = 0
+        self._cursor.execute("DELETE FROM dl_points_checkpoints WHERE dl_id > :dl_id", {"dl_id": checkpoint_dl_id})
+        self._cursor.execute("DELETE FROM dl_rating_history WHERE dl_id >= :dl_id", {"dl_id": from_dl_id})
+        self._replay_dl_matches_after(checkpoint_dl_id)
+
+    def _replay_dl_matches_after(self, dl_id: int) -> None:
+        self._last_dl_id = dl_id
+        rating_history = []
+        for match_id, players, goal_balance in self._dl_matches.get_records_after(dl_id):
+            rating_history.extend(self._replay_dl_match(match_id, players, goal_balance))
+            if len(rating_history) >= DL_RATING_HISTORY_CHUNK_SIZE:
+                self._save_dl_rating_history(rating_history)
+                rating_history = []
+        self._save_dl_rating_history(rating_history)
+        self._save_current_dl_points(self._player_to_dl_points)
+
+    def _replay_dl_match(self, dl_id: int, players: Sequence[str],
+                         goal_balance: int) -> List[Dict[str, Union[str, int, float]]]:
+        points_before_match = {player: self.get_player_dl_points(player) for player in players}
+        self._update_dl_points_after_match(players, goal_balance)
+        self._last_dl_id = dl_id
+        self._dl_matches_since_checkpoint += 1
+        if self._dl_matches_since_checkpoint == DL_CHECKPOINT_INTERVAL:
+            self._save_dl_checkpoint(dl_id)
+        return [{"player": player, "dl_id": dl_id,
+                 "delta": self._player_to_dl_points[player] - points_before_match[player],
+                 "dl_points": self._player_to_dl_points[player]} for player in players]
+
+    def _save_dl_rating_history(self, rating_history: List[Dict[str, Union[str, int, float]]]) -> None:
+        # rows of replayed matches may already be there, e.g. ones between a checkpoint and a deleted match
+        self._cursor.executemany(
+            """INSERT OR REPLACE INTO dl_rating_history VALUES
+            ((SELECT player_id FROM players WHERE name = :player), :dl_id, :delta, :dl_points)""", rating_history)
+
+    def _load_current_dl_points(self) -> Optional[int]:
+        self._cursor.execute("SELECT last_dl_id, num_dl_matches FROM current_dl_points_state")
+        record = self._cursor.fetchone()
+        if record is None:
+            return None
+        last_dl_id, num_dl_matches = record
+        self._cursor.execute("SELECT dl_id FROM double_league_matches WHERE dl_id = :dl_id", {"dl_id": last_dl_id})
+        if last_dl_id != 0 and self._cursor.fetchone() is None:
+            return None
+        # a match deleted or inserted before last_dl_id without replaying the matches after it
+        self._cursor.execute("SELECT COUNT(*) FROM double_league_matches WHERE dl_id <= :dl_id", {"dl_id": last_dl_id})
+        if self._cursor.fetchone()[0] != num_dl_matches:
+            return None
+        if self._get_dl_checkpoint_id(None) > last_dl_id:
+            return None
+        # checkpoints after a deleted match are dropped together with it
+        self._cursor.execute(
+            "SELECT 1 FROM dl_points_checkpoints WHERE dl_id NOT IN (SELECT dl_id FROM double_league_matches) LIMIT 1")
+        if self._cursor.fetchone() is not None:
+            return None
+        self._cursor.execute("SELECT MAX(dl_id) FROM dl_rating_history")
+        if (self._cursor.fetchone()[0] or 0) != last_dl_id:
+            return None
+        self._cursor.execute(
+            """SELECT name, dl_points FROM current_dl_points
+            INNER JOIN players ON players.player_id = current_dl_points.player_id""")
+        player_to_dl_points = dict(self._cursor.fetchall())
+        if set(player_to_dl_points) != set(self.get_player_names()):
+            return None
+        self._player_to_dl_points = player_to_dl_points
+        return last_dl_id
+
+    def _save_current_dl_points(self, players: Iterable[str]) -> None:
+        self._cursor.executemany(
+            """INSERT OR REPLACE INTO current_dl_points VALUES
+            ((SELECT player_id FROM players WHERE name = :player), :dl_points)""",
+            [{"player": player, "dl_points": self._player_to_dl_points[player]} for player in players])
+        self._cursor.execute("DELETE FROM current_dl_points_state")
+        # points are saved once all recorded matches are replayed, matches recorded by other means
+        # in the meantime only make the next load replay everything
+        self._cursor.execute(
+            "INSERT INTO current_dl_points_state VALUES (:dl_id, (SELECT COUNT(*) FROM double_league_matches))",
+            {"dl_id": self._last_dl_id})
+
+    def _get_dl_checkpoint_id(self, before_dl_id: Optional[int]) -> int:
+        if before_dl_id is None:
+            self._cursor.execute("SELECT MAX(dl_id) FROM dl_points_checkpoints")
+        else:
+            self._cursor.execute("SELECT MAX(dl_id) FROM dl_points_checkpoints WHERE dl_id < :dl_id",
+                                 {"dl_id": before_dl_id})
+        checkpoint_dl_id = self._cursor.fetchone()[0]
+        return 0 if checkpoint_dl_id is None else checkpoint_dl_id
+
+    def _get_dl_checkpoint(self, dl_id: int) -> Dict[str, float]:
+        # points of a player at a checkpoint are in their latest row up to it,
+        # players without one still have their starting points
+        self._cursor.execute(
+            """SELECT name, dl_points FROM (
+                SELECT name, (SELECT dl_points FROM dl_points_checkpoints
+                              WHERE player_id = players.player_id AND dl_id <= :dl_id
+                              ORDER BY dl_id DESC LIMIT 1) AS dl_points
+                FROM players)
+            WHERE dl_points IS NOT NULL""",
+            {"dl_id": dl_id})
+        return dict(self._cursor.fetchall())
+
+    def _save_dl_checkpoint(self, dl_id: int) -> None:
+        # only players of matches since the previous checkpoint are saved, points of others didn't change
+        changed_players = set()
+        for match_id, players, _ in self._dl_matches.get_records_after(self._get_dl_checkpoint_id(dl_id)):
+            if match_id > dl_id:
+                break
+            changed_players.update(players)
+        self._cursor.executemany(
+            """INSERT OR REPLACE INTO dl_points_checkpoints (player_id, dl_id, dl_points) VALUES
+            ((SELECT player_id FROM players WHERE name = :player), :dl_id, :dl_points)""",
+            [{"dl_id": dl_id, "player": player, "dl_points": self._player_to_dl_points[player]}
+             for player in changed_players])
+        self._dl_matches_since_checkpoint = 0
+
+    def _append_matches(self, match_store: MatchStore, match_records_query: str, id_column: str,
+                        after_id: int) -> None:
+        # matches are read with ids of their players, their names are looked up once per player
+        self._cursor.execute("SELECT player_id, name FROM players")
+        player_names = dict(self._cursor.fetchall())
+        self._cursor.execute(f"{match_records_query} WHERE {id_column} > :id ORDER BY {id_column} ASC",
+                             {"id": after_id})
+        match_store.extend_with_player_ids(self._cursor.fetchall(), player_names)
+
+    def _import_matches(self, league: str, source: str, lines: Iterable[Tuple[int, Union[SingleLeagueMatch, DoubleLeagueMatch]]],
+                        skip_imported: bool, insert_query: str) -> int:
+        # lines are identified by their content and the resolved path of their file, so lines moved or added
+        # within the file are told apart from imported ones and importing the file again through a relative path
+        # or a symlink skips them as well. The n-th line with the same match is skipped if it was imported n times
+        source = os.path.realpath(source)
+        imported_match_lines: Dict[str, int] = {}
+        imported_line_numbers: Set[int] = set()
+        if skip_imported:
+            imported_match_lines = self._get_imported_match_lines(league, source)
+            # lines imported before they were identified by content, they're identified by content from now on
+            imported_line_numbers = self._get_imported_line_numbers(league, source)
+        numbered_lines = _number_match_lines(lines)
+        imported = 0
+        while chunk := list(islice(numbered_lines, IMPORT_CHUNK_SIZE)):
+            new_matches = [vars(match) for line_number, match_line, occurrence, match in chunk
+                           if occurrence > imported_match_lines.get(match_line, 0)
+                           and line_number not in imported_line_numbers]
+            self._cursor.executemany(insert_query, new_matches)
+            self._cursor.executemany(
+                "INSERT OR IGNORE INTO imported_matches VALUES (:league, :source, :match_line, :occurrence)",
+                [{"league": league, "source": source, "match_line": match_line, "occurrence": occurrence}
+                 for _, match_line, occurrence, _ in chunk])
+            imported += len(new_matches)
+        self._cursor.execute("DELETE FROM imported_match_lines WHERE league = :league AND source = :source",
+                             {"league": league, "source": source})
+        return imported
+
+    def _get_imported_match_lines(self, league: str, source: str) -> Dict[str, int]:
+        # how many times every line was imported from the file
+        self._cursor.execute(
+            """SELECT match_line, MAX(occurrence) FROM imported_matches WHERE league = :league AND source = :source
+            GROUP BY match_line""",
+            {"league": league, "source": source})
+        return dict(self._cursor.fetchall())
+
+    def _get_imported_line_numbers(self, league: str, source: str) -> Set[int]:
+        self._cursor.execute("SELECT line_number FROM imported_match_lines WHERE league = :league AND source = :source",
+                             {"league": league, "source": source})
+        return {record[0] for record in self._cursor.fetchall()}
+
+    def _get_player_first_dl_match_id(self, player: str) -> Optional[int]:
+        self._cursor.execute(
+            """
+            SELECT MIN(dl_id) FROM double_league_matches
+            WHERE (winning_player1_id = :player_id OR winning_player2_id = :player_id
+                   OR loser_player1_id = :player_id OR loser_player2_id = :player_id)
+            """,
+            {"player_id": self._get_player_id(player)})
+        return self._cursor.fetchone()[0]
+
+    def _get_player_id(self, player: str) -> Optional[int]:
+        self._cursor.execute("SELECT player_id FROM players WHERE name = :name", {"name": player})
+        record = self._cursor.fetchone()
+        return None if record is None else record[0]
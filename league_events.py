@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Tuple
+
+from team_standings import Team
+
+
+@dataclass(frozen=True)
+class LeagueChange:
+    # published by LeagueDatabase after every change of the league, data versions grow by one with every change
+    data_version: int
+    # players whose SL or DL points or matches changed, their ranks may have changed as well
+    sl_players: FrozenSet[str] = frozenset()
+    dl_players: FrozenSet[str] = frozenset()
+    # teams whose DL points changed, including teams which no longer have any matches
+    teams: FrozenSet[Team] = frozenset()
+    added_sl_matches: Tuple[int, ...] = ()
+    deleted_sl_matches: Tuple[int, ...] = ()
+    added_dl_matches: Tuple[int, ...] = ()
+    deleted_dl_matches: Tuple[int, ...] = ()
+    added_players: Tuple[str, ...] = ()
+    # (old name, new name) of renamed players
+    renamed_players: Tuple[Tuple[str, str], ...] = ()
+    # players whose try hard factor or starting DL points changed
+    updated_players: FrozenSet[str] = frozenset()
+    # anything may have changed, e.g. after importing matches or closing a season
+    is_full: bool = False
+
+    def get_players(self) -> FrozenSet[str]:
+        # players whose data changed in any way, by their names after the change
+        return (self.sl_players | self.dl_players | self.updated_players | frozenset(self.added_players)
+                | frozenset(new_name for _, new_name in self.renamed_players))
+
+
+LeagueChangeSubscriber = Callable[[LeagueChange], None]
@@ -0,0 +1,141 @@
+import csv
+from dataclasses import dataclass
+import json
+import os
+import sqlite3
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import zipfile
+
+from league_database import DL_MATCHES_QUERY, SL_MATCHES_QUERY
+from statistics_queries import get_dl_points, get_sl_points
+
+
+EXPORT_CHUNK_SIZE = 1000
+
+Chunks = Iterator[List[Tuple]]
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    columns: Tuple[str, ...]
+    # 'int', 'float' or 'text' for every column, used by formats with typed columns
+    types: Tuple[str, ...]
+    # query of rows with id (the first column) greater than :after_id, None for tables computed in python
+    query: Optional[str] = None
+    compute: Optional[Callable[[sqlite3.Connection], List[Tuple]]] = None
+
+    def is_incremental(self) -> bool:
+        return self.query is not None
+
+
+def _get_standings(player_to_points: Dict[str, float]) -> List[Tuple]:
+    players = sorted(player_to_points, key=lambda player: (-player_to_points[player], player))
+    return [(rank, player, player_to_points[player]) for rank, player in enumerate(players, start=1)]
+
+
+EXPORT_TABLES = {
+    'players': ExportTable(
+        ('player_id', 'name', 'starting_dl_points', 'try_hard_factor'), ('int', 'text', 'float', 'float'),
+        query="""SELECT player_id, name, starting_dl_points, try_hard_factor FROM players
+        WHERE player_id > :after_id ORDER BY player_id ASC"""),
+    'sl_matches': ExportTable(
+        ('sl_id', 'winning_player', 'loser_player', 'goal_balance'), ('int', 'text', 'text', 'int'),
+        query=f"{SL_MATCHES_QUERY} WHERE sl_id > :after_id ORDER BY sl_id ASC"),
+    'dl_matches': ExportTable(
+        ('dl_id', 'winning_player1', 'winning_player2', 'loser_player1', 'loser_player2', 'goal_balance'),
+        ('int', 'text', 'text', 'text', 'text', 'int'),
+        query=f"{DL_MATCHES_QUERY} WHERE dl_id > :after_id ORDER BY dl_id ASC"),
+    'sl_standings': ExportTable(
+        ('rank', 'player', 'sl_points'), ('int', 'text', 'float'),
+        compute=lambda conn: _get_standings(get_sl_points(conn))),
+    'dl_standings': ExportTable(
+        ('rank', 'player', 'dl_points'), ('int', 'text', 'float'),
+        compute=lambda conn: _get_standings(get_dl_points(conn))),
+}
+
+
+def iter_chunks(conn: sqlite3.Connection, table: ExportTable, after_id: int = 0,
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Chunks:
+    if table.query is None:
+        rows = table.compute(conn)
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+        return
+    cursor = conn.execute(table.query, {"after_id": after_id})
+    while chunk := cursor.fetchmany(chunk_size):
+        yield chunk
+
+
+def _write_csv(file_name: str, table: ExportTable, chunks: Chunks) -> Chunks:
+    with open(file_name, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(table.columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            yield chunk
+
+
+def _write_jsonl(file_name: str, table: ExportTable, chunks: Chunks) -> Chunks:
+    with open(file_name, 'w') as file:
+        for chunk in chunks:
+            file.writelines(f"{json.dumps(dict(zip(table.columns, row)))}\n" for row in chunk)
+            yield chunk
+
+
+def _get_max_name_length(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT MAX(LENGTH(name)) FROM players").fetchone()[0] or 1
+
+
+def _write_npz(file_name: str, table: ExportTable, chunks: Chunks, max_name_length: int) -> Chunks:
+    # every column is an array of the archive, columns are streamed to temporary files first,
+    # since the header of an array needs the number of rows
+    import numpy as np  # numpy is needed only here
+    dtypes = [np.dtype({'int': '<i8', 'float': '<f8', 'text': f'<U{max_name_length}'}[column_type])
+              for column_type in table.types]
+    column_files = [tempfile.TemporaryFile() for _ in table.columns]
+    num_rows = 0
+    try:
+        for chunk in chunks:
+            for column, (column_file, dtype) in enumerate(zip(column_files, dtypes)):
+                column_file.write(np.array([row[column] for row in chunk], dtype=dtype).tobytes())
+            num_rows += len(chunk)
+            yield chunk
+        with zipfile.ZipFile(file_name, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name, column_file, dtype in zip(table.columns, column_files, dtypes):
+                column_file.seek(0)
+                with archive.open(f"{name}.npy", 'w', force_zip64=True) as array_file:
+                    np.lib.format.write_array_header_1_0(
+                        array_file, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                                     'shape': (num_rows,)})
+                    while data := column_file.read(1 << 20):
+                        array_file.write(data)
+    finally:
+        for column_file in column_files:
+            column_file.close()
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'npz')
+
+
+def export_table(conn: sqlite3.Connection, table_name: str, file_name: str, file_format: Optional[str] = None,
+                 after_id: int = 0, chunk_size: int = EXPORT_CHUNK_SIZE) -> Optional[int]:
+    # writes rows of the table with ids greater than after_id (all rows of computed tables),
+    # returns id of the last written row to continue from, or None if nothing was written
+    table = EXPORT_TABLES[table_name]
+    if after_id and not table.is_incremental():
+        raise ValueError(f"{table_name} can't be exported incrementally")
+    file_format = file_format or os.path.splitext(file_name)[1].lstrip('.')
+    chunks = iter_chunks(conn, table, after_id, chunk_size)
+    if file_format == 'csv':
+        chunks = _write_csv(file_name, table, chunks)
+    elif file_format == 'jsonl':
+        chunks = _write_jsonl(file_name, table, chunks)
+    elif file_format == 'npz':
+        chunks = _write_npz(file_name, table, chunks, _get_max_name_length(conn))
+    else:
+        raise ValueError(f"unknown export format '{file_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+    last_id = None
+    for chunk in chunks:
+        last_id = chunk[-1][0]
+    return last_id if table.is_incremental() else None
@@ -1,12 +1,30 @@
-from typing import Callable
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, List, Sequence, Tuple
 
-from PyQt5.QtWidgets import QPushButton, QStackedWidget, QTableWidget, QWidget
+from PyQt5.QtWidgets import QComboBox, QLabel, QPushButton, QStackedWidget, QWidget
 
 from constants import SECTION_TITLE_FONT
 from league_database import LeagueDatabase
+from league_events import LeagueChange
+from match_store import MatchView
+from table_models import ColumnarTableModel, create_table_view, update_sorted_rows
 from utils import create_label
 
 
+RECENT_MATCHES_NUM = 10
+
+
+def _standing_key(values: Sequence[Any]) -> Tuple[float, str]:
+    # the order of leaderboards, descending points and ties by name
+    return (-values[1], values[0])
+
+
+def _insert_name(name_box: QComboBox, name: str) -> None:
+    # names are in the order of LeagueDatabase.get_player_names
+    names = [name_box.itemText(index) for index in range(name_box.count())]
+    name_box.insertItem(bisect_left(names, name), name)
+
+
 class LeagueMenu(QWidget):
     def __init__(self, window: QStackedWidget, database: LeagueDatabase):
         super().__init__()
@@ -18,14 +36,68 @@ class LeagueMenu(QWidget):
         return_button.clicked.connect(return_action)
         self._layout.addWidget(return_button)
 
-    def _add_recent_matches_table(self) -> QTableWidget:
+    def _add_loading_label(self) -> QLabel:
+        loading_label = create_label("Loading...")
+        loading_label.hide()
+        self._layout.addWidget(loading_label)
+        return loading_label
+
+    def _add_recent_matches_table(self, headers: Tuple[str, ...],
+                                  delete_match: Callable[[int], None]) -> ColumnarTableModel:
+        # delete_match is called with the id of the match whose "Delete" cell was clicked
         self._layout.addWidget(create_label("Recent Matches", SECTION_TITLE_FONT))
-        recent_matches = QTableWidget()
-        self._layout.addWidget(recent_matches)
+        recent_matches = ColumnarTableModel(headers + ('',))
+        self._layout.addWidget(create_table_view(
+            recent_matches, len(headers), lambda row: delete_match(recent_matches.row_id(row))))
         return recent_matches
 
-    def _add_player_statistics_table(self) -> QTableWidget:
+    def _add_player_statistics_table(self) -> ColumnarTableModel:
         self._layout.addWidget(create_label("Players Statistics", SECTION_TITLE_FONT))
-        players_statistics = QTableWidget()
-        self._layout.addWidget(players_statistics)
+        players_statistics = ColumnarTableModel(('Name', 'Points'))
+        self._layout.addWidget(create_table_view(players_statistics))
         return players_statistics
+
+    def _to_recent_match_row(self, match: MatchView) -> List[Any]:
+        return [*match.players(), match.goal_balance, "Delete"]
+
+    def _update_players_statistics(self, players: Iterable[str], renamed_players: Sequence[Tuple[str, str]],
+                                   get_points: Callable[[str], float]) -> None:
+        rows = {old_name: None for old_name, _ in renamed_players}
+        rows.update({player: (player, get_points(player))
+                     for player in [*players, *(new_name for _, new_name in renamed_players)]})
+        update_sorted_rows(self._players_statistics, rows, _standing_key)
+
+    def _update_recent_matches(self, added: Sequence[int], deleted: Sequence[int],
+                               renamed_players: Sequence[Tuple[str, str]],
+                               get_recent_matches: Callable[[int], List[MatchView]]) -> None:
+        recent_matches = self._recent_matches
+        for match_id in deleted:
+            row = recent_matches.row_of(match_id)
+            if row is not None:
+                recent_matches.remove_row(row)
+        # added matches are the most recent ones
+        for match in reversed(get_recent_matches(len(added)) if added else []):
+            recent_matches.insert_row(0, self._to_recent_match_row(match), match.id)
+        while recent_matches.rowCount() > RECENT_MATCHES_NUM:
+            recent_matches.remove_row(recent_matches.rowCount() - 1)
+        if deleted and recent_matches.rowCount() < RECENT_MATCHES_NUM:
+            for match in get_recent_matches(RECENT_MATCHES_NUM)[recent_matches.rowCount():]:
+                recent_matches.insert_row(recent_matches.rowCount(), self._to_recent_match_row(match), match.id)
+        for old_name, new_name in renamed_players:
+            for row in range(recent_matches.rowCount()):
+                values = recent_matches.get_row(row)
+                if old_name in values:
+                    recent_matches.set_row(row, [new_name if value == old_name else value for value in values])
+
+    def _update_name_boxes_after_change(self, name_boxes: Iterable[QComboBox], change: LeagueChange) -> None:
+        # a renamed player moves to the position of their new name and stays selected
+        for name_box in name_boxes:
+            current_name = name_box.currentText()
+            for old_name, new_name in change.renamed_players:
+                if name_box.findText(old_name) >= 0:
+                    name_box.removeItem(name_box.findText(old_name))
+                    _insert_name(name_box, new_name)
+                    current_name = new_name if current_name == old_name else current_name
+            for name in change.added_players:
+                _insert_name(name_box, name)
+            name_box.setCurrentIndex(name_box.findText(current_name))
@@ -1,23 +1,22 @@
 from copy import copy
 from dataclasses import dataclass
-from typing import Optional
-from functools import partial
+from typing import Any, List, Optional
 
-from PyQt5.QtWidgets import (
-    QCheckBox, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QVBoxLayout, QWidget)
+from PyQt5.QtWidgets import QCheckBox, QLineEdit, QPushButton, QVBoxLayout, QWidget
 
 from constants import SECTION_TITLE_FONT
 from error_window import ErrorWindow
 from league_database import LeagueDatabase
+from league_events import LeagueChange
+from player import PlayerStartingData
+from table_models import ColumnarTableModel, Columns, create_table_view, to_columns, update_sorted_rows
 from utils import create_label, is_float
 
 
 @dataclass
-class PlayerStartingData:
-    name: str
-    dl_points: float
-    try_hard_factor: float
+class MainMenuData:
+    players_statistics: Columns
+    player_names: List[str]
 
 
 class MainMenu(QWidget):
@@ -28,12 +27,43 @@ class MainMenu(QWidget):
         self._layout = QVBoxLayout()
         self._add_single_league_button()
         self._add_double_league_button()
+        self._add_loading_label()
         self._add_player_data_interaction()
         self._add_players_statistics_table()
         self.setLayout(self._layout)
     
     def update(self) -> None:
-        self._update_player_statistics()
+        self._window.load_view_data(self, self._loading_label, self._load_data, self._show_data)
+
+    def apply_change(self, change: LeagueChange) -> bool:
+        # updates only rows of changed players, returns False if the data has to be loaded again
+        if change.is_full:
+            return False
+        for player in change.sl_players | change.dl_players:
+            row = self._players_statistics.row_of(player)
+            if row is not None:
+                self._players_statistics.set_row(row, self._get_player_row(player))
+        # players are listed by name, in the order of get_player_names
+        rows = {old_name: None for old_name, _ in change.renamed_players}
+        rows.update({player: self._get_player_row(player)
+                     for player in [*change.added_players, *(new_name for _, new_name in change.renamed_players)]})
+        update_sorted_rows(self._players_statistics, rows, lambda values: values[0])
+        return True
+
+    def _load_data(self) -> MainMenuData:
+        players = self._database.get_player_names()
+        return MainMenuData(to_columns([self._get_player_row(player) for player in players], 3), players)
+
+    def _get_player_row(self, player: str) -> List[Any]:
+        return [player, self._database.get_player_sl_points(player), self._database.get_player_dl_points(player)]
+
+    def _show_data(self, data: MainMenuData) -> None:
+        self._players_statistics.set_columns(data.players_statistics, data.player_names)
+
+    def _add_loading_label(self) -> None:
+        self._loading_label = create_label("Loading...")
+        self._loading_label.hide()
+        self._layout.addWidget(self._loading_label)
 
     def _add_single_league_button(self) -> None:
         single_league_button = QPushButton('Single League')
@@ -78,24 +108,10 @@ class MainMenu(QWidget):
 
     def _add_players_statistics_table(self) -> None:
         self._layout.addWidget(create_label("Statisctics", SECTION_TITLE_FONT))
-        self._players_statistics = QTableWidget()
-        self._players_statistics.setHorizontalHeaderLabels(('Name', 'SL Points', 'DL Points'))
-        self._layout.addWidget(self._players_statistics)
-
-    def _update_player_statistics(self) -> None:
-        players = self._database.get_player_names()
-        self._players_statistics.setColumnCount(3)
-        self._players_statistics.setRowCount(len(players))
-        #self._players_statistics.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-        self._players_statistics.setHorizontalHeaderLabels(("Player", "SL score", "DL core"))
-        for index, player in enumerate(players):
-            self._players_statistics.setCellWidget(index, 0, QPushButton(player))
-            self._players_statistics.cellWidget(index, 0).clicked.connect(
-                partial(self._window.switch_to_player_data_view, player))
-            self._players_statistics.setItem(index, 1, QTableWidgetItem(
-                str(self._database.get_player_sl_points(player))))
-            self._players_statistics.setItem(index, 2, QTableWidgetItem(
-                str(self._database.get_player_dl_points(player))))
+        self._players_statistics = ColumnarTableModel(("Player", "SL score", "DL core"))
+        self._layout.addWidget(create_table_view(
+            self._players_statistics, 0,
+            lambda row: self._window.switch_to_player_data_view(self._players_statistics.row_id(row))))
 
     def _add_new_player_to_database(self, player: Optional[PlayerStartingData]) -> None:
         if player is not None:
@@ -103,4 +119,3 @@ class MainMenu(QWidget):
                 self._error_window = ErrorWindow(f"Player {player.name} already exists in database")
                 return
             self._database.insert_player(player)
-            self._update_player_statistics()
@@ -2,6 +2,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+POSSIBLE_GOAL_BALANCES = [str(i) for i in range(11)]
+
+
+def goal_balance_factor(goal_balance: int) -> float:
+    return goal_balance / (goal_balance - 0.000001)
+
+
 @dataclass
 class SingleLeagueMatch:
     id: Optional[int]
@@ -0,0 +1,190 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+
+# goal balance of a deleted match, its row stays in place so rows of the other matches don't move
+DELETED = -1
+
+
+class _MatchView:
+    # a row of a MatchStore, fields are read from the store's arrays on access
+    __slots__ = ('_store', '_row')
+    PLAYER_FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, store: 'MatchStore', row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def id(self) -> int:
+        return self._store.ids[self._row]
+
+    @property
+    def goal_balance(self) -> int:
+        return self._store.goal_balances[self._row]
+
+    def players(self) -> Tuple[str, ...]:
+        return self._store.get_players(self._row)
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, _MatchView) and self.PLAYER_FIELDS == other.PLAYER_FIELDS
+                and (self.id, self.players(), self.goal_balance) == (other.id, other.players(), other.goal_balance))
+
+    def __repr__(self) -> str:
+        fields = zip(('id', *self.PLAYER_FIELDS, 'goal_balance'), (self.id, *self.players(), self.goal_balance))
+        return f"{type(self).__name__}({', '.join(f'{name}={value!r}' for name, value in fields)})"
+
+
+def _player_property(position: int, players_in_match: int) -> property:
+    def get_player(view: _MatchView) -> str:
+        store = view._store
+        return store.player_names[store.player_indexes[view._row * players_in_match + position]]
+    return property(get_player)
+
+
+class SingleLeagueMatchView(_MatchView):
+    __slots__ = ()
+    PLAYER_FIELDS = ('winning_player', 'loser_player')
+    winning_player = _player_property(0, 2)
+    loser_player = _player_property(1, 2)
+
+
+class DoubleLeagueMatchView(_MatchView):
+    __slots__ = ()
+    PLAYER_FIELDS = ('winning_player1', 'winning_player2', 'loser_player1', 'loser_player2')
+    winning_player1 = _player_property(0, 4)
+    winning_player2 = _player_property(1, 4)
+    loser_player1 = _player_property(2, 4)
+    loser_player2 = _player_property(3, 4)
+
+
+MatchView = Union[SingleLeagueMatchView, DoubleLeagueMatchView]
+
+
+class MatchStore:
+    # the match log in ascending id order as typed arrays: 8 bytes of id, 4 bytes per player (an index
+    # of an interned name) and 1 byte of goal balance per match, views of rows are created only when asked for
+    def __init__(self, view_class: Type[MatchView], records: Iterable[Sequence] = ()):
+        self._view_class = view_class
+        self.players_in_match = len(view_class.PLAYER_FIELDS)
+        self.player_names: List[str] = []
+        self._player_to_index: Dict[str, int] = {}
+        self.ids = array('q')
+        self.player_indexes = array('i')
+        self.goal_balances = array('b')
+        self._num_deleted = 0
+        self.extend(records)
+
+    def __len__(self) -> int:
+        return len(self.ids) - self._num_deleted
+
+    def __iter__(self) -> Iterator[MatchView]:
+        return self.get_views()
+
+    def append(self, match_id: int, players: Sequence[str], goal_balance: int) -> MatchView:
+        if self.ids and match_id <= self.ids[-1]:
+            raise ValueError(f"match {match_id} isn't newer than match {self.ids[-1]}")
+        player_to_index = self._player_to_index
+        self.player_indexes.extend([player_to_index[player] if player in player_to_index else self._intern(player)
+                                    for player in players])
+        self.ids.append(match_id)
+        self.goal_balances.append(goal_balance)
+        return self._view_class(self, len(self.ids) - 1)
+
+    def extend(self, records: Iterable[Sequence]) -> None:
+        # records are (id, *players, goal balance) in ascending id order
+        player_to_index, player_indexes = self._player_to_index, self.player_indexes
+        ids, goal_balances = self.ids, self.goal_balances
+        for match_id, *players, goal_balance in records:
+            if ids and match_id <= ids[-1]:
+                raise ValueError(f"match {match_id} isn't newer than match {ids[-1]}")
+            player_indexes.extend([player_to_index[player] if player in player_to_index else self._intern(player)
+                                   for player in players])
+            ids.append(match_id)
+            goal_balances.append(goal_balance)
+
+    def extend_with_player_ids(self, records: Sequence[Sequence[int]], player_names: Dict[int, str]) -> None:
+        # like extend, but players of records are ids of player_names, so names are looked up once per player
+        if records and self.ids and records[0][0] <= self.ids[-1]:
+            raise ValueError(f"match {records[0][0]} isn't newer than match {self.ids[-1]}")
+        player_id_to_index = {player_id: self._player_to_index[name] if name in self._player_to_index
+                              else self._intern(name) for player_id, name in player_names.items()}
+        self.ids.extend([record[0] for record in records])
+        self.player_indexes.extend([player_id_to_index[player_id]
+                                    for record in records for player_id in record[1:-1]])
+        self.goal_balances.extend([record[-1] for record in records])
+
+    def delete(self, match_id: int) -> Optional[MatchView]:
+        row = self.find_row(match_id)
+        if row is None:
+            return None
+        self.goal_balances[row] = DELETED
+        self._num_deleted += 1
+        return self._view_class(self, row)
+
+    def truncate(self, match_id: int) -> None:
+        # drops matches newer than match_id, views of them must not be used anymore
+        row = bisect_right(self.ids, match_id)
+        self._num_deleted -= self.goal_balances[row:].count(DELETED)
+        del self.ids[row:]
+        del self.player_indexes[row * self.players_in_match:]
+        del self.goal_balances[row:]
+
+    def rename_player(self, old_name: str, new_name: str) -> None:
+        if old_name in self._player_to_index:
+            index = self._player_to_index.pop(old_name)
+            self._player_to_index[new_name] = index
+            self.player_names[index] = new_name
+
+    def get_player_index(self, player: str) -> Optional[int]:
+        # None for players without matches in the store
+        return self._player_to_index.get(player)
+
+    def get_player(self, row: int, position: int) -> str:
+        return self.player_names[self.player_indexes[row * self.players_in_match + position]]
+
+    def get_players(self, row: int) -> Tuple[str, ...]:
+        start = row * self.players_in_match
+        return tuple(self.player_names[index] for index in self.player_indexes[start:start + self.players_in_match])
+
+    def get_views(self, num: Optional[int] = None, descending: bool = False) -> Iterator[MatchView]:
+        rows = range(len(self.ids) - 1, -1, -1) if descending else range(len(self.ids))
+        views = (self._view_class(self, row) for row in rows if self.goal_balances[row] != DELETED)
+        return views if num is None else islice(views, num)
+
+    def get_views_after(self, match_id: int) -> List[MatchView]:
+        return [self._view_class(self, row) for row in range(bisect_right(self.ids, match_id), len(self.ids))
+                if self.goal_balances[row] != DELETED]
+
+    def get_records_after(self, match_id: int) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+        # (id, players, goal balance) of matches newer than match_id, read straight from the arrays
+        names, player_indexes, players_in_match = self.player_names, self.player_indexes, self.players_in_match
+        for row in range(bisect_right(self.ids, match_id), len(self.ids)):
+            goal_balance = self.goal_balances[row]
+            if goal_balance != DELETED:
+                start = row * players_in_match
+                yield (self.ids[row],
+                       tuple(names[index] for index in player_indexes[start:start + players_in_match]),
+                       goal_balance)
+
+    def get_rows(self) -> Iterator[int]:
+        # rows of matches which aren't deleted, in ascending id order
+        goal_balances = self.goal_balances
+        return (row for row in range(len(self.ids)) if goal_balances[row] != DELETED)
+
+    def find_row(self, match_id: int) -> Optional[int]:
+        row = bisect_left(self.ids, match_id)
+        if row == len(self.ids) or self.ids[row] != match_id or self.goal_balances[row] == DELETED:
+            return None
+        return row
+
+    def _intern(self, player: str) -> int:
+        self._player_to_index[player] = len(self.player_names)
+        self.player_names.append(player)
+        return self._player_to_index[player]
@@ -0,0 +1,58 @@
+import heapq
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+from team_standings import Team
+
+
+@dataclass(frozen=True)
+class Matchup:
+    team1: Team
+    team2: Team
+    # DL points of team2 minus DL points of team1, the closer to 0 the more balanced the game
+    diff: float
+
+    def players(self) -> Tuple[str, str, str, str]:
+        return (*self.team1, *self.team2)
+
+
+def _get_sorted_pair_sums(player_to_dl_points: Dict[str, float]) -> List[Tuple[float, Team]]:
+    return sorted((player_to_dl_points[player1] + player_to_dl_points[player2], (player1, player2))
+                  for player1, player2 in combinations(sorted(player_to_dl_points), 2))
+
+
+def find_balanced_matchups(player_to_dl_points: Dict[str, float], num: int = 1) -> List[Matchup]:
+    # moved points depend on players only through the diff of teams' points, so the matchups where
+    # a win of either team moves the most similar number of points are the ones with the smallest diff.
+    # Teams with the closest sums of points are close to each other in the sorted pair sums, so for
+    # every team only the teams after it with a smaller diff than the num-th best one found so far are checked
+    pair_sums = _get_sorted_pair_sums(player_to_dl_points)
+    best: List[Tuple[float, int, int]] = []  # (-diff, index of team1, index of team2) as a max-heap
+    for index1, (team1_points, team1) in enumerate(pair_sums):
+        for index2 in range(index1 + 1, len(pair_sums)):
+            team2_points, team2 = pair_sums[index2]
+            diff = team2_points - team1_points
+            if len(best) == num and diff >= -best[0][0]:
+                break
+            if team1[0] in team2 or team1[1] in team2:
+                continue
+            if len(best) == num:
+                heapq.heapreplace(best, (-diff, index1, index2))
+            else:
+                heapq.heappush(best, (-diff, index1, index2))
+    return [Matchup(pair_sums[index1][1], pair_sums[index2][1], -negative_diff)
+            for negative_diff, index1, index2 in sorted(best, reverse=True)]
+
+
+def schedule_balanced_games(player_to_dl_points: Dict[str, float]) -> List[Matchup]:
+    # splits players into games played at the same time, so everyone (but the ones left over
+    # when number of players isn't divisible by 4) plays once, picking the most balanced game first
+    remaining_players = dict(player_to_dl_points)
+    games = []
+    while len(remaining_players) >= 4:
+        game = find_balanced_matchups(remaining_players)[0]
+        games.append(game)
+        for player in game.players():
+            del remaining_players[player]
+    return games
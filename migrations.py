@@ -0,0 +1,279 @@
+import sqlite3
+from typing import Callable, List
+
+
+def _drop_statistics_tables(cursor: sqlite3.Cursor) -> None:
+    # statistics used to be calculated in physical tables, which were left behind in the database
+    for table in ('player_recent_matches', 'player_matches', 'player_lost_matches', 'player_won_matches',
+                  'player_scores', 'player_recent_scores', 'team_matches', 'team_lost_matches',
+                  'team_won_matches', 'team_scores', 'team_recent_scores'):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def _create_dl_points_tables(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS dl_points_checkpoints (
+        dl_id INTEGER,
+        player TEXT,
+        dl_points REAL,
+        PRIMARY KEY (dl_id, player)
+        )""")
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS current_dl_points (
+        player TEXT PRIMARY KEY,
+        dl_points REAL
+        )""")
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS current_dl_points_state (
+        last_dl_id INTEGER
+        )""")
+
+
+def _create_match_indexes(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """CREATE INDEX sl_winning_player_index
+        ON single_league_matches (winning_player, sl_id DESC, loser_player, goal_balance)""")
+    cursor.execute(
+        """CREATE INDEX sl_loser_player_index
+        ON single_league_matches (loser_player, sl_id DESC, winning_player, goal_balance)""")
+    for column in ('winning_player1', 'winning_player2', 'loser_player1', 'loser_player2'):
+        cursor.execute(f"CREATE INDEX dl_{column}_index ON double_league_matches ({column}, dl_id DESC)")
+
+
+def _create_imported_match_lines_table(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """CREATE TABLE imported_match_lines (
+        league TEXT,
+        source TEXT,
+        line_number INTEGER,
+        PRIMARY KEY (league, source, line_number)
+        )""")
+
+
+def _create_dl_rating_history_table(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """CREATE TABLE dl_rating_history (
+        player TEXT,
+        dl_id INTEGER,
+        delta REAL,
+        dl_points REAL,
+        PRIMARY KEY (player, dl_id)
+        ) WITHOUT ROWID""")
+    cursor.execute("CREATE INDEX dl_rating_history_dl_id_index ON dl_rating_history (dl_id)")
+    # current points are dropped, so the next load replays all matches and fills the history
+    cursor.execute("DELETE FROM current_dl_points_state")
+
+
+def _use_integer_player_ids(cursor: sqlite3.Cursor) -> None:
+    # matches and DL points refer to players by their ids instead of names, so a rename changes only one row
+    for table in ('players', 'single_league_matches', 'double_league_matches'):
+        cursor.execute(f"ALTER TABLE {table} RENAME TO old_{table}")
+    cursor.execute(
+        """CREATE TABLE players (
+        player_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        starting_dl_points REAL,
+        try_hard_factor REAL
+        )""")
+    cursor.execute(
+        """CREATE TABLE single_league_matches (
+        sl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        winning_player_id INTEGER NOT NULL REFERENCES players (player_id),
+        loser_player_id INTEGER NOT NULL REFERENCES players (player_id),
+        goal_balance INTEGER
+        )""")
+    cursor.execute(
+        """CREATE TABLE double_league_matches (
+        dl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        winning_player1_id INTEGER NOT NULL REFERENCES players (player_id),
+        winning_player2_id INTEGER NOT NULL REFERENCES players (player_id),
+        loser_player1_id INTEGER NOT NULL REFERENCES players (player_id),
+        loser_player2_id INTEGER NOT NULL REFERENCES players (player_id),
+        goal_balance INTEGER
+        )""")
+    cursor.execute(
+        """INSERT INTO players (name, starting_dl_points, try_hard_factor)
+        SELECT name, starting_dl_points, try_hard_factor FROM old_players ORDER BY rowid""")
+    # names of players which only ever appeared in matches become players too
+    cursor.execute(
+        """INSERT INTO players (name, starting_dl_points, try_hard_factor)
+        SELECT name, 0, 0 FROM (
+            SELECT winning_player AS name FROM old_single_league_matches
+            UNION SELECT loser_player FROM old_single_league_matches
+            UNION SELECT winning_player1 FROM old_double_league_matches
+            UNION SELECT winning_player2 FROM old_double_league_matches
+            UNION SELECT loser_player1 FROM old_double_league_matches
+            UNION SELECT loser_player2 FROM old_double_league_matches)
+        WHERE name NOT IN (SELECT name FROM players)
+        ORDER BY name""")
+    cursor.execute(
+        """INSERT INTO single_league_matches
+        SELECT sl_id, winner.player_id, loser.player_id, goal_balance FROM old_single_league_matches
+        INNER JOIN players winner ON winner.name = winning_player
+        INNER JOIN players loser ON loser.name = loser_player""")
+    cursor.execute(
+        """INSERT INTO double_league_matches
+        SELECT dl_id, winner1.player_id, winner2.player_id, loser1.player_id, loser2.player_id, goal_balance
+        FROM old_double_league_matches
+        INNER JOIN players winner1 ON winner1.name = winning_player1
+        INNER JOIN players winner2 ON winner2.name = winning_player2
+        INNER JOIN players loser1 ON loser1.name = loser_player1
+        INNER JOIN players loser2 ON loser2.name = loser_player2""")
+    # ids of deleted matches at the end mustn't be given again, so the old tables' sequences are kept
+    for table in ('single_league_matches', 'double_league_matches'):
+        cursor.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        cursor.execute(f"UPDATE sqlite_sequence SET name = '{table}' WHERE name = 'old_{table}'")
+    for table in ('players', 'single_league_matches', 'double_league_matches'):
+        cursor.execute(f"DROP TABLE old_{table}")
+    cursor.execute(
+        """CREATE INDEX sl_winning_player_index
+        ON single_league_matches (winning_player_id, sl_id DESC, loser_player_id, goal_balance)""")
+    cursor.execute(
+        """CREATE INDEX sl_loser_player_index
+        ON single_league_matches (loser_player_id, sl_id DESC, winning_player_id, goal_balance)""")
+    for column in ('winning_player1', 'winning_player2', 'loser_player1', 'loser_player2'):
+        cursor.execute(f"CREATE INDEX dl_{column}_index ON double_league_matches ({column}_id, dl_id DESC)")
+    # DL points are derived from matches, they are calculated again with ids on the next load
+    for table in ('dl_points_checkpoints', 'current_dl_points', 'dl_rating_history'):
+        cursor.execute(f"DROP TABLE {table}")
+    cursor.execute("DELETE FROM current_dl_points_state")
+    cursor.execute(
+        """CREATE TABLE dl_points_checkpoints (
+        dl_id INTEGER,
+        player_id INTEGER REFERENCES players (player_id),
+        dl_points REAL,
+        PRIMARY KEY (dl_id, player_id)
+        )""")
+    cursor.execute(
+        """CREATE TABLE current_dl_points (
+        player_id INTEGER PRIMARY KEY REFERENCES players (player_id),
+        dl_points REAL
+        )""")
+    cursor.execute(
+        """CREATE TABLE dl_rating_history (
+        player_id INTEGER REFERENCES players (player_id),
+        dl_id INTEGER,
+        delta REAL,
+        dl_points REAL,
+        PRIMARY KEY (player_id, dl_id)
+        ) WITHOUT ROWID""")
+    cursor.execute("CREATE INDEX dl_rating_history_dl_id_index ON dl_rating_history (dl_id)")
+
+
+def _create_seasons_tables(cursor: sqlite3.Cursor) -> None:
+    # matches of closed seasons are moved to an archive database, see create_archive_tables
+    cursor.execute(
+        """CREATE TABLE seasons (
+        season_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        last_sl_id INTEGER,
+        last_dl_id INTEGER
+        )""")
+    # frozen final points of every player of a closed season, DL points of the latest season
+    # are the starting points of the current one
+    cursor.execute(
+        """CREATE TABLE season_standings (
+        season_id INTEGER NOT NULL REFERENCES seasons(season_id),
+        player_id INTEGER NOT NULL REFERENCES players(player_id),
+        dl_points REAL,
+        sl_points REAL,
+        PRIMARY KEY (season_id, player_id)
+        ) WITHOUT ROWID""")
+
+
+def _key_dl_points_checkpoints_by_player(cursor: sqlite3.Cursor) -> None:
+    # checkpoints hold only players whose points changed since the previous checkpoint, points of a player at
+    # a checkpoint are in their latest row up to it. Full checkpoints saved before are kept, they are still valid
+    cursor.execute("ALTER TABLE dl_points_checkpoints RENAME TO old_dl_points_checkpoints")
+    cursor.execute(
+        """CREATE TABLE dl_points_checkpoints (
+        player_id INTEGER REFERENCES players (player_id),
+        dl_id INTEGER,
+        dl_points REAL,
+        PRIMARY KEY (player_id, dl_id)
+        ) WITHOUT ROWID""")
+    cursor.execute(
+        """INSERT INTO dl_points_checkpoints (player_id, dl_id, dl_points)
+        SELECT player_id, dl_id, dl_points FROM old_dl_points_checkpoints""")
+    cursor.execute("DROP TABLE old_dl_points_checkpoints")
+    cursor.execute("CREATE INDEX dl_points_checkpoints_dl_id_index ON dl_points_checkpoints (dl_id)")
+
+
+def _count_dl_matches_of_current_dl_points(cursor: sqlite3.Cursor) -> None:
+    # current points are saved with the number of matches they were replayed from, so a match deleted
+    # without replaying the matches after it is noticed on the next load
+    cursor.execute("ALTER TABLE current_dl_points_state ADD COLUMN num_dl_matches INTEGER")
+    cursor.execute("DELETE FROM current_dl_points_state")
+
+
+def _create_imported_matches_table(cursor: sqlite3.Cursor) -> None:
+    # imported lines are identified by their content instead of their numbers, lines in imported_match_lines
+    # are moved to it the next time their file is imported
+    cursor.execute(
+        """CREATE TABLE imported_matches (
+        league TEXT,
+        source TEXT,
+        match_line TEXT,
+        occurrence INTEGER,
+        PRIMARY KEY (league, source, match_line, occurrence)
+        ) WITHOUT ROWID""")
+
+
+def create_archive_tables(cursor: sqlite3.Cursor, schema: str) -> None:
+    # tables of an attached archive database, player ids refer to players of the main database
+    cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {schema}.single_league_matches (
+        sl_id INTEGER PRIMARY KEY,
+        season_id INTEGER NOT NULL,
+        winning_player_id INTEGER NOT NULL,
+        loser_player_id INTEGER NOT NULL,
+        goal_balance INTEGER
+        )""")
+    cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {schema}.double_league_matches (
+        dl_id INTEGER PRIMARY KEY,
+        season_id INTEGER NOT NULL,
+        winning_player1_id INTEGER NOT NULL,
+        winning_player2_id INTEGER NOT NULL,
+        loser_player1_id INTEGER NOT NULL,
+        loser_player2_id INTEGER NOT NULL,
+        goal_balance INTEGER
+        )""")
+    cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {schema}.dl_rating_history (
+        player_id INTEGER,
+        dl_id INTEGER,
+        delta REAL,
+        dl_points REAL,
+        PRIMARY KEY (player_id, dl_id)
+        ) WITHOUT ROWID""")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.sl_season_index ON single_league_matches (season_id)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.dl_season_index ON double_league_matches (season_id)")
+
+
+# schema version of a database is the number of migrations applied to it
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    _drop_statistics_tables,
+    _create_dl_points_tables,
+    _create_match_indexes,
+    _create_imported_match_lines_table,
+    _create_dl_rating_history_table,
+    _use_integer_player_ids,
+    _create_seasons_tables,
+    _key_dl_points_checkpoints_by_player,
+    _count_dl_matches_of_current_dl_points,
+    _create_imported_matches_table,
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    cursor = conn.cursor()
+    for version in range(get_schema_version(conn), len(MIGRATIONS)):
+        with conn:
+            cursor.execute("BEGIN")
+            MIGRATIONS[version](cursor)
+            cursor.execute(f"PRAGMA user_version = {version + 1}")
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PlayerStartingData:
+    name: str
+    dl_points: float
+    try_hard_factor: float
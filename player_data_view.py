@@ -1,13 +1,29 @@
+from dataclasses import dataclass
+from functools import partial
 from typing import Callable, Optional
 
-from PyQt5.QtWidgets import QLineEdit, QPushButton, QStackedWidget, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+from PyQt5.QtWidgets import QLineEdit, QPushButton, QStackedWidget, QVBoxLayout, QWidget
 
 from constants import NORMAL_TEXT_FONT, SECTION_TITLE_FONT, TITLE_FONT
 from error_window import ErrorWindow
 from league_database import LeagueDatabase
+from league_events import LeagueChange
+from table_models import ColumnarTableModel, Columns, create_table_view, to_columns
 from utils import create_label, is_float
 
 
+@dataclass
+class PlayerData:
+    name: str
+    try_hard_factor: float
+    sl_points: float
+    dl_points: float
+    starting_dl_points: float
+    recent_sl_matches: Columns
+    sl_head_to_heads: Columns
+    recent_dl_matches: Columns
+
+
 class PlayerDataView(QWidget):
     def __init__(self, window: QStackedWidget, database: LeagueDatabase):
         super().__init__()
@@ -17,17 +33,53 @@ class PlayerDataView(QWidget):
         self._layout = QVBoxLayout()
         self._layout.addWidget(create_label("Player Info", TITLE_FONT))
         self._add_return_button(self._window.switch_to_main_menu)
+        self._loading_label = create_label("Loading...")
+        self._loading_label.hide()
+        self._layout.addWidget(self._loading_label)
         self._players_statistics = self._add_statistics()
         self._recent_sl_matches = self._add_recent_sl_matches_table()
+        self._sl_head_to_heads = self._add_sl_head_to_heads_table()
         self._recent_dl_matches = self._add_recent_dl_matches_table()
         self.setLayout(self._layout)
 
+    def get_name(self) -> Optional[str]:
+        return self._name
+
+    def apply_change(self, change: LeagueChange) -> bool:
+        # returns False if the data of the shown player has to be loaded again,
+        # renamed opponents are shown in the tables too
+        for old_name, new_name in change.renamed_players:
+            if self._name == old_name:
+                self._name = new_name
+        return not (change.is_full or change.renamed_players or self._name in change.get_players())
+
     def update(self, name: Optional[str] = None) -> None:
         if name is not None:
             self._name = name
-        self._update_statistics()
-        self._update_recent_sl_matches()
-        self._update_recent_dl_matches()
+        self._window.load_view_data(self, self._loading_label, partial(self._load_data, self._name), self._show_data)
+
+    def _load_data(self, name: str) -> PlayerData:
+        return PlayerData(
+            name,
+            self._database.get_player_try_hard_factor(name),
+            self._database.get_player_sl_points(name),
+            self._database.get_player_dl_points(name),
+            self._database.get_player_starting_dl_points(name),
+            to_columns([(match.winning_player, match.loser_player, match.goal_balance)
+                        for match in self._database.get_player_single_league_matches(name, 5)], 3),
+            to_columns([(opponent, head_to_head.wins, head_to_head.losses, head_to_head.goal_balance)
+                        for opponent, head_to_head in sorted(
+                            self._database.get_player_sl_head_to_heads(name).items(),
+                            key=lambda record: (-record[1].num_matches(), record[0]))], 4),
+            to_columns([(match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2,
+                         match.goal_balance)
+                        for match in self._database.get_player_double_league_matches(name, 5)], 5))
+
+    def _show_data(self, data: PlayerData) -> None:
+        self._update_statistics(data)
+        self._recent_sl_matches.set_columns(data.recent_sl_matches)
+        self._sl_head_to_heads.set_columns(data.sl_head_to_heads)
+        self._recent_dl_matches.set_columns(data.recent_dl_matches)
 
     def _add_return_button(self, return_action: Callable[[], None]) -> None:
         return_button = QPushButton('Return')
@@ -61,14 +113,12 @@ class PlayerDataView(QWidget):
             self._error_window = ErrorWindow(f"Player {new_name} already exists in database")
             return None
         self._database.update_player_name(self._name, new_name)
-        self.update(new_name)
 
     def _update_player_try_hard_factor(self) -> None:
         if not is_float(self._try_hard_factor_box.text()):
             self._error_window = ErrorWindow("Try Hard Factor has to be float number")
             return None
         self._database.update_player_try_hard_factor(self._name, float(self._try_hard_factor_box.text()))
-        self.update()
 
     def _update_player_starting_dl_points(self) -> None:
         if not is_float(self._starting_dl_points_box.text()):
@@ -76,46 +126,29 @@ class PlayerDataView(QWidget):
             return None
         self._database.update_player_starting_dl_points(
             self._name, float(self._starting_dl_points_box.text()))
-        self.update()
 
-    def _add_recent_sl_matches_table(self) -> QTableWidget:
+    def _add_recent_sl_matches_table(self) -> ColumnarTableModel:
         self._layout.addWidget(create_label("Recent Single League Matches", SECTION_TITLE_FONT))
-        recent_matches = QTableWidget()
-        self._layout.addWidget(recent_matches)
+        recent_matches = ColumnarTableModel(('Winning Player', 'Loser Player', 'Goal Balance'))
+        self._layout.addWidget(create_table_view(recent_matches))
         return recent_matches
 
-    def _add_recent_dl_matches_table(self) -> QTableWidget:
+    def _add_sl_head_to_heads_table(self) -> ColumnarTableModel:
+        self._layout.addWidget(create_label("Single League Head To Head", SECTION_TITLE_FONT))
+        head_to_heads = ColumnarTableModel(('Opponent', 'Wins', 'Losses', 'Goal Balance'))
+        self._layout.addWidget(create_table_view(head_to_heads))
+        return head_to_heads
+
+    def _add_recent_dl_matches_table(self) -> ColumnarTableModel:
         self._layout.addWidget(create_label("Recent Double League Matches", SECTION_TITLE_FONT))
-        recent_matches = QTableWidget()
-        self._layout.addWidget(recent_matches)
+        recent_matches = ColumnarTableModel(
+            ('Winning Player 1', 'Winning Player 2', 'Loser Player 1', 'Loser Player 2', 'Goal Balance'))
+        self._layout.addWidget(create_table_view(recent_matches))
         return recent_matches
     
-    def _update_statistics(self):
-        self._name_text_box.setText(self._name)
-        self._try_hard_factor_box.setText(str(self._database.get_player_try_hard_factor(self._name)))
-        self._sl_points_label.setText(f"SL points: {self._database.get_player_sl_points(self._name)}")
-        self._dl_points_label.setText(f"DL points: {self._database.get_player_dl_points(self._name)}")
-        self._starting_dl_points_box.setText(str(self._database.get_player_starting_dl_points(self._name)))
-
-    def _update_recent_dl_matches(self) -> None:
-        matches = self._database.get_player_double_league_matches(self._name, 5)
-        self._recent_dl_matches.setColumnCount(5)
-        self._recent_dl_matches.setRowCount(len(matches))
-        self._recent_dl_matches.setHorizontalHeaderLabels(
-            ('Winning Player 1', 'Winning Player 2', 'Loser Player 1', 'Loser Player 2', 'Goal Balance'))
-        for index, match in enumerate(matches):
-            self._recent_dl_matches.setItem(index, 0, QTableWidgetItem(match.winning_player1))
-            self._recent_dl_matches.setItem(index, 1, QTableWidgetItem(match.winning_player2))
-            self._recent_dl_matches.setItem(index, 2, QTableWidgetItem(match.loser_player1))
-            self._recent_dl_matches.setItem(index, 3, QTableWidgetItem(match.loser_player2))
-            self._recent_dl_matches.setItem(index, 4, QTableWidgetItem(str(match.goal_balance)))
-
-    def _update_recent_sl_matches(self) -> None:
-        matches = self._database.get_player_single_league_matches(self._name, 5)
-        self._recent_sl_matches.setColumnCount(3)
-        self._recent_sl_matches.setRowCount(len(matches))
-        self._recent_sl_matches.setHorizontalHeaderLabels(('Winning Player', 'Loser Player', 'Goal Balance'))
-        for index, match in enumerate(matches):
-            self._recent_sl_matches.setItem(index, 0, QTableWidgetItem(match.winning_player))
-            self._recent_sl_matches.setItem(index, 1, QTableWidgetItem(match.loser_player))
-            self._recent_sl_matches.setItem(index, 2, QTableWidgetItem(str(match.goal_balance)))
+    def _update_statistics(self, data: PlayerData):
+        self._name_text_box.setText(data.name)
+        self._try_hard_factor_box.setText(str(data.try_hard_factor))
+        self._sl_points_label.setText(f"SL points: {data.sl_points}")
+        self._dl_points_label.setText(f"DL points: {data.dl_points}")
+        self._starting_dl_points_box.setText(str(data.starting_dl_points))
@@ -1,13 +1,31 @@
+import os
+
 from PyQt5.QtWidgets import QApplication
 
+from instrumentation import Instrumentation
+from instrumentation_panel import InstrumentationPanel
 from league_database import LeagueDatabase
 from application_window import ApplicationWindow
 
 
 if __name__ == '__main__':
+    # RTSL_INSTRUMENTATION=report.json times the database and views and saves the report there on exit
+    instrumentation_report = os.environ.get('RTSL_INSTRUMENTATION')
     app = QApplication([])
     app.setStyle('Fusion')
-    database = LeagueDatabase('database.db')
-    window = ApplicationWindow(database)
+    instrumentation = Instrumentation() if instrumentation_report else None
+
+    def open_database() -> LeagueDatabase:
+        database = LeagueDatabase('database.db')
+        if instrumentation is not None:
+            instrumentation.attach_database(database)
+        return database
+
+    window = ApplicationWindow(open_database, instrumentation)
+    if instrumentation is not None:
+        instrumentation_panel = InstrumentationPanel(instrumentation)
     app.exec()
-    database.close_connection()
+    if instrumentation is not None:
+        instrumentation.dump(instrumentation_report)
+    if window.get_database() is not None:
+        window.get_database().close_connection()
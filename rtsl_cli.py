@@ -0,0 +1,85 @@
+import argparse
+from dataclasses import asdict
+import json
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from statistics_queries import (
+    connect_up_to_date, get_dl_points, get_player_recent_dl_matches, get_player_recent_sl_matches, get_sl_points,
+    get_teams_dl_points)
+
+
+# reports league standings without PyQt5 and without loading the league into memory, so it can be run often,
+# e.g. python rtsl_cli.py dl-standings --top 10 --json
+
+def _get_standings(player_to_points: Dict[Any, float], top: Optional[int]) -> List[Dict[str, Any]]:
+    players = sorted(player_to_points, key=lambda player: (-player_to_points[player], player))[:top]
+    return [{'rank': rank, 'player': player, 'points': player_to_points[player]}
+            for rank, player in enumerate(players, start=1)]
+
+
+def _get_report(conn: sqlite3.Connection, args: argparse.Namespace) -> Any:
+    if args.command == 'sl-standings':
+        return _get_standings(get_sl_points(conn), args.top)
+    if args.command == 'dl-standings':
+        return _get_standings(get_dl_points(conn), args.top)
+    if args.command == 'team-standings':
+        standings = _get_standings(get_teams_dl_points(conn), args.top)
+        return [{**standing, 'player': ' & '.join(standing['player'])} for standing in standings]
+    sl_points = get_sl_points(conn)
+    if args.player not in sl_points:
+        raise ValueError(f"there is no player {args.player}")
+    return {'player': args.player,
+            'sl_points': sl_points[args.player],
+            'dl_points': get_dl_points(conn)[args.player],
+            'sl_matches': [asdict(match) for match in get_player_recent_sl_matches(conn, args.player, args.num)],
+            'dl_matches': [asdict(match) for match in get_player_recent_dl_matches(conn, args.player, args.num)]}
+
+
+def _format_table(rows: List[Dict[str, Any]]) -> str:
+    if not rows:
+        return "no data"
+    columns = list(rows[0])
+    cells = [columns] + [[str(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[index]) for line in cells) for index in range(len(columns))]
+    return '\n'.join('  '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in cells)
+
+
+def _format_report(report: Any) -> str:
+    if isinstance(report, list):
+        return _format_table(report)
+    return '\n'.join([f"{report['player']}  SL points: {report['sl_points']}  DL points: {report['dl_points']}",
+                      "", "Single League", _format_table(report['sl_matches']),
+                      "", "Double League", _format_table(report['dl_matches'])])
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prints standings of the league without starting the application")
+    parser.add_argument('--db-name', default='database.db')
+    parser.add_argument('--json', action='store_true', help="print JSON instead of text")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('sl-standings', 'dl-standings', 'team-standings'):
+        commands.add_parser(command).add_argument('--top', type=int, help="print only the top players")
+    player_parser = commands.add_parser('player', help="points and recent matches of a player")
+    player_parser.add_argument('player')
+    player_parser.add_argument('--num', type=int, default=5, help="number of recent matches of every league")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    conn = connect_up_to_date(args.db_name)
+    try:
+        report = _get_report(conn, args)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    print(json.dumps(report, indent=2) if args.json else _format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from league_database import LeagueDatabase
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+from scripts.generate_league import _generate_league, _generate_matches
+from scripts.import_matches import PLAYERS_IN_MATCH, _read_matches
+
+
+@dataclass
+class LeagueSize:
+    players: int
+    sl_matches: int
+    dl_matches: int
+
+
+LEAGUE_SIZES = {
+    'tiny': LeagueSize(10, 1000, 1000),
+    'small': LeagueSize(100, 10000, 10000),
+    'medium': LeagueSize(1000, 100000, 100000),
+    'large': LeagueSize(10000, 1000000, 1000000),
+}
+
+# lines of the files imported by the import benchmarks
+IMPORTED_MATCHES = 1000
+
+Results = Dict[str, Dict[str, float]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], Any]
+    # untimed, called after every run to bring the database back to its previous state
+    restore: Optional[Callable[[], Any]] = None
+    # untimed, called before every run
+    prepare: Optional[Callable[[], Any]] = None
+
+
+def _time(benchmark: Benchmark, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        if benchmark.prepare is not None:
+            benchmark.prepare()
+        start = time.perf_counter()
+        benchmark.run()
+        timings.append(time.perf_counter() - start)
+        if benchmark.restore is not None:
+            benchmark.restore()
+    return min(timings)
+
+
+def _get_database_benchmarks(database: LeagueDatabase) -> List[Benchmark]:
+    players = database.get_player_names()
+    player1, player2, player3, player4 = players[:4]
+    last_dl_id = database.get_double_league_matches(1)[0].id
+    starting_dl_points = database.get_player_starting_dl_points(player1)
+    try_hard_factor = database.get_player_try_hard_factor(player1)
+    new_players = count()
+
+    def delete_last_sl_match() -> None:
+        database.delete_sl_match(database.get_single_league_matches(1)[0].id)
+
+    def delete_last_dl_match() -> None:
+        database.delete_dl_match(database.get_double_league_matches(1)[0].id)
+
+    def insert_sl_match() -> None:
+        database.insert_single_league_match(SingleLeagueMatch(None, player1, player2, 3))
+
+    def insert_dl_match() -> None:
+        database.insert_double_league_match(DoubleLeagueMatch(None, player1, player2, player3, player4, 3))
+
+    return [
+        Benchmark('is_player_in_database', lambda: database.is_player_in_database(player1)),
+        Benchmark('get_player_names', database.get_player_names),
+        Benchmark('get_single_league_matches', lambda: database.get_single_league_matches(10)),
+        Benchmark('get_player_single_league_matches', lambda: database.get_player_single_league_matches(player1, 5)),
+        Benchmark('get_double_league_matches', lambda: database.get_double_league_matches(10)),
+        Benchmark('get_player_double_league_matches', lambda: database.get_player_double_league_matches(player1, 5)),
+        Benchmark('get_player_starting_dl_points', lambda: database.get_player_starting_dl_points(player1)),
+        Benchmark('get_player_try_hard_factor', lambda: database.get_player_try_hard_factor(player1)),
+        Benchmark('get_player_sl_points', lambda: database.get_player_sl_points(player1)),
+        Benchmark('get_player_dl_points', lambda: database.get_player_dl_points(player1)),
+        Benchmark('get_sl_head_to_head', lambda: database.get_sl_head_to_head(player1, player2)),
+        Benchmark('get_player_sl_head_to_heads', lambda: database.get_player_sl_head_to_heads(player1)),
+        Benchmark('get_player_sl_rank', lambda: database.get_player_sl_rank(player1)),
+        Benchmark('get_top_sl_players', lambda: database.get_top_sl_players(10)),
+        Benchmark('get_player_sl_rank_movement', lambda: database.get_player_sl_rank_movement(player1)),
+        Benchmark('get_player_dl_rank', lambda: database.get_player_dl_rank(player1)),
+        Benchmark('get_top_dl_players', lambda: database.get_top_dl_players(10)),
+        Benchmark('get_player_dl_rank_movement', lambda: database.get_player_dl_rank_movement(player1)),
+        Benchmark('get_team_dl_points', lambda: database.get_team_dl_points(player1, player2)),
+        Benchmark('get_teams_dl_points', database.get_teams_dl_points),
+        Benchmark('get_player_dl_points_after_match',
+                  lambda: database.get_player_dl_points_after_match(player1, last_dl_id // 2)),
+        Benchmark('get_player_dl_rating_history', lambda: database.get_player_dl_rating_history(player1)),
+        Benchmark('get_player_lowest_and_peak_dl_points',
+                  lambda: database.get_player_lowest_and_peak_dl_points(player1)),
+        Benchmark('get_dl_match_rating_deltas', lambda: database.get_dl_match_rating_deltas(last_dl_id)),
+        Benchmark('simulate_dl_points',
+                  lambda: database.simulate_dl_points([{player1: points} for points in range(400, 800, 40)])),
+        Benchmark('predict_dl_matchups', lambda: database.predict_dl_matchups(players[:8])),
+        # players can't be deleted, so every run adds a new one
+        Benchmark('insert_player',
+                  lambda: database.insert_player(PlayerStartingData(f'benchmark_player{next(new_players)}', 500, 0))),
+        Benchmark('insert_single_league_match', insert_sl_match, delete_last_sl_match),
+        Benchmark('delete_sl_match', delete_last_sl_match, prepare=insert_sl_match),
+        Benchmark('insert_double_league_match', insert_dl_match, delete_last_dl_match),
+        Benchmark('delete_dl_match', delete_last_dl_match, prepare=insert_dl_match),
+        Benchmark('update_player_try_hard_factor',
+                  lambda: database.update_player_try_hard_factor(player1, try_hard_factor + 0.1),
+                  lambda: database.update_player_try_hard_factor(player1, try_hard_factor)),
+        Benchmark('update_player_name', lambda: database.update_player_name(player1, 'benchmark_renamed_player'),
+                  lambda: database.update_player_name('benchmark_renamed_player', player1)),
+        Benchmark('update_player_starting_dl_points',
+                  lambda: database.update_player_starting_dl_points(player1, starting_dl_points + 10),
+                  lambda: database.update_player_starting_dl_points(player1, starting_dl_points)),
+        Benchmark('_calculate_dl_points', lambda: database._calculate_dl_points(from_dl_id=0)),
+    ]
+
+
+def _get_view_benchmarks(database: LeagueDatabase) -> List[Benchmark]:
+    from application_window import ApplicationWindow
+    from double_league_menu import DoubleLeagueMenu
+    from main_menu import MainMenu
+    from player_data_view import PlayerDataView
+    from single_league_menu import SingleLeagueMenu
+
+    class SynchronousApplicationWindow(ApplicationWindow):
+        # update() of a view returns only when the view shows its data
+        def load_view_data(self, view, loading_label, compute: Callable[[], Any],
+                           on_loaded: Callable[[Any], None]) -> None:
+            on_loaded(compute())
+
+        def _open_database(self, open_database: Callable[[], LeagueDatabase]) -> None:
+            self._on_database_opened(open_database())
+
+    window = SynchronousApplicationWindow(lambda: database)
+    player = database.get_player_names()[0]
+    return [
+        Benchmark('MainMenu.update', window._get_view(MainMenu).update),
+        Benchmark('SingleLeagueMenu.update', window._get_view(SingleLeagueMenu).update),
+        Benchmark('DoubleLeagueMenu.update', window._get_view(DoubleLeagueMenu).update),
+        Benchmark('PlayerDataView.update', lambda: window._get_view(PlayerDataView).update(player)),
+    ]
+
+
+def _get_copy_benchmarks(db_name: str, players: List[str]) -> List[Benchmark]:
+    # changes which can't be undone, every run works on a fresh copy of the closed database
+    copy_db_name = f'{os.path.splitext(db_name)[0]}_copy.db'
+    databases: List[LeagueDatabase] = []
+    file_names = {league: _write_matches_file(db_name, league, players) for league in PLAYERS_IN_MATCH}
+
+    def open_copy() -> None:
+        _copy_database(db_name, copy_db_name)
+        databases.append(LeagueDatabase(copy_db_name))
+
+    def close_copy() -> None:
+        databases.pop().close_connection()
+        _remove_database(copy_db_name)
+
+    def import_matches(league: str) -> None:
+        lines = _read_matches(file_names[league], league, set(players))
+        if league == 'sl':
+            databases[-1].import_single_league_matches(file_names[league], lines)
+        else:
+            databases[-1].import_double_league_matches(file_names[league], lines)
+
+    return [
+        Benchmark('import_single_league_matches', lambda: import_matches('sl'), close_copy, open_copy),
+        Benchmark('import_double_league_matches', lambda: import_matches('dl'), close_copy, open_copy),
+        Benchmark('close_season', lambda: databases[-1].close_season('benchmark'), close_copy, open_copy),
+    ]
+
+
+def _get_season_benchmarks(database: LeagueDatabase) -> List[Benchmark]:
+    # the database has a closed season, its matches are in the archive
+    season_id = database.get_seasons()[-1].season_id
+    return [
+        Benchmark('get_seasons', database.get_seasons),
+        Benchmark('get_season_standings', lambda: database.get_season_standings(season_id)),
+        Benchmark('get_archived_single_league_matches',
+                  lambda: database.get_archived_single_league_matches(season_id)),
+        Benchmark('get_archived_double_league_matches',
+                  lambda: database.get_archived_double_league_matches(season_id)),
+    ]
+
+
+def _write_matches_file(db_name: str, league: str, players: List[str]) -> str:
+    # random matches of the league's players, one per line as read by scripts/import_matches.py
+    file_name = f'{os.path.splitext(db_name)[0]}_{league}_matches.txt'
+    with open(file_name, 'w') as file:
+        for *match_players, goal_balance in _generate_matches(random.Random(0), players, PLAYERS_IN_MATCH[league],
+                                                              IMPORTED_MATCHES):
+            file.write(f"{' '.join(match_players)} {goal_balance}\n")
+    return file_name
+
+
+def _run_benchmarks(db_name: str, repeat: int, with_views: bool = True) -> Dict[str, float]:
+    results = {}
+    start = time.perf_counter()
+    database = LeagueDatabase(db_name)
+    results['LeagueDatabase'] = time.perf_counter() - start
+    benchmarks = _get_database_benchmarks(database)
+    if with_views:
+        benchmarks += _get_view_benchmarks(database)
+    for benchmark in benchmarks:
+        results[benchmark.name] = _time(benchmark, repeat)
+    players = database.get_player_names()
+    # closing the database writes all its changes to the file, so they are in every copy of it
+    database.close_connection()
+    for benchmark in _get_copy_benchmarks(db_name, players):
+        results[benchmark.name] = _time(benchmark, repeat)
+    season_db_name = f'{os.path.splitext(db_name)[0]}_season.db'
+    _copy_database(db_name, season_db_name)
+    database = LeagueDatabase(season_db_name)
+    database.close_season('benchmark')
+    for benchmark in _get_season_benchmarks(database):
+        results[benchmark.name] = _time(benchmark, repeat)
+    database.close_connection()
+    _remove_database(season_db_name)
+    return results
+
+
+def _copy_database(db_name: str, copy_db_name: str) -> None:
+    _remove_database(copy_db_name)
+    shutil.copy(db_name, copy_db_name)
+
+
+def _remove_database(db_name: str) -> None:
+    for name in (db_name, f'{os.path.splitext(db_name)[0]}_archive.db'):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(name + suffix):
+                os.remove(name + suffix)
+
+
+def _prepare_league(size_name: str, work_dir: str) -> str:
+    # generated leagues are kept in work_dir, every run works on a fresh copy of one
+    size = LEAGUE_SIZES[size_name]
+    generated_db_name = os.path.join(work_dir, f'league_{size_name}.db')
+    if not os.path.exists(generated_db_name):
+        _generate_league(generated_db_name, size.players, size.sl_matches, size.dl_matches)
+    db_name = os.path.join(work_dir, f'benchmark_{size_name}.db')
+    _copy_database(generated_db_name, db_name)
+    return db_name
+
+
+def _find_regressions(results: Results, baseline: Results, tolerance: float,
+                      min_difference: float = 0.0001) -> List[Tuple[str, str, float, float]]:
+    # timings slower than the baseline ones by more than tolerance (and by more than min_difference seconds)
+    regressions = []
+    for size_name, size_results in results.items():
+        for name, seconds in size_results.items():
+            baseline_seconds = baseline.get(size_name, {}).get(name)
+            if (baseline_seconds is not None and seconds > baseline_seconds * (1 + tolerance)
+                    and seconds - baseline_seconds > min_difference):
+                regressions.append((size_name, name, baseline_seconds, seconds))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Times LeagueDatabase methods and view updates on generated leagues")
+    parser.add_argument('--sizes', nargs='+', choices=LEAGUE_SIZES.keys(), default=['tiny', 'small'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--work-dir', default='benchmarks')
+    parser.add_argument('--output', help="file to save results to as JSON")
+    parser.add_argument('--baseline', help="JSON file with results to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative slowdown against the baseline reported as a regression")
+    parser.add_argument('--skip-views', action='store_true')
+    args = parser.parse_args()
+    if not args.skip_views:
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication([])
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = {}
+    for size_name in args.sizes:
+        results[size_name] = _run_benchmarks(_prepare_league(size_name, args.work_dir), args.repeat,
+                                             not args.skip_views)
+        for name, seconds in results[size_name].items():
+            print(f"{size_name:8} {name:40} {seconds * 1000:10.3f} ms")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = _find_regressions(results, json.load(file), args.tolerance)
+        for size_name, name, baseline_seconds, seconds in regressions:
+            print(f"regression: {size_name} {name} {baseline_seconds * 1000:.3f} ms -> {seconds * 1000:.3f} ms")
+        sys.exit(1 if regressions else 0)
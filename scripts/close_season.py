@@ -0,0 +1,17 @@
+import argparse
+
+from league_database import LeagueDatabase
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Closes the current season: moves its matches to the archive "
+                                                 "database and freezes the standings, the next season starts "
+                                                 "from the final DL points")
+    parser.add_argument('name', help="name of the closed season")
+    parser.add_argument('--db-name', default='database.db')
+    parser.add_argument('--archive-name', help="archive database, <db name>_archive.db by default")
+    args = parser.parse_args()
+    league_db = LeagueDatabase(args.db_name, args.archive_name)
+    season = league_db.close_season(args.name)
+    league_db.close_connection()
+    print(f"closed season {season.season_id} '{season.name}'")
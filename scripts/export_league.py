@@ -0,0 +1,31 @@
+import argparse
+from typing import Optional
+
+from league_export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES, export_table
+from statistics_queries import connect_up_to_date
+
+
+def _export_league(db_name: str, table_name: str, file_name: str, file_format: Optional[str] = None,
+                   after_id: int = 0, chunk_size: int = EXPORT_CHUNK_SIZE) -> Optional[int]:
+    # the league is loaded into memory only if its DL points have to be brought up to date before the export
+    conn = connect_up_to_date(db_name)
+    try:
+        return export_table(conn, table_name, file_name, file_format, after_id, chunk_size)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Exports a table of the league or its standings to a file")
+    parser.add_argument('table', choices=EXPORT_TABLES.keys())
+    parser.add_argument('file_name')
+    parser.add_argument('--db-name', default='database.db')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="format of the file, taken from its extension "
+                                                                 "by default")
+    parser.add_argument('--after-id', type=int, default=0,
+                        help="export only rows with greater ids, e.g. the last id printed by a previous export")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    last_id = _export_league(args.db_name, args.table, args.file_name, args.format, args.after_id, args.chunk_size)
+    print("nothing to export" if last_id is None and EXPORT_TABLES[args.table].is_incremental()
+          else f"exported {args.table}" + ("" if last_id is None else f", last id {last_id}"))
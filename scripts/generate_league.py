@@ -0,0 +1,59 @@
+import argparse
+import random
+import sqlite3
+from typing import Iterator, List, Tuple
+
+from league_database import LeagueDatabase
+from match import POSSIBLE_GOAL_BALANCES
+from scripts.initialize_db import _initialize_db
+
+
+TRY_HARD_FACTORS = (0, 0, 0, 0.1, 0.2, 0.5)
+
+
+def _generate_players(rng: random.Random, num_players: int) -> List[Tuple[str, float, float]]:
+    return [(f"player{index}", round(rng.uniform(400, 700), 2), rng.choice(TRY_HARD_FACTORS))
+            for index in range(num_players)]
+
+
+def _generate_matches(rng: random.Random, players: List[int], players_in_match: int,
+                      num_matches: int) -> Iterator[Tuple]:
+    goal_balances = [int(goal_balance) for goal_balance in POSSIBLE_GOAL_BALANCES]
+    for _ in range(num_matches):
+        yield (*rng.sample(players, players_in_match), rng.choice(goal_balances))
+
+
+def _generate_league(db_name: str, num_players: int, num_sl_matches: int, num_dl_matches: int,
+                     seed: int = 0) -> None:
+    # the same arguments always give the same league
+    if num_players < 4:
+        raise ValueError("at least 4 players are needed for double league matches")
+    _initialize_db(db_name)
+    rng = random.Random(seed)
+    players = _generate_players(rng, num_players)
+    player_ids = list(range(1, num_players + 1))
+    conn = sqlite3.connect(db_name)
+    with conn:
+        conn.executemany("INSERT INTO players VALUES (?, ?, ?, ?)",
+                         [(player_id, *player) for player_id, player in zip(player_ids, players)])
+        conn.executemany(
+            "INSERT INTO single_league_matches(winning_player_id, loser_player_id, goal_balance) VALUES (?, ?, ?)",
+            _generate_matches(rng, player_ids, 2, num_sl_matches))
+        conn.executemany(
+            """INSERT INTO double_league_matches(winning_player1_id, winning_player2_id, loser_player1_id,
+            loser_player2_id, goal_balance) VALUES (?, ?, ?, ?, ?)""",
+            _generate_matches(rng, player_ids, 4, num_dl_matches))
+    conn.close()
+    # replays all DL matches once, so the generated database holds its current points and rating history
+    LeagueDatabase(db_name).close_connection()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generates a league with random players and matches")
+    parser.add_argument('db_name')
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--sl-matches', type=int, default=10000)
+    parser.add_argument('--dl-matches', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    _generate_league(args.db_name, args.players, args.sl_matches, args.dl_matches, args.seed)
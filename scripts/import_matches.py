@@ -0,0 +1,53 @@
+import argparse
+from typing import Iterator, List, Set, Tuple, Union
+
+from league_database import LeagueDatabase
+from match import POSSIBLE_GOAL_BALANCES, DoubleLeagueMatch, SingleLeagueMatch
+
+
+PLAYERS_IN_MATCH = {'sl': 2, 'dl': 4}
+
+
+def _is_line_correct(record: List[str], players_in_match: int, roster: Set[str]) -> bool:
+    return all([len(record) == players_in_match + 1,
+                record[-1] in POSSIBLE_GOAL_BALANCES,
+                all([player in roster for player in record[:-1]]),
+                len(set(record[:-1])) == players_in_match])
+
+
+def _read_matches(file_name: str, league: str,
+                  roster: Set[str]) -> Iterator[Tuple[int, Union[SingleLeagueMatch, DoubleLeagueMatch]]]:
+    match_class = SingleLeagueMatch if league == 'sl' else DoubleLeagueMatch
+    with open(file_name, 'r') as file:
+        for line_number, line in enumerate(file, start=1):
+            record = line.split()
+            if not record:
+                continue
+            if not _is_line_correct(record, PLAYERS_IN_MATCH[league], roster):
+                print(f"line {line_number} '{line.rstrip()}' is incorrect")
+                continue
+            yield line_number, match_class(None, *record[:-1], int(record[-1]))
+
+
+def _import_matches(file_name: str, db_name: str, league: str, skip_imported: bool = False) -> int:
+    league_db = LeagueDatabase(db_name)
+    roster = set(league_db.get_player_names())
+    lines = _read_matches(file_name, league, roster)
+    if league == 'sl':
+        imported = league_db.import_single_league_matches(file_name, lines, skip_imported)
+    else:
+        imported = league_db.import_double_league_matches(file_name, lines, skip_imported)
+    league_db.close_connection()
+    return imported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Imports matches from a file with one match per line: "
+                                                 "names of the winning and the loser players and the goal balance")
+    parser.add_argument('file_name')
+    parser.add_argument('league', choices=PLAYERS_IN_MATCH.keys())
+    parser.add_argument('--db-name', default='database.db')
+    parser.add_argument('--skip-imported', action='store_true',
+                        help="skip lines of the file that were already imported")
+    args = parser.parse_args()
+    print(f"imported {_import_matches(args.file_name, args.db_name, args.league, args.skip_imported)} matches")
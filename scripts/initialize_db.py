@@ -1,6 +1,8 @@
 import os
 import sqlite3
 
+from migrations import migrate
+
 
 def _initialize_db(db_name: str) -> None:
     if os.path.exists(db_name):
@@ -29,6 +31,7 @@ def _initialize_db(db_name: str) -> None:
         loser_player2 TEXT,
         goal_balance INTEGER
         )""")
+    migrate(conn)
     conn.close()
 
 
@@ -0,0 +1,16 @@
+import os
+import sqlite3
+
+from migrations import migrate
+
+
+def _migrate_db(db_name: str) -> None:
+    if not os.path.exists(db_name):
+        raise RuntimeError(f"{db_name} doesn't exist")
+    conn = sqlite3.connect(db_name)
+    migrate(conn)
+    conn.close()
+
+
+if __name__ == '__main__':
+    _migrate_db('database.db')
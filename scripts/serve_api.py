@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+
+from league_api import LeagueApi
+from league_database import LeagueDatabase
+
+
+async def _serve_api(db_name: str, host: str, port: int) -> None:
+    # matches recorded by other processes aren't seen, so the API should be the only one recording them
+    league_db = LeagueDatabase(db_name)
+    api = LeagueApi(league_db)
+    server = await api.serve(host, port)
+    print(f"serving the league on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+        league_db.close_connection()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serves standings, players and matches of the league as JSON, "
+                                                 "e.g. GET /standings/dl, GET /players/<name>?num=5, "
+                                                 "POST /matches/sl")
+    parser.add_argument('--db-name', default='database.db')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_api(args.db_name, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Season:
+    season_id: int
+    name: str
+    # ids of the last matches of the season, None if it had no matches of the league
+    last_sl_id: Optional[int]
+    last_dl_id: Optional[int]
+
+
+@dataclass
+class SeasonStanding:
+    player: str
+    dl_points: float
+    sl_points: float
@@ -0,0 +1,201 @@
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from match import SingleLeagueMatch, goal_balance_factor
+from match_store import MatchStore, SingleLeagueMatchView
+
+
+RECENT_MATCHES_PER_OPPONENT = 10
+
+
+def calculate_sl_won_score(goal_balance: int, player_try_hard_factor: float,
+                           opponent_try_hard_factor: float) -> float:
+    return (goal_balance / 10.0 + 1 - (player_try_hard_factor - opponent_try_hard_factor)
+            + goal_balance_factor(goal_balance) * 0.5 - 0.5)
+
+
+def calculate_sl_lost_score(goal_balance: int, player_try_hard_factor: float,
+                            opponent_try_hard_factor: float) -> float:
+    return (- goal_balance / 10.0 + (opponent_try_hard_factor - player_try_hard_factor)
+            - goal_balance_factor(goal_balance) * 0.5 + 0.5)
+
+
+@dataclass
+class HeadToHead:
+    wins: int = 0
+    losses: int = 0
+    # goals scored minus goals lost over all matches against the opponent
+    goal_balance: int = 0
+
+    def num_matches(self) -> int:
+        return self.wins + self.losses
+
+
+class _PlayerMatches:
+    # rows of a player's matches in the MatchStore in ascending order and head to heads against their
+    # opponents as columns sorted by the opponent's index, 4 bytes per match and 16 bytes per opponent
+    __slots__ = ('rows', 'opponents', 'wins', 'losses', 'goal_balances')
+
+    def __init__(self):
+        self.rows = array('i')
+        self.opponents = array('i')
+        self.wins = array('i')
+        self.losses = array('i')
+        self.goal_balances = array('i')
+
+    def add_row(self, row: int) -> None:
+        if self.rows and row < self.rows[-1]:
+            insort(self.rows, row)
+        else:
+            self.rows.append(row)
+
+    def remove_row(self, row: int) -> None:
+        del self.rows[bisect_left(self.rows, row)]
+
+    def find_opponent(self, opponent: int) -> Optional[int]:
+        position = bisect_left(self.opponents, opponent)
+        if position == len(self.opponents) or self.opponents[position] != opponent:
+            return None
+        return position
+
+    def update_head_to_head(self, opponent: int, wins: int, losses: int, goal_balance: int) -> None:
+        columns = (self.opponents, self.wins, self.losses, self.goal_balances)
+        position = self.find_opponent(opponent)
+        if position is None:
+            position = bisect_left(self.opponents, opponent)
+            for column, value in zip(columns, (opponent, 0, 0, 0)):
+                column.insert(position, value)
+        self.wins[position] += wins
+        self.losses[position] += losses
+        self.goal_balances[position] += goal_balance
+        if self.wins[position] + self.losses[position] == 0:
+            for column in columns:
+                del column[position]
+
+    def get_head_to_head(self, position: int) -> HeadToHead:
+        return HeadToHead(self.wins[position], self.losses[position], self.goal_balances[position])
+
+
+class SingleLeagueEngine:
+    # players are indexes of the MatchStore, which stay the same when players are renamed. Only rows of
+    # matches and aggregates against opponents are kept per player, the matches themselves stay in the store
+    def __init__(self, try_hard_factors: Dict[str, float], matches: MatchStore):
+        self._try_hard_factors = dict(try_hard_factors)
+        self._matches = matches
+        self._players: Dict[int, _PlayerMatches] = {}
+        self._player_to_sl_points: Dict[str, float] = {}
+        for row in matches.get_rows():
+            self._update_row(row, 1)
+
+    def add_player(self, name: str, try_hard_factor: float) -> None:
+        self._try_hard_factors[name] = try_hard_factor
+        self._player_to_sl_points.pop(name, None)
+
+    def rename_player(self, old_name: str, new_name: str) -> None:
+        # the store is renamed first, points of opponents don't depend on the name
+        self._try_hard_factors[new_name] = self._try_hard_factors.pop(old_name)
+        self._player_to_sl_points.pop(old_name, None)
+        self._player_to_sl_points.pop(new_name, None)
+
+    def update_try_hard_factor(self, name: str, try_hard_factor: float) -> None:
+        self._try_hard_factors[name] = try_hard_factor
+        self._invalidate(name, *self.get_player_head_to_heads(name))
+
+    def add_match(self, match: SingleLeagueMatchView) -> None:
+        self._update_row(match.row, 1)
+        self._invalidate(*match.players())
+
+    def remove_match(self, match_id: int) -> Optional[SingleLeagueMatch]:
+        # has to be called before the match is deleted from the store
+        row = self._matches.find_row(match_id)
+        if row is None:
+            return None
+        self._update_row(row, -1)
+        winning_player, loser_player = self._matches.get_players(row)
+        self._invalidate(winning_player, loser_player)
+        return SingleLeagueMatch(match_id, winning_player, loser_player, self._matches.goal_balances[row])
+
+    def get_head_to_head(self, name: str, opponent: str) -> HeadToHead:
+        player_matches = self._get_player_matches(name)
+        opponent_index = self._matches.get_player_index(opponent)
+        if player_matches is None or opponent_index is None:
+            return HeadToHead()
+        position = player_matches.find_opponent(opponent_index)
+        return HeadToHead() if position is None else player_matches.get_head_to_head(position)
+
+    def get_player_head_to_heads(self, name: str) -> Dict[str, HeadToHead]:
+        player_matches = self._get_player_matches(name)
+        if player_matches is None:
+            return {}
+        names = self._matches.player_names
+        return {names[opponent]: player_matches.get_head_to_head(position)
+                for position, opponent in enumerate(player_matches.opponents)}
+
+    def get_player_points(self, name: str) -> float:
+        if name not in self._player_to_sl_points:
+            self._player_to_sl_points[name] = self._calculate_player_points(name)
+        return self._player_to_sl_points[name]
+
+    def _get_player_matches(self, name: str) -> Optional[_PlayerMatches]:
+        index = self._matches.get_player_index(name)
+        return None if index is None else self._players.get(index)
+
+    def _update_row(self, row: int, change: int) -> None:
+        # change is 1 for an added match and -1 for a removed one
+        player_indexes = self._matches.player_indexes
+        winning_player, loser_player = player_indexes[2 * row], player_indexes[2 * row + 1]
+        goal_balance = self._matches.goal_balances[row]
+        for player, opponent, wins, losses, player_goal_balance in (
+                (winning_player, loser_player, change, 0, change * goal_balance),
+                (loser_player, winning_player, 0, change, -change * goal_balance)):
+            if player not in self._players:
+                self._players[player] = _PlayerMatches()
+            player_matches = self._players[player]
+            if change > 0:
+                player_matches.add_row(row)
+            else:
+                player_matches.remove_row(row)
+            player_matches.update_head_to_head(opponent, wins, losses, player_goal_balance)
+            if not player_matches.rows:
+                del self._players[player]
+
+    def _invalidate(self, *names: str) -> None:
+        for name in names:
+            self._player_to_sl_points.pop(name, None)
+
+    def _calculate_player_points(self, name: str) -> float:
+        player = self._matches.get_player_index(name)
+        player_matches = None if player is None else self._players.get(player)
+        if player_matches is None:
+            return 0
+        names, player_indexes, goal_balances = (
+            self._matches.player_names, self._matches.player_indexes, self._matches.goal_balances)
+        # number of the most recent matches against every opponent which still have to be scored, so rows
+        # are read only until the recent matches against all opponents are found
+        remaining: Dict[int, int] = {}
+        for position, opponent in enumerate(player_matches.opponents):
+            if names[opponent] in self._try_hard_factors:
+                remaining[opponent] = min(player_matches.wins[position] + player_matches.losses[position],
+                                          RECENT_MATCHES_PER_OPPONENT)
+        num_remaining = sum(remaining.values())
+        opponent_scores: Dict[int, List[float]] = {opponent: [] for opponent in remaining}
+        player_try_hard_factor = self._try_hard_factors[name]
+        for row in reversed(player_matches.rows):
+            if num_remaining == 0:
+                break
+            winning_player, loser_player = player_indexes[2 * row], player_indexes[2 * row + 1]
+            opponent = loser_player if winning_player == player else winning_player
+            if not remaining.get(opponent):
+                continue
+            remaining[opponent] -= 1
+            num_remaining -= 1
+            opponent_try_hard_factor = self._try_hard_factors[names[opponent]]
+            calculate_score = calculate_sl_won_score if winning_player == player else calculate_sl_lost_score
+            opponent_scores[opponent].append(
+                calculate_score(goal_balances[row], player_try_hard_factor, opponent_try_hard_factor))
+        if not opponent_scores:
+            return 0
+        average_scores = [sum(scores) / len(scores) for scores in opponent_scores.values()]
+        return round(sum(average_scores) / len(average_scores) * 100, 2)
@@ -1,30 +1,68 @@
-from functools import partial
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional
 
-from PyQt5.QtWidgets import QComboBox, QLineEdit, QVBoxLayout, QPushButton, QTableWidgetItem
+from PyQt5.QtWidgets import QComboBox, QLineEdit, QVBoxLayout, QPushButton
 
-from constants import POSSIBLE_GOAL_BALANCES, SECTION_TITLE_FONT, TITLE_FONT
+from constants import SECTION_TITLE_FONT, TITLE_FONT
 from error_window import ErrorWindow
-from league_menu import LeagueMenu
-from match import SingleLeagueMatch
+from league_events import LeagueChange
+from league_menu import RECENT_MATCHES_NUM, LeagueMenu
+from match import POSSIBLE_GOAL_BALANCES, SingleLeagueMatch
+from table_models import Columns, to_columns
 from utils import create_label
 
 
+@dataclass
+class SingleLeagueData:
+    player_names: List[str]
+    players_statistics: Columns
+    ranked_players: List[str]
+    recent_matches: Columns
+    recent_match_ids: List[int]
+
+
 class SingleLeagueMenu(LeagueMenu):
     def __init__(self, window, database):
         super().__init__(window, database)
         self._layout = QVBoxLayout()
         self._layout.addWidget(create_label("Single League", TITLE_FONT))
         self._add_return_button(self._window.switch_to_main_menu)
+        self._loading_label = self._add_loading_label()
         self._players_statistics = self._add_player_statistics_table()
         self._add_new_match_interaction()
-        self._recent_matches = self._add_recent_matches_table()
+        self._recent_matches = self._add_recent_matches_table(
+            ('Winning Player', 'Loser Player', 'Goal Balance'), lambda match_id: self._database.delete_sl_match(match_id))
         self.setLayout(self._layout)
 
     def update(self) -> None:
-        self._update_player_statistcs()
-        self._update_recent_matches()
-        self._update_name_boxes()
+        self._window.load_view_data(self, self._loading_label, self._load_data, self._show_data)
+
+    def apply_change(self, change: LeagueChange) -> bool:
+        # updates only rows of changed players and matches, returns False if the data has to be loaded again
+        if change.is_full:
+            return False
+        self._update_players_statistics([*change.sl_players, *change.added_players], change.renamed_players,
+                                        self._database.get_player_sl_points)
+        self._update_recent_matches(change.added_sl_matches, change.deleted_sl_matches, change.renamed_players,
+                                    self._database.get_single_league_matches)
+        self._update_name_boxes_after_change((self._name1_box, self._name2_box), change)
+        return True
+
+    def _load_data(self) -> SingleLeagueData:
+        players = self._database.get_player_names()
+        top_players = self._database.get_top_sl_players()
+        matches = self._database.get_single_league_matches(RECENT_MATCHES_NUM)
+        return SingleLeagueData(
+            players,
+            to_columns(top_players, 2),
+            [player for player, _ in top_players],
+            to_columns([self._to_recent_match_row(match) for match in matches], 4),
+            [match.id for match in matches])
+
+    def _show_data(self, data: SingleLeagueData) -> None:
+        self._players_statistics.set_columns(data.players_statistics, data.ranked_players)
+        self._recent_matches.set_columns(data.recent_matches, data.recent_match_ids)
+        self._update_name_boxes(data.player_names)
 
     def _add_new_match_interaction(self) -> None:
         self._layout.addWidget(create_label("Add new match", SECTION_TITLE_FONT))
@@ -54,8 +92,8 @@ class SingleLeagueMenu(LeagueMenu):
         self._score_box.clear()
         return SingleLeagueMatch(None, *player_names, int(goal_balance))
 
-    def _update_name_boxes(self) -> None:
-        player_names = [''] + self._database.get_player_names()
+    def _update_name_boxes(self, player_names: List[str]) -> None:
+        player_names = [''] + player_names
         for name_box in (self._name1_box, self._name2_box):
             name_box.clear()
             name_box.addItems(player_names)
@@ -63,33 +101,3 @@ class SingleLeagueMenu(LeagueMenu):
     def _add_new_match_to_database(self, match: Optional[SingleLeagueMatch]) -> None:
         if match is not None:
             self._database.insert_single_league_match(match)
-            self.update()
-
-    def _update_player_statistcs(self) -> None:
-        players = self._database.get_player_names()
-        self._players_statistics.setColumnCount(2)
-        self._players_statistics.setRowCount(len(players))
-        self._players_statistics.setHorizontalHeaderLabels(('Name', 'Points'))
-        for index, player in enumerate(
-                sorted(players, key=lambda player: self._database.get_player_sl_points(player),
-                       reverse=True)):
-            self._players_statistics.setItem(index, 0, QTableWidgetItem(player))
-            self._players_statistics.setItem(index, 1, QTableWidgetItem(
-                str(self._database.get_player_sl_points(player))))
-
-    def _update_recent_matches(self) -> None:
-        matches = self._database.get_single_league_matches(10)
-        self._recent_matches.setColumnCount(4)
-        self._recent_matches.setRowCount(len(matches))
-        self._recent_matches.setHorizontalHeaderLabels(('Winning Player', 'Loser Player', 'Goal Balance', ''))
-        for index, match in enumerate(matches):
-            self._recent_matches.setItem(index, 0, QTableWidgetItem(match.winning_player))
-            self._recent_matches.setItem(index, 1, QTableWidgetItem(match.loser_player))
-            self._recent_matches.setItem(index, 2, QTableWidgetItem(str(match.goal_balance)))
-            self._recent_matches.setCellWidget(index, 3, QPushButton("Delete"))
-            self._recent_matches.cellWidget(index, 3).clicked.connect(
-                partial(self._delete_match, match.id))
-    
-    def _delete_match(self, match_id: int) -> None:
-        self._database.delete_sl_match(match_id)
-        self.update()
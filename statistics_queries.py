@@ -0,0 +1,141 @@
+import sqlite3
+from typing import Dict, List, Optional
+
+from connection_pool import connect_read_only
+from league_database import DL_MATCHES_QUERY, SL_MATCHES_QUERY, LeagueDatabase
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from migrations import MIGRATIONS, get_schema_version
+from team_standings import Team
+
+
+# statistics calculated by the queries below match the ones LeagueDatabase keeps in memory, but can be
+# read by any connection (also a read-only one) without writing anything to the database
+
+SL_POINTS_QUERY = """
+WITH scores AS (
+    SELECT sl_id, winning_player_id AS player_id, loser_player_id AS opponent_id,
+        goal_balance / 10.0 + 1 - (winner.try_hard_factor - loser.try_hard_factor)
+        + (goal_balance / (goal_balance - 0.000001)) * 0.5 - 0.5 AS score
+    FROM single_league_matches
+    INNER JOIN players winner ON winning_player_id = winner.player_id
+    INNER JOIN players loser ON loser_player_id = loser.player_id
+    UNION ALL
+    SELECT sl_id, loser_player_id AS player_id, winning_player_id AS opponent_id,
+        - goal_balance / 10.0 + (winner.try_hard_factor - loser.try_hard_factor)
+        - (goal_balance / (goal_balance - 0.000001)) * 0.5 + 0.5 AS score
+    FROM single_league_matches
+    INNER JOIN players winner ON winning_player_id = winner.player_id
+    INNER JOIN players loser ON loser_player_id = loser.player_id
+),
+recent_scores AS (
+    SELECT player_id, opponent_id, score,
+        row_number() OVER (PARTITION BY player_id, opponent_id ORDER BY sl_id DESC) rn
+    FROM scores
+),
+opponent_scores AS (
+    SELECT player_id, opponent_id, AVG(score) AS score
+    FROM recent_scores
+    WHERE rn <= 10
+    GROUP BY player_id, opponent_id
+)
+SELECT players.name, AVG(opponent_scores.score)
+FROM players
+LEFT JOIN opponent_scores ON players.player_id = opponent_scores.player_id
+GROUP BY players.player_id
+"""
+
+TEAMS_DL_POINTS_QUERY = """
+WITH named_matches AS (
+    SELECT dl_id, winner1.name AS winning_player1, winner2.name AS winning_player2,
+        loser1.name AS loser_player1, loser2.name AS loser_player2, goal_balance
+    FROM double_league_matches
+    INNER JOIN players winner1 ON winner1.player_id = winning_player1_id
+    INNER JOIN players winner2 ON winner2.player_id = winning_player2_id
+    INNER JOIN players loser1 ON loser1.player_id = loser_player1_id
+    INNER JOIN players loser2 ON loser2.player_id = loser_player2_id
+),
+scores AS (
+    SELECT dl_id, MIN(winning_player1, winning_player2) AS player1, MAX(winning_player1, winning_player2) AS player2,
+        loser_player1 AS opponent1, loser_player2 AS opponent2,
+        goal_balance / 10.0 + 1 + (goal_balance / (goal_balance - 0.000001)) * 0.5 - 0.5 AS score
+    FROM named_matches
+    UNION ALL
+    SELECT dl_id, MIN(loser_player1, loser_player2) AS player1, MAX(loser_player1, loser_player2) AS player2,
+        winning_player1 AS opponent1, winning_player2 AS opponent2,
+        - goal_balance / 10.0 - (goal_balance / (goal_balance - 0.000001)) * 0.5 + 0.5 AS score
+    FROM named_matches
+),
+recent_scores AS (
+    SELECT player1, player2, opponent1, opponent2, score,
+        row_number() OVER (PARTITION BY player1, player2, opponent1, opponent2 ORDER BY dl_id DESC) rn
+    FROM scores
+),
+opponent_scores AS (
+    SELECT player1, player2, AVG(score) AS score
+    FROM recent_scores
+    WHERE rn <= 10
+    GROUP BY player1, player2, opponent1, opponent2
+)
+SELECT player1, player2, AVG(score)
+FROM opponent_scores
+GROUP BY player1, player2
+"""
+
+
+def _to_points(score: float) -> float:
+    return 0 if score is None else round(score * 100, 2)
+
+
+def get_sl_points(conn: sqlite3.Connection) -> Dict[str, float]:
+    return {name: _to_points(score) for name, score in conn.execute(SL_POINTS_QUERY)}
+
+
+def get_teams_dl_points(conn: sqlite3.Connection) -> Dict[Team, float]:
+    return {(player1, player2): _to_points(score)
+            for player1, player2, score in conn.execute(TEAMS_DL_POINTS_QUERY)}
+
+
+def get_dl_points(conn: sqlite3.Connection) -> Dict[str, float]:
+    return {player: round(dl_points, 2) for player, dl_points in conn.execute(
+        "SELECT name, dl_points FROM current_dl_points INNER JOIN players USING (player_id)")}
+
+
+def is_dl_points_current(conn: sqlite3.Connection) -> bool:
+    # current DL points are saved by LeagueDatabase with every match, but not for matches inserted or deleted
+    # by other means
+    state = conn.execute("SELECT last_dl_id, num_dl_matches FROM current_dl_points_state").fetchone()
+    last_dl_id, num_dl_matches = conn.execute("SELECT MAX(dl_id), COUNT(*) FROM double_league_matches").fetchone()
+    return state == (last_dl_id or 0, num_dl_matches)
+
+
+def connect_up_to_date(db_name: str) -> sqlite3.Connection:
+    # a read-only connection for the queries above, only a database with an older schema or with DL points
+    # not saved for its latest matches is opened with LeagueDatabase first, which brings it up to date
+    conn = connect_read_only(db_name)
+    if get_schema_version(conn) == len(MIGRATIONS) and is_dl_points_current(conn):
+        return conn
+    conn.close()
+    LeagueDatabase(db_name).close_connection()
+    return connect_read_only(db_name)
+
+
+def _get_player_id(conn: sqlite3.Connection, player: str) -> Optional[int]:
+    record = conn.execute("SELECT player_id FROM players WHERE name = :name", {"name": player}).fetchone()
+    return None if record is None else record[0]
+
+
+def get_player_recent_sl_matches(conn: sqlite3.Connection, player: str, num: int) -> List[SingleLeagueMatch]:
+    return [SingleLeagueMatch(*record) for record in conn.execute(
+        f"""{SL_MATCHES_QUERY}
+        WHERE winning_player_id = :player_id OR loser_player_id = :player_id
+        ORDER BY sl_id DESC LIMIT :num""",
+        {"player_id": _get_player_id(conn, player), "num": num})]
+
+
+def get_player_recent_dl_matches(conn: sqlite3.Connection, player: str, num: int) -> List[DoubleLeagueMatch]:
+    return [DoubleLeagueMatch(*record) for record in conn.execute(
+        f"""{DL_MATCHES_QUERY}
+        WHERE (winning_player1_id = :player_id OR winning_player2_id = :player_id
+               OR loser_player1_id = :player_id OR loser_player2_id = :player_id)
+        ORDER BY dl_id DESC LIMIT :num""",
+        {"player_id": _get_player_id(conn, player), "num": num})]
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QTableView)
+
+
+Columns = Sequence[Sequence[Any]]
+
+
+def to_columns(rows: Sequence[Sequence[Any]], num_columns: int) -> List[List[Any]]:
+    return [list(column) for column in zip(*rows)] if rows else [[] for _ in range(num_columns)]
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    # holds table data column by column, every row may also be identified by an id which isn't shown
+    def __init__(self, headers: Sequence[str]):
+        super().__init__()
+        self._headers = tuple(headers)
+        self._columns: List[List[Any]] = [[] for _ in self._headers]
+        self._row_ids: List[Any] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._row_ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return str(self._columns[index.column()][index.row()])
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def row_id(self, row: int) -> Any:
+        return self._row_ids[row]
+
+    def row_of(self, row_id: Any) -> Optional[int]:
+        return self._row_ids.index(row_id) if row_id in self._row_ids else None
+
+    def get_row(self, row: int) -> List[Any]:
+        return [column[row] for column in self._columns]
+
+    def set_row(self, row: int, values: Sequence[Any], row_id: Any = None) -> None:
+        if row_id is not None:
+            self._row_ids[row] = row_id
+        if self.get_row(row) != list(values):
+            for column, value in zip(self._columns, values):
+                column[row] = value
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._headers) - 1))
+
+    def insert_row(self, row: int, values: Sequence[Any], row_id: Any) -> None:
+        self.beginInsertRows(QModelIndex(), row, row)
+        for column, value in zip(self._columns, values):
+            column.insert(row, value)
+        self._row_ids.insert(row, row_id)
+        self.endInsertRows()
+
+    def remove_row(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        for column in self._columns:
+            del column[row]
+        del self._row_ids[row]
+        self.endRemoveRows()
+
+    def set_columns(self, columns: Columns, row_ids: Optional[Sequence[Any]] = None) -> None:
+        columns = [list(column) for column in columns]
+        old_row_count, new_row_count = len(self._row_ids), len(columns[0])
+        row_ids = list(range(new_row_count)) if row_ids is None else list(row_ids)
+        changed_rows = [row for row in range(min(old_row_count, new_row_count))
+                        if self._row_ids[row] != row_ids[row]
+                        or any(old[row] != new[row] for old, new in zip(self._columns, columns))]
+        if new_row_count > old_row_count:
+            self.beginInsertRows(QModelIndex(), old_row_count, new_row_count - 1)
+        elif new_row_count < old_row_count:
+            self.beginRemoveRows(QModelIndex(), new_row_count, old_row_count - 1)
+        self._columns, self._row_ids = columns, row_ids
+        if new_row_count > old_row_count:
+            self.endInsertRows()
+        elif new_row_count < old_row_count:
+            self.endRemoveRows()
+        for first_row, last_row in _ranges(changed_rows):
+            self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, len(self._headers) - 1))
+
+
+def update_sorted_rows(model: ColumnarTableModel, rows: Dict[Any, Optional[Sequence[Any]]],
+                       key: Callable[[Sequence[Any]], Any]) -> None:
+    # moves rows of the given ids to their places in a model sorted by key of row values,
+    # rows with None values are removed, so only the rows which changed are touched
+    for row_id in rows:
+        row = model.row_of(row_id)
+        if row is not None:
+            model.remove_row(row)
+    for row_id, values in rows.items():
+        if values is None:
+            continue
+        first, last = 0, model.rowCount()
+        while first < last:
+            middle = (first + last) // 2
+            if key(model.get_row(middle)) < key(values):
+                first = middle + 1
+            else:
+                last = middle
+        model.insert_row(first, values, row_id)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    # draws cells of a column as buttons, so tables don't need a button widget for every row
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index: QModelIndex) -> None:
+        button = QStyleOptionButton()
+        button.rect = option.rect
+        button.text = index.data()
+        button.state = QStyle.State_Enabled | QStyle.State_Raised
+        QApplication.style().drawControl(QStyle.CE_PushButton, button, painter)
+
+    def editorEvent(self, event: QEvent, model, option, index: QModelIndex) -> bool:
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
+def create_table_view(model: ColumnarTableModel, button_column: Optional[int] = None,
+                      on_button_clicked: Optional[Callable[[int], None]] = None) -> QTableView:
+    table_view = QTableView()
+    table_view.setModel(model)
+    table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    if button_column is not None:
+        button_delegate = ButtonDelegate(table_view)
+        button_delegate.clicked.connect(on_button_clicked)
+        table_view.setItemDelegateForColumn(button_column, button_delegate)
+    return table_view
+
+
+def _ranges(rows: List[int]) -> List[Tuple[int, int]]:
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
@@ -0,0 +1,161 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from match import DoubleLeagueMatch, goal_balance_factor
+from match_store import DoubleLeagueMatchView, MatchStore
+
+
+RECENT_MATCHES_PER_OPPONENT_TEAM = 10
+
+Team = Tuple[str, str]
+# a team as indexes of its players in the MatchStore, the lower one first
+_TeamIndexes = Tuple[int, int]
+
+
+def team(player1: str, player2: str) -> Team:
+    return (player1, player2) if player1 < player2 else (player2, player1)
+
+
+def calculate_team_won_score(goal_balance: int) -> float:
+    return goal_balance / 10.0 + 1 + goal_balance_factor(goal_balance) * 0.5 - 0.5
+
+
+def calculate_team_lost_score(goal_balance: int) -> float:
+    return - goal_balance / 10.0 - goal_balance_factor(goal_balance) * 0.5 + 0.5
+
+
+# scores of all possible goal balances, so they aren't calculated again for every match
+_WON_SCORES = [calculate_team_won_score(goal_balance) for goal_balance in range(11)]
+_LOST_SCORES = [calculate_team_lost_score(goal_balance) for goal_balance in range(11)]
+
+
+class TeamStandings:
+    # only rows of matches in the MatchStore are kept per player, points of a team are computed from the rows
+    # of one of its players and cached. Players are indexes of the store, which stay the same when players
+    # are renamed
+    def __init__(self, matches: MatchStore):
+        self._matches = matches
+        self._player_rows: Dict[int, array] = {}
+        self._team_to_dl_points: Dict[_TeamIndexes, float] = {}
+        # once points of all teams are cached, teams changed since are recalculated when all are asked for
+        self._are_all_teams_cached = False
+        self._changed_teams: Set[_TeamIndexes] = set()
+        for row in matches.get_rows():
+            self._add_row(row)
+
+    def add_match(self, match: DoubleLeagueMatchView) -> None:
+        self._add_row(match.row)
+        self._invalidate_row(match.row)
+
+    def remove_match(self, match_id: int) -> Optional[DoubleLeagueMatch]:
+        # has to be called before the match is deleted from the store
+        row = self._matches.find_row(match_id)
+        if row is None:
+            return None
+        for player in self._get_row_players(row):
+            player_rows = self._player_rows[player]
+            del player_rows[bisect_left(player_rows, row)]
+            if not player_rows:
+                del self._player_rows[player]
+        self._invalidate_row(row)
+        return DoubleLeagueMatch(match_id, *self._matches.get_players(row), self._matches.goal_balances[row])
+
+    def get_team_points(self, player1: str, player2: str) -> float:
+        points = self._get_team_points(player1, player2)
+        return 0 if points is None else points
+
+    def get_teams_points(self, keys: Optional[Iterable[Team]] = None) -> Dict[Team, float]:
+        # teams without matches are left out
+        if keys is not None:
+            teams_points = {team(*key): self._get_team_points(*key) for key in keys}
+            return {key: points for key, points in teams_points.items() if points is not None}
+        if not self._are_all_teams_cached:
+            self._team_to_dl_points = self._calculate_all_teams_points()
+            self._are_all_teams_cached = True
+            self._changed_teams.clear()
+        for key in self._changed_teams:
+            points = self._calculate_team_points(key)
+            if points is not None:
+                self._team_to_dl_points[key] = points
+        self._changed_teams.clear()
+        names = self._matches.player_names
+        return {team(names[player1], names[player2]): points
+                for (player1, player2), points in self._team_to_dl_points.items()}
+
+    def _get_team_points(self, player1: str, player2: str) -> Optional[float]:
+        # None for a team without matches
+        player1_index, player2_index = self._matches.get_player_index(player1), self._matches.get_player_index(player2)
+        if player1_index is None or player2_index is None:
+            return None
+        key = (player1_index, player2_index) if player1_index < player2_index else (player2_index, player1_index)
+        if key not in self._team_to_dl_points:
+            if self._are_all_teams_cached and key not in self._changed_teams:
+                return None
+            points = self._calculate_team_points(key)
+            if points is None:
+                return None
+            self._team_to_dl_points[key] = points
+        return self._team_to_dl_points[key]
+
+    def _get_row_players(self, row: int) -> Tuple[int, int, int, int]:
+        return tuple(self._matches.player_indexes[4 * row:4 * row + 4])
+
+    def _add_row(self, row: int) -> None:
+        for player in self._get_row_players(row):
+            if player not in self._player_rows:
+                self._player_rows[player] = array('i')
+            player_rows = self._player_rows[player]
+            if player_rows and row < player_rows[-1]:
+                insort(player_rows, row)
+            else:
+                player_rows.append(row)
+
+    def _invalidate_row(self, row: int) -> None:
+        winning_player1, winning_player2, loser_player1, loser_player2 = self._get_row_players(row)
+        for player1, player2 in ((winning_player1, winning_player2), (loser_player1, loser_player2)):
+            key = (player1, player2) if player1 < player2 else (player2, player1)
+            self._team_to_dl_points.pop(key, None)
+            if self._are_all_teams_cached:
+                self._changed_teams.add(key)
+
+    def _calculate_team_points(self, key: _TeamIndexes) -> Optional[float]:
+        # None for a team without matches, rows of the player with fewer matches are read
+        player, partner = key
+        if len(self._player_rows.get(partner, ())) < len(self._player_rows.get(player, ())):
+            player, partner = partner, player
+        return self._calculate_player_teams_points(player, partner).get(partner)
+
+    def _calculate_all_teams_points(self) -> Dict[_TeamIndexes, float]:
+        # every team is calculated from the rows of its player with the lower index
+        return {(player, partner): points for player in self._player_rows
+                for partner, points in self._calculate_player_teams_points(player).items()}
+
+    def _calculate_player_teams_points(self, player: int, partner: Optional[int] = None) -> Dict[int, float]:
+        # points of teams of the player with every partner of a higher index, or only with the given one.
+        # Opponent teams are told apart by the order of their players in matches
+        player_indexes, goal_balances = self._matches.player_indexes, self._matches.goal_balances
+        partner_scores: Dict[int, Dict[Tuple[int, int], List[float]]] = {}
+        for row in reversed(self._player_rows.get(player, ())):
+            start = 4 * row
+            if player_indexes[start] == player or player_indexes[start + 1] == player:
+                row_partner = player_indexes[start + 1] if player_indexes[start] == player else player_indexes[start]
+                opponent_team = (player_indexes[start + 2], player_indexes[start + 3])
+                scores = _WON_SCORES
+            else:
+                row_partner = (player_indexes[start + 3] if player_indexes[start + 2] == player
+                               else player_indexes[start + 2])
+                opponent_team = (player_indexes[start], player_indexes[start + 1])
+                scores = _LOST_SCORES
+            if partner is None and row_partner < player or partner is not None and row_partner != partner:
+                continue
+            opponent_scores = partner_scores.setdefault(row_partner, {}).setdefault(opponent_team, [])
+            if len(opponent_scores) < RECENT_MATCHES_PER_OPPONENT_TEAM:
+                opponent_scores.append(scores[goal_balances[row]])
+        return {row_partner: _average_scores(opponent_scores)
+                for row_partner, opponent_scores in partner_scores.items()}
+
+
+def _average_scores(opponent_scores: Dict[Tuple[int, int], List[float]]) -> float:
+    averages = [sum(scores) / len(scores) for scores in opponent_scores.values()]
+    return round(sum(averages) / len(averages) * 100, 2)
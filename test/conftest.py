@@ -0,0 +1,26 @@
+from typing import Callable, Iterable, List
+
+import pytest
+
+from league_database import LeagueDatabase
+from player import PlayerStartingData
+from scripts.initialize_db import _initialize_db
+
+
+@pytest.fixture
+def create_league_db(tmp_path) -> Callable[..., LeagueDatabase]:
+    # creates a league database with the given players in tmp_path, it is closed after the test
+    databases: List[LeagueDatabase] = []
+
+    def create(players: Iterable[PlayerStartingData], file_name: str = 'test.db') -> LeagueDatabase:
+        db_name = str(tmp_path / file_name)
+        _initialize_db(db_name)
+        league_db = LeagueDatabase(db_name)
+        databases.append(league_db)
+        for player in players:
+            league_db.insert_player(player)
+        return league_db
+
+    yield create
+    for league_db in databases:
+        league_db.close_connection()
@@ -0,0 +1,31 @@
+import os
+
+from league_database import LeagueDatabase
+from scripts.benchmark import _find_regressions, _run_benchmarks
+from scripts.generate_league import _generate_league
+
+
+def test_run_benchmarks_times_database_methods_and_restores_database(tmp_path):
+    db_name = str(tmp_path / 'test.db')
+    _generate_league(db_name, 6, 30, 20)
+    league_db = LeagueDatabase(db_name)
+    dl_points = {name: league_db.get_player_dl_points(name) for name in league_db.get_player_names()}
+    league_db.close_connection()
+    results = _run_benchmarks(db_name, repeat=2, with_views=False)
+    assert {'get_player_sl_points', 'update_player_name', '_calculate_dl_points', 'predict_dl_matchups',
+            'import_single_league_matches', 'import_double_league_matches', 'close_season',
+            'get_archived_double_league_matches'} <= set(results)
+    assert all(seconds >= 0 for seconds in results.values())
+    league_db = LeagueDatabase(db_name)
+    assert len(league_db.get_double_league_matches()) == 20
+    assert league_db.get_seasons() == []
+    assert {name: league_db.get_player_dl_points(name) for name in dl_points} == dl_points
+    league_db.close_connection()
+    # copies of the database are removed, only the files of imported matches are left
+    assert sorted(os.listdir(tmp_path)) == ['test.db', 'test_dl_matches.txt', 'test_sl_matches.txt']
+
+
+def test_find_regressions():
+    baseline = {'small': {'fast': 0.001, 'slow': 1.0, 'noisy': 0.00001}}
+    results = {'small': {'fast': 0.0011, 'slow': 1.5, 'noisy': 0.00005, 'new': 1.0}, 'large': {'slow': 2.0}}
+    assert _find_regressions(results, baseline, 0.25) == [('small', 'slow', 1.0, 1.5)]
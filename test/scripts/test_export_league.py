@@ -0,0 +1,37 @@
+import csv
+import json
+import sqlite3
+
+import statistics_queries
+from scripts.export_league import _export_league
+from scripts.generate_league import _generate_league
+
+
+def test_export_league_continues_from_last_id(tmp_path):
+    db_name = str(tmp_path / 'test.db')
+    _generate_league(db_name, 10, 30, 20)
+    last_id = _export_league(db_name, 'sl_matches', str(tmp_path / 'first.csv'), chunk_size=7)
+    assert last_id == 30
+    assert _export_league(db_name, 'sl_matches', str(tmp_path / 'second.csv'), after_id=last_id) is None
+    with open(tmp_path / 'first.csv', newline='') as file:
+        assert len(list(csv.reader(file))) == 31
+
+
+def _read_jsonl(file_name):
+    with open(file_name) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_export_league_loads_league_only_for_stale_dl_points(tmp_path, monkeypatch):
+    db_name = str(tmp_path / 'test.db')
+    _generate_league(db_name, 10, 30, 20)
+    league_database_class = statistics_queries.LeagueDatabase
+    monkeypatch.setattr(statistics_queries, 'LeagueDatabase', None)
+    _export_league(db_name, 'dl_standings', str(tmp_path / 'current.jsonl'))
+    with sqlite3.connect(db_name) as conn:
+        conn.execute("UPDATE current_dl_points SET dl_points = 0")
+        conn.execute("UPDATE current_dl_points_state SET last_dl_id = 0")
+    conn.close()
+    monkeypatch.setattr(statistics_queries, 'LeagueDatabase', league_database_class)
+    _export_league(db_name, 'dl_standings', str(tmp_path / 'stale.jsonl'))
+    assert _read_jsonl(tmp_path / 'stale.jsonl') == _read_jsonl(tmp_path / 'current.jsonl')
@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from league_database import LeagueDatabase
+from scripts.generate_league import _generate_league
+
+
+def _dump(db_name):
+    conn = sqlite3.connect(db_name)
+    dump = [conn.execute(f"SELECT * FROM {table}").fetchall()
+            for table in ('players', 'single_league_matches', 'double_league_matches', 'current_dl_points')]
+    conn.close()
+    return dump
+
+
+def test_generate_league_is_deterministic(tmp_path):
+    _generate_league(str(tmp_path / 'first.db'), 10, 30, 20, seed=1)
+    _generate_league(str(tmp_path / 'second.db'), 10, 30, 20, seed=1)
+    _generate_league(str(tmp_path / 'other.db'), 10, 30, 20, seed=2)
+    assert _dump(str(tmp_path / 'first.db')) == _dump(str(tmp_path / 'second.db'))
+    assert _dump(str(tmp_path / 'first.db')) != _dump(str(tmp_path / 'other.db'))
+
+
+def test_generate_league_creates_league_of_given_size(tmp_path):
+    db_name = str(tmp_path / 'test.db')
+    _generate_league(db_name, 10, 30, 20)
+    league_db = LeagueDatabase(db_name)
+    assert len(league_db.get_player_names()) == 10
+    assert len(league_db.get_single_league_matches()) == 30
+    assert len(league_db.get_double_league_matches()) == 20
+    assert league_db._last_dl_id == 20
+    league_db.close_connection()
+
+
+def test_generate_league_needs_players_for_dl_matches(tmp_path):
+    with pytest.raises(ValueError):
+        _generate_league(str(tmp_path / 'test.db'), 3, 30, 20)
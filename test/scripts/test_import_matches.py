@@ -0,0 +1,107 @@
+import os
+import sqlite3
+
+import pytest
+
+from league_database import LeagueDatabase
+from player import PlayerStartingData
+from scripts.import_matches import _import_matches, _read_matches
+
+
+DL_MATCHES = """Anna Bartek Celina Dawid 3
+Anna Celina Bartek Dawid 10
+Anna Anna Bartek Dawid 2
+Anna Bartek Celina Zenon 2
+
+Dawid Bartek Celina Anna 0
+"""
+
+SL_MATCHES = """Anna Bartek 3
+Anna Bartek 11
+Celina Anna 0
+"""
+
+
+@pytest.fixture
+def db_name(tmp_path, create_league_db):
+    create_league_db([PlayerStartingData(name, 500, 0) for name in ('Anna', 'Bartek', 'Celina', 'Dawid')]).close_connection()
+    return str(tmp_path / 'test.db')
+
+
+@pytest.fixture
+def dl_file_name(tmp_path):
+    file_name = tmp_path / 'dl_matches.txt'
+    file_name.write_text(DL_MATCHES)
+    return str(file_name)
+
+
+@pytest.fixture
+def sl_file_name(tmp_path):
+    file_name = tmp_path / 'sl_matches.txt'
+    file_name.write_text(SL_MATCHES)
+    return str(file_name)
+
+
+def test_import_matches_skips_incorrect_lines(db_name, dl_file_name, sl_file_name):
+    assert _import_matches(dl_file_name, db_name, 'dl') == 3
+    assert _import_matches(sl_file_name, db_name, 'sl') == 2
+    league_db = LeagueDatabase(db_name)
+    assert [match.goal_balance for match in league_db.get_double_league_matches()] == [0, 10, 3]
+    assert [match.goal_balance for match in league_db.get_single_league_matches()] == [0, 3]
+    league_db.close_connection()
+
+
+def test_import_matches_updates_points(db_name, dl_file_name, sl_file_name):
+    league_db = LeagueDatabase(db_name)
+    roster = set(league_db.get_player_names())
+    league_db.import_double_league_matches(dl_file_name, _read_matches(dl_file_name, 'dl', roster))
+    league_db.import_single_league_matches(sl_file_name, _read_matches(sl_file_name, 'sl', roster))
+    replayed_db = LeagueDatabase(db_name)
+    replayed_db._calculate_dl_points(from_dl_id=0)
+    for name in league_db.get_player_names():
+        assert league_db.get_player_dl_points(name) == replayed_db.get_player_dl_points(name)
+        assert league_db.get_player_sl_points(name) == replayed_db.get_player_sl_points(name)
+    assert league_db.get_player_sl_points('Anna') == 90
+    assert league_db.get_team_dl_points('Anna', 'Bartek') == 130
+    league_db.close_connection()
+    replayed_db.close_connection()
+
+
+def test_import_matches_skips_imported_lines(db_name, dl_file_name):
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 3
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 0
+    with open(dl_file_name, 'a') as file:
+        file.write("Celina Dawid Anna Bartek 1\n")
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 1
+
+
+def test_import_matches_skips_imported_lines_of_modified_file(db_name, dl_file_name):
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 3
+    # lines are reordered and two are added before them, one of them is an imported match played again
+    with open(dl_file_name, 'w') as file:
+        file.write("Celina Dawid Anna Bartek 1\nAnna  Bartek Celina Dawid 3\n")
+        file.writelines(reversed(DL_MATCHES.splitlines(keepends=True)))
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 2
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 0
+    league_db = LeagueDatabase(db_name)
+    assert len(league_db.get_double_league_matches()) == 5
+    league_db.close_connection()
+
+
+def test_import_matches_skips_lines_imported_by_number(db_name, dl_file_name):
+    # lines imported before they were identified by content
+    conn = sqlite3.connect(db_name)
+    with conn:
+        conn.executemany("INSERT INTO imported_match_lines VALUES ('dl', :source, :line_number)",
+                         [{"source": os.path.realpath(dl_file_name), "line_number": line_number} for line_number in (1, 2)])
+    conn.close()
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 1
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 0
+
+
+def test_import_matches_skips_lines_imported_through_another_path(db_name, dl_file_name, tmp_path, monkeypatch):
+    assert _import_matches(dl_file_name, db_name, 'dl', skip_imported=True) == 3
+    monkeypatch.chdir(tmp_path)
+    assert _import_matches(os.path.basename(dl_file_name), db_name, 'dl', skip_imported=True) == 0
+    os.symlink(dl_file_name, tmp_path / 'linked_dl_matches.txt')
+    assert _import_matches('linked_dl_matches.txt', db_name, 'dl', skip_imported=True) == 0
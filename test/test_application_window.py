@@ -0,0 +1,138 @@
+import os
+import threading
+
+import pytest
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication
+
+from application_window import ApplicationWindow
+from double_league_menu import DoubleLeagueMenu
+from league_database import LeagueDatabase
+from main_menu import MainMenu
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+from player_data_view import PlayerDataView
+from scripts.generate_league import _generate_league
+from single_league_menu import SingleLeagueMenu
+
+
+@pytest.fixture(scope='module')
+def app():
+    # widgets can be created without a display
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def database(create_league_db):
+    return create_league_db([PlayerStartingData(name, 500, 0) for name in ('Anna', 'Bartek')])
+
+
+def _wait_for(app, window):
+    while window._view_data_loader.is_loading():
+        QThreadPool.globalInstance().waitForDone(10)
+        app.processEvents()
+
+
+def _count_loads(view):
+    loads = []
+    load_data = view._load_data
+    view._load_data = lambda *args: loads.append(True) or load_data(*args)
+    return loads
+
+
+def test_application_window_is_shown_before_database_is_opened(app, database):
+    release = threading.Event()
+    window = ApplicationWindow(lambda: release.wait() and database)
+    assert window.isVisible()
+    assert window.get_database() is None and not window._views
+    release.set()
+    _wait_for(app, window)
+    assert window.get_database() is database
+    assert list(window._views) == [MainMenu]
+    assert window.currentWidget() is window._get_view(MainMenu)
+
+
+def test_application_window_keeps_view_data_between_navigations(app, database):
+    window = ApplicationWindow(lambda: database)
+    _wait_for(app, window)
+    window.switch_to_single_league_menu()
+    single_league_menu = window._get_view(SingleLeagueMenu)
+    loads = _count_loads(single_league_menu)
+    _wait_for(app, window)
+    window.switch_to_main_menu()
+    _wait_for(app, window)
+    window.switch_to_single_league_menu()
+    _wait_for(app, window)
+    assert loads == []
+    database.close_season('first')
+    window.switch_to_main_menu()
+    window.switch_to_single_league_menu()
+    _wait_for(app, window)
+    assert loads == [True]
+
+
+def test_application_window_loads_player_data_of_another_player(app, database):
+    window = ApplicationWindow(lambda: database)
+    _wait_for(app, window)
+    window.switch_to_player_data_view('Anna')
+    loads = _count_loads(window._get_view(PlayerDataView))
+    _wait_for(app, window)
+    window.switch_to_player_data_view('Anna')
+    assert loads == []
+    window.switch_to_player_data_view('Bartek')
+    _wait_for(app, window)
+    assert loads == [True]
+    assert window._get_view(PlayerDataView)._name_text_box.text() == 'Bartek'
+
+
+def _count_touched_rows(model):
+    touched_rows = []
+    model.dataChanged.connect(lambda top_left, bottom_right: touched_rows.append(
+        bottom_right.row() - top_left.row() + 1))
+    model.rowsInserted.connect(lambda parent, first, last: touched_rows.append(last - first + 1))
+    model.rowsRemoved.connect(lambda parent, first, last: touched_rows.append(last - first + 1))
+    return touched_rows
+
+
+def _get_columns(model):
+    return ([[model.get_row(row)[column] for row in range(model.rowCount())] for column in range(model.columnCount())],
+            [model.row_id(row) for row in range(model.rowCount())])
+
+
+def test_application_window_patches_only_changed_rows(app, tmp_path):
+    db_name = str(tmp_path / 'league.db')
+    _generate_league(db_name, 200, 300, 300)
+    database = LeagueDatabase(db_name)
+    window = ApplicationWindow(lambda: database)
+    _wait_for(app, window)
+    views = [window._get_view(view_class) for view_class in (MainMenu, SingleLeagueMenu, DoubleLeagueMenu)]
+    models = [views[0]._players_statistics, views[1]._players_statistics, views[1]._recent_matches,
+              views[2]._players_statistics, views[2]._teams_statistics, views[2]._recent_matches]
+    for view in views:
+        window._switch_to(view)
+        _wait_for(app, window)
+    touched_rows = [_count_touched_rows(model) for model in models]
+    players = database.get_player_names()
+    name_boxes = [views[1]._name1_box, *views[2]._name_boxes]
+    views[1]._name1_box.setCurrentIndex(views[1]._name1_box.findText(players[0]))
+    database.insert_double_league_match(DoubleLeagueMatch(None, *players[:4], 6))
+    # 4 players and 2 teams move, a row of the main menu changes for every player and a recent match is added
+    assert all(sum(rows) <= 8 for rows in touched_rows)
+    database.insert_single_league_match(SingleLeagueMatch(None, players[4], players[5], 2))
+    database.delete_dl_match(database.get_double_league_matches(2)[1].id)
+    database.update_player_name(players[0], 'Renamed')
+    database.insert_player(PlayerStartingData('Newcomer', 450, 0))
+    assert all(window._is_view_data_current(view) for view in views)
+    patched = [_get_columns(model) for model in models]
+    # names are kept in order, the new ones sort before the generated players
+    player_names = database.get_player_names()
+    assert player_names[:2] == ['Newcomer', 'Renamed']
+    assert [[name_box.itemText(index) for index in range(name_box.count())] for name_box in name_boxes] == [
+        [''] + player_names] * 5
+    assert views[1]._name1_box.currentText() == 'Renamed'
+    for view in views:
+        view.update()
+        _wait_for(app, window)
+    assert [_get_columns(model) for model in models] == patched
+    database.close_connection()
@@ -0,0 +1,56 @@
+from itertools import permutations
+
+import pytest
+
+from dl_predictions import predict_matchups
+from league_database import calculate_diff, calculate_moved_points
+from player import PlayerStartingData
+
+
+PLAYER_TO_DL_POINTS = {'Anna': 500, 'Bartek': 620, 'Celina': 450, 'Dawid': 700, 'Edek': 530, 'Franek': 810}
+
+
+def test_predict_matchups_scores_every_matchup():
+    predictions = predict_matchups(PLAYER_TO_DL_POINTS)
+    assert len(predictions) == 15 * 6
+    matchups = {predictions.get_teams(index): index for index in range(len(predictions))}
+    for player1, player2, player3, player4 in permutations(PLAYER_TO_DL_POINTS, 4):
+        if player1 > player2 or player3 > player4:
+            continue
+        index = matchups[((player1, player2), (player3, player4))]
+        points = [PLAYER_TO_DL_POINTS[player] for player in (player1, player2, player3, player4)]
+        team1_win_points = calculate_moved_points(calculate_diff(*points), 5)
+        team2_win_points = calculate_moved_points(calculate_diff(*points[2:], *points[:2]), 5)
+        assert predictions.team1_win_points[index] == pytest.approx(team1_win_points)
+        assert predictions.team2_win_points[index] == pytest.approx(team2_win_points)
+        assert predictions.team1_win_probability[index] == pytest.approx(
+            team2_win_points / (team1_win_points + team2_win_points))
+
+
+def test_predict_matchups_favours_stronger_team():
+    predictions = predict_matchups(PLAYER_TO_DL_POINTS)
+    index = list(map(predictions.get_teams, range(len(predictions)))).index((('Dawid', 'Franek'), ('Anna', 'Celina')))
+    assert predictions.team1_win_probability[index] > 0.5
+    assert predictions.team1_win_points[index] < predictions.team2_win_points[index]
+    most_balanced = predictions.get_most_balanced(1)[0]
+    assert abs(predictions.team1_win_probability[most_balanced] - 0.5) < 0.01
+
+
+def test_predict_matchups_streams_most_balanced_games():
+    all_predictions = predict_matchups(PLAYER_TO_DL_POINTS)
+    predictions = predict_matchups(PLAYER_TO_DL_POINTS, num=5)
+    assert len(predictions) == 5
+    # every game is scored once, with the weaker team as team1, all predictions have it in both orders
+    assert all(predictions.team1_win_probability <= 0.5)
+    assert list(0.5 - predictions.team1_win_probability) == pytest.approx(
+        sorted(abs(all_predictions.team1_win_probability - 0.5))[::2][:5])
+    assert len({frozenset(predictions.get_teams(index)) for index in range(5)}) == 5
+
+
+def test_league_database_predicts_dl_matchups(create_league_db):
+    league_db = create_league_db(
+        [PlayerStartingData(name, dl_points, 0) for name, dl_points in PLAYER_TO_DL_POINTS.items()])
+    predictions = league_db.predict_dl_matchups(['Anna', 'Bartek', 'Celina', 'Dawid'])
+    assert len(predictions) == 6
+    assert predictions.players == ['Anna', 'Bartek', 'Celina', 'Dawid']
+    league_db.close_connection()
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from dl_what_if import DLMatchLog, RatingConstants, _round_points
+from league_database import LeagueDatabase, Order
+from match import DoubleLeagueMatch
+from player import PlayerStartingData
+from scripts.generate_league import _generate_league
+
+
+@pytest.fixture
+def database(create_league_db):
+    league_db = create_league_db([PlayerStartingData(name, dl_points, 0) for name, dl_points in (
+        ('Anna', 500), ('Bartek', 600), ('Celina', 450), ('Dawid', 700), ('Edek', 550))])
+    players = league_db.get_player_names()
+    for index in range(30):
+        league_db.insert_double_league_match(DoubleLeagueMatch(
+            None, *[players[(index * 3 + shift) % len(players)] for shift in range(4)], index % 11))
+    return league_db
+
+
+def _get_dl_points(database):
+    return {name: database.get_player_dl_points(name) for name in database.get_player_names()}
+
+
+def test_simulate_dl_points_matches_replay_of_database(database):
+    dl_points = _get_dl_points(database)
+    scenarios = [{}, {'Anna': 800}, {'Anna': 500, 'Bartek': 300, 'Edek': 1000}]
+    simulated_dl_points = database.simulate_dl_points(scenarios)
+    assert simulated_dl_points[0] == dl_points
+    for scenario, scenario_dl_points in zip(scenarios[1:], simulated_dl_points[1:]):
+        for name, starting_dl_points in scenario.items():
+            database.update_player_starting_dl_points(name, starting_dl_points)
+        assert _get_dl_points(database) == scenario_dl_points
+    assert database.simulate_dl_points([]) == []
+
+
+def test_simulate_dl_points_matches_points_of_generated_league(tmp_path):
+    db_name = str(tmp_path / 'league.db')
+    _generate_league(db_name, 50, 0, 5000)
+    league_db = LeagueDatabase(db_name)
+    assert league_db.simulate_dl_points([{}]) == [_get_dl_points(league_db)]
+    league_db.close_connection()
+
+
+def test_round_points_rounds_ties_as_python():
+    rng = random.Random(0)
+    values = [index / 200 for index in range(60000, 200000)] + [rng.uniform(300, 1000) for _ in range(10000)]
+    assert _round_points(np.array(values)).tolist() == [round(value, 2) for value in values]
+
+
+def test_simulate_dl_points_does_not_change_database(database):
+    dl_points = _get_dl_points(database)
+    database.simulate_dl_points([{'Anna': 800}], [RatingConstants(exponent=7)])
+    assert _get_dl_points(database) == dl_points
+    assert database.get_player_starting_dl_points('Anna') == 500
+
+
+def test_dl_match_log_replays_scenarios_with_own_rating_constants():
+    match_log = DLMatchLog(['Anna', 'Bartek', 'Celina', 'Dawid'],
+                           [DoubleLeagueMatch(1, 'Anna', 'Bartek', 'Celina', 'Dawid', 5)])
+    final_points = match_log.replay([[500] * 4, [500] * 4],
+                                    [RatingConstants(), RatingConstants(goal_balance_offset=1.5)])
+    moved_points = pow(1.7, 7.25) * (5 / 10 + 0.5)
+    assert final_points[0].tolist() == pytest.approx([500 + moved_points / 2] * 2 + [500 - moved_points / 2] * 2)
+    assert final_points[1][0] - 500 == pytest.approx(moved_points)
+    with pytest.raises(ValueError):
+        match_log.replay([[500] * 3])
+
+
+def test_match_log_from_match_store_skips_deleted_matches(database):
+    database.delete_dl_match(5)
+    players = database.get_player_names()
+    match_log = DLMatchLog.from_match_store(players, database._dl_matches)
+    expected_match_log = DLMatchLog(players, database.get_double_league_matches(order=Order.asc))
+    assert match_log.player_indexes.tolist() == expected_match_log.player_indexes.tolist()
+    assert match_log.goal_balances.tolist() == expected_match_log.goal_balances.tolist()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from instrumentation import Instrumentation, LatencyHistogram
+from league_database import LeagueDatabase
+from match import SingleLeagueMatch
+from player import PlayerStartingData
+
+
+@pytest.fixture
+def database(create_league_db):
+    return create_league_db([PlayerStartingData(name, 500, 0) for name in ('Anna', 'Bartek')])
+
+
+class View:
+    def update(self):
+        return self._show_data(self._load_data())
+
+    def _load_data(self):
+        return 1
+
+    def _show_data(self, data):
+        return data + 1
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for seconds in [0.000001] * 98 + [0.001, 0.1]:
+        histogram.record(seconds)
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == 0.000002
+    assert 0.001 <= histogram.percentile(0.99) <= 0.002
+    assert histogram.percentile(1) == histogram.max == 0.1
+
+
+def test_instrumentation_times_database_methods_and_sql(database, tmp_path):
+    instrumentation = Instrumentation()
+    instrumentation.attach_database(database)
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 3))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Bartek', 'Anna', 5))
+    database.get_team_dl_points('Anna', 'Bartek')
+    instrumentation.dump(str(tmp_path / 'report.json'))
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert report['methods']['LeagueDatabase.insert_single_league_match']['count'] == 2
+    assert report['methods']['LeagueDatabase.get_team_dl_points']['count'] == 1
+    assert [statistics['count'] for statement, statistics in report['sql'].items()
+            if statement.startswith("INSERT INTO single_league_matches")] == [2]
+
+
+def test_instrumentation_detach_restores_methods(database):
+    instrumentation = Instrumentation()
+    view = View()
+    instrumentation.attach_database(database)
+    instrumentation.attach_views([view])
+    assert view.update() == 2
+    instrumentation.detach()
+    database.get_player_names()
+    view.update()
+    assert 'get_player_names' not in vars(database)
+    assert 'update' not in vars(view)
+    assert set(instrumentation.to_dict()['methods']) == {'View.update', 'View._load_data', 'View._show_data'}
+    assert instrumentation.to_dict()['methods']['View.update']['count'] == 1
@@ -0,0 +1,51 @@
+import random
+
+from leaderboard import Leaderboard
+
+
+def _get_ranks(player_to_points):
+    players = sorted(player_to_points, key=lambda player: (-player_to_points[player], player))
+    return {player: rank for rank, player in enumerate(players, start=1)}
+
+
+def test_leaderboard_ranks():
+    leaderboard = Leaderboard({'Anna': 500, 'Bartek': 600, 'Celina': 500})
+    assert leaderboard.top_k() == [('Bartek', 600), ('Anna', 500), ('Celina', 500)]
+    assert leaderboard.top_k(1) == [('Bartek', 600)]
+    leaderboard.update({'Celina': 700, 'Anna': 400})
+    assert [leaderboard.rank_of(player) for player in ('Anna', 'Bartek', 'Celina')] == [3, 2, 1]
+    assert [leaderboard.get_rank_movement(player) for player in ('Anna', 'Bartek', 'Celina')] == [-1, -1, 2]
+    leaderboard.add_player('Dawid', 650)
+    leaderboard.rename_player('Celina', 'Cecylia')
+    assert leaderboard.top_k() == [('Cecylia', 700), ('Dawid', 650), ('Bartek', 600), ('Anna', 400)]
+    assert leaderboard.get_rank_movement('Cecylia') == 3
+
+
+def test_leaderboard_keeps_previous_ranks_through_update_without_changes():
+    leaderboard = Leaderboard({'Anna': 500, 'Bartek': 600, 'Celina': 500})
+    leaderboard.update({'Celina': 700})
+    assert leaderboard.update({'Anna': 500, 'Celina': 700}) == []
+    leaderboard.rename_player('Anna', 'Ala')
+    assert leaderboard.update({'Ala': 500, 'Bartek': 600}) == []
+    assert [leaderboard.get_previous_rank(player) for player in ('Ala', 'Bartek', 'Celina')] == [2, 1, 3]
+    assert leaderboard.get_rank_movement('Celina') == 2
+
+
+def test_leaderboard_matches_sorting():
+    rng = random.Random(0)
+    player_to_points = {f'player{index}': rng.choice([100, 200, rng.uniform(0, 500)]) for index in range(40)}
+    leaderboard = Leaderboard(player_to_points)
+    previous_ranks = _get_ranks(player_to_points)
+    for step in range(100):
+        ranks_before_update = _get_ranks(player_to_points)
+        changed_players = rng.sample(sorted(player_to_points) + [f'new{step}'], rng.choice([1, 2, 4, 30]))
+        changed = {player: rng.choice([100, 200, rng.uniform(0, 500)]) for player in changed_players}
+        player_to_points.update(changed)
+        # an update which changes nothing keeps ranks before the previous one
+        if leaderboard.update(changed):
+            previous_ranks = ranks_before_update
+        ranks = _get_ranks(player_to_points)
+        assert leaderboard.top_k(10) == [(player, player_to_points[player]) for player in sorted(ranks, key=ranks.get)[:10]]
+        for player, rank in ranks.items():
+            assert leaderboard.rank_of(player) == rank
+            assert leaderboard.get_previous_rank(player) == previous_ranks.get(player)
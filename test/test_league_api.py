@@ -0,0 +1,132 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from league_api import LeagueApi
+from match import DoubleLeagueMatch
+from player import PlayerStartingData
+
+
+@pytest.fixture
+def api(create_league_db):
+    league_db = create_league_db(
+        [PlayerStartingData(name, 500 + 100 * index, 0) for index, name in enumerate(('Anna', 'Bartek', 'Celina', 'Dawid'))])
+    league_db.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', 5))
+    api = LeagueApi(league_db)
+    yield api
+    api.close()
+
+
+def _request(api, method, target, headers=None, body=None):
+    return asyncio.run(api.handle(method, target, headers or {}, b'' if body is None else json.dumps(body).encode()))
+
+
+def test_league_api_serves_standings_with_etags(api):
+    status, headers, body = _request(api, 'GET', '/standings/dl')
+    assert status == 200
+    assert [standing['player'] for standing in json.loads(body)] == ['Dawid', 'Celina', 'Bartek', 'Anna']
+    assert _request(api, 'GET', '/standings/dl', {'if-none-match': headers['ETag']})[0] == 304
+    status, _, body = _request(api, 'POST', '/matches/sl',
+                               body={'winning_player': 'Anna', 'loser_player': 'Dawid', 'goal_balance': 3})
+    assert (status, json.loads(body)) == (201, {'id': 1})
+    # SL matches don't change DL standings, so their ETag stays the same
+    assert _request(api, 'GET', '/standings/dl', {'if-none-match': headers['ETag']})[0] == 304
+    status, _, body = _request(api, 'GET', '/players/Anna?num=1')
+    player = json.loads(body)
+    assert (player['sl_rank'], player['recent_sl_matches'][0]['loser_player']) == (1, 'Dawid')
+    assert json.loads(_request(api, 'GET', '/standings/teams')[2])[0] == {
+        'rank': 1, 'players': ['Anna', 'Bartek'], 'points': 150.0}
+
+
+def test_league_api_returns_id_of_recorded_match(api):
+    def record_another_match(change):
+        # another writer records a match right after the one of the request
+        if change.added_dl_matches == (2,):
+            api._database.insert_double_league_match(DoubleLeagueMatch(None, 'Celina', 'Dawid', 'Anna', 'Bartek', 1))
+
+    api._database.subscribe(record_another_match)
+    status, _, body = _request(api, 'POST', '/matches/dl', body={
+        'winning_player1': 'Anna', 'winning_player2': 'Celina', 'loser_player1': 'Bartek', 'loser_player2': 'Dawid',
+        'goal_balance': 2})
+    assert (status, json.loads(body)) == (201, {'id': 2})
+    assert len(api._database.get_double_league_matches()) == 3
+
+
+def test_league_api_rejects_invalid_requests(api):
+    assert _request(api, 'GET', '/players/Zosia')[0] == 404
+    assert _request(api, 'GET', '/matches/dl?num=0')[0] == 400
+    assert _request(api, 'POST', '/matches/sl',
+                    body={'winning_player': 'Anna', 'loser_player': 'Anna', 'goal_balance': 3})[0] == 400
+    assert _request(api, 'POST', '/matches/sl',
+                    body={'winning_player': 'Anna', 'loser_player': 'Zosia', 'goal_balance': 3})[0] == 400
+    assert _request(api, 'POST', '/matches/sl',
+                    body={'winning_player': 'Anna', 'loser_player': 'Dawid', 'goal_balance': 11})[0] == 400
+    assert _request(api, 'DELETE', '/matches/sl')[0] == 405
+    assert json.loads(_request(api, 'GET', '/matches/sl')[2]) == []
+
+
+def test_league_api_answers_failing_requests_with_500(api, monkeypatch):
+    def get_top_sl_players():
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(api._database, 'get_top_sl_players', get_top_sl_players)
+    status, _, body = _request(api, 'GET', '/standings/sl')
+    assert status == 500 and 'error' in json.loads(body)
+    monkeypatch.undo()
+    assert _request(api, 'GET', '/standings/sl')[0] == 200
+
+
+def test_league_api_computes_response_once_for_concurrent_clients(api):
+    computations = []
+    get_top_dl_players = api._database.get_top_dl_players
+    api._database.get_top_dl_players = lambda: computations.append(True) or get_top_dl_players()
+
+    async def poll():
+        return await asyncio.gather(*(api.handle('GET', '/standings/dl', {}) for _ in range(20)))
+
+    responses = asyncio.run(poll())
+    assert len(computations) == 1
+    assert len({body for _, _, body in responses}) == 1
+    asyncio.run(poll())
+    assert len(computations) == 1
+
+
+def test_league_api_serves_http(api):
+    async def get_standings():
+        server = await api.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for _ in range(2):
+            writer.write(b"GET /standings/sl HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            head = (await reader.readuntil(b'\r\n\r\n')).decode()
+            content_length = int(head.split('Content-Length: ')[1].split('\r\n')[0])
+            responses.append((head.split('\r\n')[0], json.loads(await reader.readexactly(content_length))))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    responses = asyncio.run(get_standings())
+    assert responses[0] == responses[1]
+    assert responses[0][0] == 'HTTP/1.1 200 OK'
+    assert [standing['points'] for standing in responses[0][1]] == [0, 0, 0, 0]
+
+
+def test_league_api_answers_malformed_requests_with_400(api):
+    async def send(request):
+        server = await api.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    for request in (b"GARBAGE\r\n\r\n", b"GET /standings/sl HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+                    b"GET /standings/sl HTTP/1.1\r\nno colon\r\n\r\n"):
+        assert asyncio.run(send(request)).startswith(b'HTTP/1.1 400 Bad Request\r\n')
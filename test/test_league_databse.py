@@ -1,7 +1,324 @@
+import sqlite3
+
 import pytest
 
+import league_database
 from league_database import LeagueDatabase
+from league_events import LeagueChange
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+from single_league_engine import HeadToHead
+from team_standings import team
+
+
+@pytest.fixture
+def database(create_league_db):
+    return create_league_db([PlayerStartingData(name, 500, 0) for name in ('Anna', 'Bartek', 'Celina', 'Dawid')])
+
+
+def test_league_database_sl_points_without_matches(database):
+    assert database.get_player_sl_points('Anna') == 0
+
+
+def test_league_database_sl_points_after_match(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 5))
+    assert database.get_player_sl_points('Anna') == 150
+    assert database.get_player_sl_points('Bartek') == -50
+    assert database.get_player_sl_points('Celina') == 0
+
+
+def test_league_database_sl_points_use_only_recent_matches_against_opponent(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Bartek', 'Anna', 10))
+    for _ in range(10):
+        database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 5))
+    assert database.get_player_sl_points('Anna') == 150
+    database.delete_sl_match(database.get_single_league_matches(1)[0].id)
+    assert database.get_player_sl_points('Anna') == 125
+
+
+def test_league_database_sl_points_are_averaged_over_opponents(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 5))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Celina', 'Anna', 5))
+    assert database.get_player_sl_points('Anna') == 50
+
+
+def test_league_database_sl_points_follow_try_hard_factor_and_rename(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 5))
+    database.update_player_try_hard_factor('Anna', 1)
+    assert database.get_player_sl_points('Anna') == 50
+    assert database.get_player_sl_points('Bartek') == 50
+    database.update_player_name('Bartek', 'Bogdan')
+    assert database.get_player_sl_points('Bogdan') == 50
+    assert database.get_player_sl_points('Anna') == 50
+
+
+def test_league_database_sl_points_match_rebuilt_database(database, tmp_path):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 3))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Celina', 'Bartek', 0))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Bartek', 'Anna', 7))
+    database.delete_sl_match(database.get_single_league_matches()[-1].id)
+    rebuilt_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    for name in database.get_player_names():
+        assert database.get_player_sl_points(name) == rebuilt_db.get_player_sl_points(name)
+    rebuilt_db.close_connection()
+
+
+def test_league_database_team_points(database):
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', 5))
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Celina', 'Dawid', 'Anna', 'Bartek', 0))
+    assert database.get_team_dl_points('Bartek', 'Anna') == 100
+    assert database.get_team_dl_points('Celina', 'Dawid') == 0
+    assert database.get_team_dl_points('Anna', 'Celina') == 0
+    assert database.get_teams_dl_points() == {('Anna', 'Bartek'): 100, ('Celina', 'Dawid'): 0}
+
+
+def test_league_database_team_points_after_delete_and_rename(database):
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', 5))
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Celina', 'Bartek', 'Dawid', 2))
+    database.delete_dl_match(database.get_double_league_matches(1)[0].id)
+    database.update_player_name('Anna', 'Ala')
+    assert database.get_teams_dl_points() == {('Ala', 'Bartek'): 150, ('Celina', 'Dawid'): -50}
+
+
+def test_league_database_rename_keeps_cached_team_points(database, monkeypatch):
+    _insert_dl_matches(database, 6)
+    teams_points = database.get_teams_dl_points()
+    # teams are cached by the players' indexes in the match store, so no team is calculated again
+    monkeypatch.setattr(database._team_standings, '_calculate_player_teams_points', None)
+    database.update_player_name('Anna', 'Ala')
+    assert database.get_teams_dl_points() == {
+        team(*('Ala' if player == 'Anna' else player for player in key)): points
+        for key, points in teams_points.items()}
+    assert database.get_team_dl_points('Bartek', 'Ala') == teams_points[('Anna', 'Bartek')]
+
+
+def _insert_dl_matches(database, num):
+    players = database.get_player_names()
+    for index in range(num):
+        database.insert_double_league_match(DoubleLeagueMatch(
+            None, *[players[(index + shift) % len(players)] for shift in range(4)], index % 11))
+
+
+def _assert_dl_points_match_full_replay(database, tmp_path):
+    rating_history = {name: database.get_player_dl_rating_history(name) for name in database.get_player_names()}
+    replayed_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    replayed_db._calculate_dl_points(from_dl_id=0)
+    for name in database.get_player_names():
+        assert database.get_player_dl_points(name) == replayed_db.get_player_dl_points(name)
+        assert rating_history[name] == replayed_db.get_player_dl_rating_history(name)
+    replayed_db.close_connection()
+
+
+def test_league_database_dl_checkpoints_after_delete(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(league_database, 'DL_CHECKPOINT_INTERVAL', 5)
+    _insert_dl_matches(database, 23)
+    database.delete_dl_match(12)
+    database.delete_dl_match(22)
+    _assert_dl_points_match_full_replay(database, tmp_path)
+
+
+def test_league_database_dl_checkpoints_after_starting_points_update(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(league_database, 'DL_CHECKPOINT_INTERVAL', 5)
+    database.insert_player(PlayerStartingData('Edek', 300, 0))
+    _insert_dl_matches(database, 23)
+    database.update_player_starting_dl_points('Dawid', 800)
+    database.update_player_name('Anna', 'Ala')
+    database.delete_dl_match(20)
+    _assert_dl_points_match_full_replay(database, tmp_path)
+
+
+def test_league_database_dl_checkpoints_keep_only_changed_players(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(league_database, 'DL_CHECKPOINT_INTERVAL', 5)
+    _insert_dl_matches(database, 5)
+    database.insert_player(PlayerStartingData('Edek', 300, 0))
+    for goal_balance in range(5):
+        database.insert_double_league_match(DoubleLeagueMatch(None, 'Edek', 'Anna', 'Bartek', 'Celina', goal_balance))
+    assert database._cursor.execute(
+        "SELECT dl_id, COUNT(*) FROM dl_points_checkpoints GROUP BY dl_id").fetchall() == [(5, 4), (10, 4)]
+    # Dawid didn't play since the first checkpoint, his points are read from it
+    assert database._get_dl_checkpoint(10) == database._player_to_dl_points
+    database.delete_dl_match(7)
+    _assert_dl_points_match_full_replay(database, tmp_path)
+
+
+def test_league_database_loads_current_dl_points_and_replays_newer_matches(database, tmp_path):
+    _insert_dl_matches(database, 7)
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    with conn:
+        conn.execute("""INSERT INTO double_league_matches(winning_player1_id, winning_player2_id, loser_player1_id,
+                     loser_player2_id, goal_balance) VALUES (1, 3, 2, 4, 4)""")
+    conn.close()
+    reloaded_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert reloaded_db._last_dl_id == 8
+    _assert_dl_points_match_full_replay(reloaded_db, tmp_path)
+    reloaded_db.close_connection()
+
+
+def test_league_database_rebuilds_inconsistent_current_dl_points(database, tmp_path):
+    _insert_dl_matches(database, 7)
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    with conn:
+        conn.execute("DELETE FROM double_league_matches WHERE dl_id = 7")
+        conn.execute("UPDATE current_dl_points SET dl_points = 0")
+    conn.close()
+    reloaded_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert all(reloaded_db.get_player_dl_points(name) != 0 for name in reloaded_db.get_player_names())
+    _assert_dl_points_match_full_replay(reloaded_db, tmp_path)
+    reloaded_db.close_connection()
+
+
+@pytest.mark.parametrize('deleted_dl_id, num_saved_dl_matches, checkpoint_dl_ids', [(3, 12, [6, 11]),
+                                                                                     (10, 11, [5, 11])])
+def test_league_database_rebuilds_dl_points_saved_before_match_was_deleted(
+        database, tmp_path, monkeypatch, deleted_dl_id, num_saved_dl_matches, checkpoint_dl_ids):
+    monkeypatch.setattr(league_database, 'DL_CHECKPOINT_INTERVAL', 5)
+    _insert_dl_matches(database, 12)
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    with conn:
+        conn.execute("DELETE FROM double_league_matches WHERE dl_id = :dl_id", {"dl_id": deleted_dl_id})
+        # the checkpoint taken at the deleted match is left behind even if the number of matches is updated
+        conn.execute("UPDATE current_dl_points_state SET num_dl_matches = :num", {"num": num_saved_dl_matches})
+    conn.close()
+    reloaded_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert [record[0] for record in reloaded_db._cursor.execute(
+        "SELECT DISTINCT dl_id FROM dl_points_checkpoints ORDER BY dl_id")] == checkpoint_dl_ids
+    _assert_dl_points_match_full_replay(reloaded_db, tmp_path)
+    reloaded_db.close_connection()
+
+
+def test_league_database_rolls_back_change_if_dl_points_fail_to_be_saved(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(league_database, 'DL_CHECKPOINT_INTERVAL', 5)
+    _insert_dl_matches(database, 12)
+    dl_points = {name: database.get_player_dl_points(name) for name in database.get_player_names()}
+    replay_dl_matches_after = database._replay_dl_matches_after
+
+    def fail_once(dl_id):
+        # the process fails after the match is deleted or the points are updated, before the points are replayed
+        monkeypatch.setattr(database, '_replay_dl_matches_after', replay_dl_matches_after)
+        raise sqlite3.OperationalError('disk I/O error')
+
+    for change in (lambda: database.delete_dl_match(3), lambda: database.update_player_starting_dl_points('Dawid', 800)):
+        monkeypatch.setattr(database, '_replay_dl_matches_after', fail_once)
+        with pytest.raises(sqlite3.OperationalError):
+            change()
+        assert {name: database.get_player_dl_points(name) for name in database.get_player_names()} == dl_points
+    assert len(database.get_double_league_matches()) == 12
+    reloaded_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert {name: reloaded_db.get_player_dl_points(name) for name in reloaded_db.get_player_names()} == dl_points
+    _assert_dl_points_match_full_replay(reloaded_db, tmp_path)
+    reloaded_db.close_connection()
+
+
+def test_league_database_dl_rating_history(database):
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', 5))
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Celina', 'Bartek', 'Dawid', 2))
+    deltas = database.get_dl_match_rating_deltas(1)
+    assert deltas['Anna'] == deltas['Bartek'] == -deltas['Celina'] == -deltas['Dawid'] > 0
+    assert database.get_player_dl_points_after_match('Anna', 1) == 500 + deltas['Anna']
+    assert database.get_player_dl_points_after_match('Anna', 2) == database.get_player_dl_points('Anna')
+    assert [dl_id for dl_id, _ in database.get_player_dl_rating_history('Dawid')] == [1, 2]
+    assert database.get_player_lowest_and_peak_dl_points('Dawid') == (database.get_player_dl_points('Dawid'), 500)
+    database.delete_dl_match(1)
+    assert database.get_dl_match_rating_deltas(1) == {}
+    assert database.get_player_dl_points_after_match('Anna', 1) == 500
+    assert database.get_player_dl_rating_history('Anna') == [(2, database.get_player_dl_points('Anna'))]
+
+
+def test_league_database_fills_dl_rating_history_of_existing_matches(database, tmp_path):
+    _insert_dl_matches(database, 7)
+    rating_history = database.get_player_dl_rating_history('Anna')
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    with conn:
+        conn.execute("DELETE FROM dl_rating_history")
+    conn.close()
+    reloaded_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert reloaded_db.get_player_dl_rating_history('Anna') == rating_history
+    reloaded_db.close_connection()
+
+
+def test_league_database_sl_head_to_head(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 5))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 2))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Bartek', 'Anna', 4))
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Celina', 'Anna', 1))
+    assert database.get_sl_head_to_head('Anna', 'Bartek') == HeadToHead(2, 1, 3)
+    assert database.get_sl_head_to_head('Bartek', 'Anna') == HeadToHead(1, 2, -3)
+    assert database.get_sl_head_to_head('Bartek', 'Celina') == HeadToHead()
+    database.delete_sl_match(4)
+    database.update_player_name('Bartek', 'Bogdan')
+    assert database.get_player_sl_head_to_heads('Anna') == {'Bogdan': HeadToHead(2, 1, 3)}
+    assert database.get_player_sl_head_to_heads('Celina') == {}
+    assert database.get_player_sl_points('Celina') == 0
+    # the goal balance of a deleted match is taken out of the head to head
+    database.delete_sl_match(1)
+    assert database.get_sl_head_to_head('Anna', 'Bogdan') == HeadToHead(1, 1, -2)
+
+
+def test_league_database_leaderboards(database):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Dawid', 'Anna', 5))
+    assert database.get_top_sl_players(2) == [('Dawid', 150), ('Bartek', 0)]
+    assert database.get_player_sl_rank('Anna') == 4
+    assert database.get_player_sl_rank_movement('Dawid') == 3
+    assert database.get_player_sl_rank_movement('Anna') == -3
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Celina', 'Dawid', 'Anna', 'Bartek', 5))
+    assert [player for player, _ in database.get_top_dl_players()] == ['Celina', 'Dawid', 'Anna', 'Bartek']
+    assert database.get_player_dl_rank_movement('Celina') == 2
+    database.delete_dl_match(1)
+    assert database.get_top_dl_players() == [('Anna', 500), ('Bartek', 500), ('Celina', 500), ('Dawid', 500)]
+    assert database.get_player_dl_rank_movement('Anna') == 2
+    database.insert_player(PlayerStartingData('Edek', 600, 0))
+    database.update_player_name('Anna', 'Zosia')
+    assert database.get_player_dl_rank('Edek') == 1
+    assert database.get_player_dl_rank('Zosia') == 5
+    assert database.get_player_sl_rank('Zosia') == 5
+
+
+def test_league_database_rename_updates_only_players_table(database, tmp_path):
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 3))
+    _insert_dl_matches(database, 3)
+    changes_before = database._conn.total_changes
+    database.update_player_name('Anna', 'Ala')
+    assert database._conn.total_changes - changes_before == 1
+    assert database.get_player_single_league_matches('Ala')[0].winning_player == 'Ala'
+    assert all('Ala' in (match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2)
+               for match in database.get_player_double_league_matches('Ala'))
+    assert database.get_player_dl_rating_history('Ala')
+
+
+def test_league_database_lists_players_by_name(database):
+    database.insert_player(PlayerStartingData('Adam', 500, 0))
+    database.update_player_name('Bartek', 'Zbyszek')
+    assert database.get_player_names() == ['Adam', 'Anna', 'Celina', 'Dawid', 'Zbyszek']
+
+
+def test_league_database_data_version_changes_only_with_data(database):
+    data_version = database.get_data_version()
+    database.get_top_dl_players()
+    database.get_player_sl_points('Anna')
+    assert database.get_data_version() == data_version
+    database.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', 3))
+    database.update_player_try_hard_factor('Anna', 1)
+    assert database.get_data_version() == data_version + 2
+    with pytest.raises(sqlite3.IntegrityError):
+        database.insert_player(PlayerStartingData('Anna', 500, 0))
+    assert database.get_data_version() > data_version + 2
 
 
-def test_league_database():
-    pass
+def test_league_database_publishes_changes(database):
+    changes = []
+    database.subscribe(changes.append)
+    data_version = database.get_data_version()
+    database.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', 4))
+    dl_id = database.get_double_league_matches(1)[0].id
+    database.update_player_name('Anna', 'Ala')
+    database.delete_dl_match(dl_id)
+    database.unsubscribe(changes.append)
+    database.insert_player(PlayerStartingData('Edek', 500, 0))
+    assert changes == [
+        LeagueChange(data_version + 1, dl_players=frozenset(['Anna', 'Bartek', 'Celina', 'Dawid']),
+                     teams=frozenset([('Anna', 'Bartek'), ('Celina', 'Dawid')]), added_dl_matches=(dl_id,)),
+        LeagueChange(data_version + 2, renamed_players=(('Anna', 'Ala'),)),
+        LeagueChange(data_version + 3, dl_players=frozenset(['Ala', 'Bartek', 'Celina', 'Dawid']),
+                     teams=frozenset([('Ala', 'Bartek'), ('Celina', 'Dawid')]), deleted_dl_matches=(dl_id,)),
+    ]
+    assert database.get_teams_dl_points(changes[-1].teams) == {}
@@ -0,0 +1,65 @@
+import csv
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from league_export import EXPORT_TABLES, export_table, iter_chunks
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+
+
+@pytest.fixture
+def conn(tmp_path, create_league_db):
+    league_db = create_league_db([PlayerStartingData(name, dl_points, 0) for name, dl_points in (
+        ('Anna', 500), ('Bartek', 600), ('Celina', 450), ('Dawid', 700))])
+    for index in range(5):
+        league_db.insert_single_league_match(SingleLeagueMatch(None, 'Anna', 'Bartek', index))
+        league_db.insert_double_league_match(DoubleLeagueMatch(None, 'Anna', 'Bartek', 'Celina', 'Dawid', index))
+    league_db.close_connection()
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    yield conn
+    conn.close()
+
+
+def test_iter_chunks_reads_rows_after_id_in_chunks(conn):
+    chunks = list(iter_chunks(conn, EXPORT_TABLES['sl_matches'], after_id=1, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert chunks[0][0] == (2, 'Anna', 'Bartek', 1)
+
+
+def test_export_csv(conn, tmp_path):
+    assert export_table(conn, 'dl_matches', str(tmp_path / 'dl.csv'), chunk_size=2) == 5
+    with open(tmp_path / 'dl.csv', newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == list(EXPORT_TABLES['dl_matches'].columns)
+    assert rows[1:] == [[str(dl_id), 'Anna', 'Bartek', 'Celina', 'Dawid', str(dl_id - 1)] for dl_id in range(1, 6)]
+
+
+def test_export_jsonl_incrementally(conn, tmp_path):
+    assert export_table(conn, 'sl_matches', str(tmp_path / 'sl.jsonl'), after_id=3) == 5
+    with open(tmp_path / 'sl.jsonl') as file:
+        rows = [json.loads(line) for line in file]
+    assert rows == [{'sl_id': 4, 'winning_player': 'Anna', 'loser_player': 'Bartek', 'goal_balance': 3},
+                    {'sl_id': 5, 'winning_player': 'Anna', 'loser_player': 'Bartek', 'goal_balance': 4}]
+    assert export_table(conn, 'sl_matches', str(tmp_path / 'empty.jsonl'), after_id=5) is None
+
+
+def test_export_npz(conn, tmp_path):
+    export_table(conn, 'players', str(tmp_path / 'players.npz'), chunk_size=3)
+    with np.load(tmp_path / 'players.npz') as arrays:
+        assert arrays['player_id'].tolist() == [1, 2, 3, 4]
+        assert arrays['name'].tolist() == ['Anna', 'Bartek', 'Celina', 'Dawid']
+        assert arrays['starting_dl_points'].tolist() == [500, 600, 450, 700]
+
+
+def test_export_standings(conn, tmp_path):
+    assert export_table(conn, 'dl_standings', str(tmp_path / 'dl_standings.csv')) is None
+    with open(tmp_path / 'dl_standings.csv', newline='') as file:
+        rows = list(csv.reader(file))[1:]
+    assert [row[:2] for row in rows] == [['1', 'Bartek'], ['2', 'Dawid'], ['3', 'Anna'], ['4', 'Celina']]
+    with pytest.raises(ValueError):
+        export_table(conn, 'sl_standings', str(tmp_path / 'sl_standings.csv'), after_id=1)
+    with pytest.raises(ValueError):
+        export_table(conn, 'sl_standings', str(tmp_path / 'sl_standings.xml'))
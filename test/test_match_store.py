@@ -0,0 +1,69 @@
+import pytest
+
+from match_store import DoubleLeagueMatchView, MatchStore, SingleLeagueMatchView
+
+
+@pytest.fixture
+def match_store():
+    return MatchStore(SingleLeagueMatchView, [(1, 'Anna', 'Bartek', 3), (2, 'Bartek', 'Celina', 0),
+                                              (4, 'Celina', 'Anna', 10)])
+
+
+def _get_records(match_store):
+    return [(match.id, match.winning_player, match.loser_player, match.goal_balance) for match in match_store]
+
+
+def test_match_store_interns_players(match_store):
+    assert match_store.player_names == ['Anna', 'Bartek', 'Celina']
+    assert match_store.player_indexes.tolist() == [0, 1, 1, 2, 2, 0]
+    assert _get_records(match_store) == [(1, 'Anna', 'Bartek', 3), (2, 'Bartek', 'Celina', 0),
+                                         (4, 'Celina', 'Anna', 10)]
+
+
+def test_match_store_views(match_store):
+    assert [match.id for match in match_store.get_views(2, descending=True)] == [4, 2]
+    match = match_store.append(5, ('Anna', 'Dawid'), 1)
+    assert (match.id, match.players(), match.goal_balance) == (5, ('Anna', 'Dawid'), 1)
+    assert not hasattr(match, '__dict__')
+    with pytest.raises(ValueError):
+        match_store.append(3, ('Anna', 'Dawid'), 1)
+
+
+def test_match_store_delete_keeps_other_views(match_store):
+    match = list(match_store)[2]
+    assert match_store.delete(2).players() == ('Bartek', 'Celina')
+    assert match_store.delete(2) is None
+    assert len(match_store) == 2
+    assert (match.id, match.winning_player) == (4, 'Celina')
+    assert list(match_store.get_records_after(1)) == [(4, ('Celina', 'Anna'), 10)]
+
+
+def test_match_store_rows(match_store):
+    match_store.delete(2)
+    assert list(match_store.get_rows()) == [0, 2]
+    assert (match_store.find_row(4), match_store.find_row(2), match_store.find_row(3)) == (2, None, None)
+    assert match_store.append(5, ('Anna', 'Dawid'), 1).row == 3
+    assert (match_store.get_player_index('Dawid'), match_store.get_player_index('Edek')) == (3, None)
+
+
+def test_match_store_truncate(match_store):
+    match_store.delete(4)
+    match_store.truncate(1)
+    assert _get_records(match_store) == [(1, 'Anna', 'Bartek', 3)]
+    match_store.append(2, ('Celina', 'Bartek'), 5)
+    assert len(match_store) == 2
+
+
+def test_match_store_rename_player_changes_views(match_store):
+    matches = list(match_store)
+    match_store.rename_player('Anna', 'Ala')
+    assert [match.players() for match in matches] == [('Ala', 'Bartek'), ('Bartek', 'Celina'), ('Celina', 'Ala')]
+
+
+def test_double_league_match_view():
+    match_store = MatchStore(DoubleLeagueMatchView, [(7, 'Anna', 'Bartek', 'Celina', 'Dawid', 2)])
+    match = next(iter(match_store))
+    assert (match.winning_player1, match.winning_player2, match.loser_player1, match.loser_player2) == (
+        'Anna', 'Bartek', 'Celina', 'Dawid')
+    assert repr(match) == ("DoubleLeagueMatchView(id=7, winning_player1='Anna', winning_player2='Bartek', "
+                           "loser_player1='Celina', loser_player2='Dawid', goal_balance=2)")
@@ -0,0 +1,33 @@
+from itertools import combinations
+
+from matchmaker import Matchup, find_balanced_matchups, schedule_balanced_games
+
+
+PLAYER_TO_DL_POINTS = {'Anna': 500, 'Bartek': 620, 'Celina': 450, 'Dawid': 700, 'Edek': 530, 'Franek': 810,
+                       'Gosia': 390, 'Hania': 655, 'Igor': 575}
+
+
+def _get_all_diffs(player_to_dl_points):
+    teams = list(combinations(sorted(player_to_dl_points), 2))
+    return sorted(abs(sum(player_to_dl_points[player] for player in team2)
+                      - sum(player_to_dl_points[player] for player in team1))
+                  for team1, team2 in combinations(teams, 2) if not set(team1) & set(team2))
+
+
+def test_find_balanced_matchups_of_four_players():
+    assert find_balanced_matchups({'Anna': 500, 'Bartek': 620, 'Celina': 450, 'Dawid': 700}) == [
+        Matchup(('Anna', 'Bartek'), ('Celina', 'Dawid'), 30)]
+
+
+def test_find_balanced_matchups_returns_most_balanced_ones():
+    matchups = find_balanced_matchups(PLAYER_TO_DL_POINTS, 10)
+    assert [matchup.diff for matchup in matchups] == _get_all_diffs(PLAYER_TO_DL_POINTS)[:10]
+    assert all(len(set(matchup.players())) == 4 for matchup in matchups)
+
+
+def test_schedule_balanced_games():
+    games = schedule_balanced_games(PLAYER_TO_DL_POINTS)
+    assert len(games) == 2
+    assert len({player for game in games for player in game.players()}) == 8
+    assert games[0] == find_balanced_matchups(PLAYER_TO_DL_POINTS)[0]
+    assert schedule_balanced_games({'Anna': 500, 'Bartek': 620, 'Celina': 450}) == []
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from league_database import LeagueDatabase
+from migrations import MIGRATIONS, get_schema_version, migrate
+
+
+HOT_QUERIES = (
+    """SELECT * FROM single_league_matches
+    WHERE winning_player_id = :player_id OR loser_player_id = :player_id ORDER BY sl_id DESC""",
+    """SELECT * FROM double_league_matches
+    WHERE (winning_player1_id = :player_id OR winning_player2_id = :player_id
+           OR loser_player1_id = :player_id OR loser_player2_id = :player_id)
+    ORDER BY dl_id DESC""",
+    """SELECT MIN(dl_id) FROM double_league_matches
+    WHERE (winning_player1_id = :player_id OR winning_player2_id = :player_id
+           OR loser_player1_id = :player_id OR loser_player2_id = :player_id)""",
+    "SELECT player_id FROM players WHERE name = :player",
+    "UPDATE players SET name = :new_name WHERE name = :player",
+    """SELECT dl_points FROM dl_points_checkpoints WHERE player_id = :player_id AND dl_id <= :dl_id
+    ORDER BY dl_id DESC LIMIT 1""",
+    "SELECT MAX(dl_id) FROM dl_points_checkpoints WHERE dl_id < :dl_id",
+)
+
+
+@pytest.fixture
+def conn(create_league_db):
+    return create_league_db([])._conn
+
+
+@pytest.fixture
+def old_conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'old.db'))
+    conn.execute("CREATE TABLE players (name TEXT PRIMARY KEY, starting_dl_points REAL, try_hard_factor REAL)")
+    conn.execute(
+        """CREATE TABLE single_league_matches (sl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        winning_player TEXT, loser_player TEXT, goal_balance INTEGER)""")
+    conn.execute(
+        """CREATE TABLE double_league_matches (dl_id INTEGER PRIMARY KEY AUTOINCREMENT, winning_player1 TEXT,
+        winning_player2 TEXT, loser_player1 TEXT, loser_player2 TEXT, goal_balance INTEGER)""")
+    conn.execute("CREATE TABLE player_scores (player TEXT, score)")
+    with conn:
+        conn.execute("INSERT INTO players VALUES ('Anna', 500, 0)")
+        conn.execute("INSERT INTO single_league_matches VALUES (NULL, 'Anna', 'Bartek', 3)")
+        conn.execute("INSERT INTO single_league_matches VALUES (NULL, 'Bartek', 'Anna', 5)")
+        conn.execute("DELETE FROM single_league_matches WHERE sl_id = 2")
+    yield conn
+    conn.close()
+
+
+def _get_tables(conn):
+    return {record[0] for record in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_initialize_db_creates_database_with_latest_schema(conn):
+    assert get_schema_version(conn) == len(MIGRATIONS)
+
+
+def test_migrate_upgrades_existing_database_in_place(old_conn):
+    migrate(old_conn)
+    assert get_schema_version(old_conn) == len(MIGRATIONS)
+    assert 'player_scores' not in _get_tables(old_conn)
+    assert 'current_dl_points' in _get_tables(old_conn)
+    assert old_conn.execute("SELECT * FROM single_league_matches").fetchall() == [(1, 1, 2, 3)]
+    assert old_conn.execute("SELECT * FROM players").fetchall() == [(1, 'Anna', 500, 0), (2, 'Bartek', 0, 0)]
+
+
+def test_migrate_keeps_match_ids_of_deleted_matches_unused(old_conn):
+    migrate(old_conn)
+    with old_conn:
+        old_conn.execute("INSERT INTO single_league_matches VALUES (NULL, 2, 1, 4)")
+    assert old_conn.execute("SELECT MAX(sl_id) FROM single_league_matches").fetchone() == (3,)
+
+
+def test_league_database_opens_database_with_old_schema(old_conn, tmp_path):
+    league_db = LeagueDatabase(str(tmp_path / 'old.db'))
+    assert league_db.get_player_names() == ['Anna', 'Bartek']
+    assert get_schema_version(old_conn) == len(MIGRATIONS)
+    league_db.close_connection()
+
+
+def test_migrate_is_idempotent(conn):
+    migrate(conn)
+    assert get_schema_version(conn) == len(MIGRATIONS)
+
+
+@pytest.mark.parametrize('query', HOT_QUERIES)
+def test_hot_queries_use_indexes(conn, query):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {query}",
+                        {"player": 'Anna', "player_id": 1, "new_name": 'Ala', "dl_id": 1}).fetchall()
+    details = [record[-1] for record in plan]
+    assert not any(detail.startswith('SCAN') for detail in details), details
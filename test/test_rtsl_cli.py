@@ -0,0 +1,65 @@
+from dataclasses import asdict
+import json
+import random
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from league_database import LeagueDatabase
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+from rtsl_cli import main
+
+
+PLAYERS = ('Anna', 'Bartek', 'Celina', 'Dawid', 'Edek')
+
+
+@pytest.fixture
+def db_name(tmp_path, create_league_db):
+    league_db = create_league_db(
+        [PlayerStartingData(name, 300 + 100 * index, index % 2) for index, name in enumerate(PLAYERS)])
+    rng = random.Random(0)
+    for _ in range(30):
+        league_db.insert_single_league_match(SingleLeagueMatch(None, *rng.sample(PLAYERS, 2), rng.randint(0, 10)))
+        league_db.insert_double_league_match(DoubleLeagueMatch(None, *rng.sample(PLAYERS, 4), rng.randint(0, 10)))
+    league_db.close_connection()
+    return str(tmp_path / 'test.db')
+
+
+def _run(capsys, *args):
+    assert main(args) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_cli_does_not_import_qt_or_numpy(db_name):
+    code = ("import sys, rtsl_cli; rtsl_cli.main(['--db-name', sys.argv[1], 'team-standings']); "
+            "print(any(module.split('.')[0] in ('PyQt5', 'numpy') for module in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code, db_name], capture_output=True, text=True, check=True).stdout
+    assert output.splitlines()[-1] == 'False'
+
+
+def test_cli_prints_standings_of_league_database(db_name, capsys):
+    league_db = LeagueDatabase(db_name)
+    dl_standings = _run(capsys, '--db-name', db_name, '--json', 'dl-standings', '--top', '3')
+    assert [(row['player'], row['points']) for row in dl_standings] == league_db.get_top_dl_players(3)
+    sl_standings = _run(capsys, '--db-name', db_name, '--json', 'sl-standings')
+    assert [row['rank'] for row in sl_standings] == [1, 2, 3, 4, 5]
+    assert {row['player']: row['points'] for row in sl_standings} == {
+        name: league_db.get_player_sl_points(name) for name in PLAYERS}
+    player = _run(capsys, '--db-name', db_name, '--json', 'player', 'Celina', '--num', '4')
+    assert player['dl_points'] == league_db.get_player_dl_points('Celina')
+    assert player['sl_matches'] == [asdict(match) for match in league_db.get_player_single_league_matches('Celina', 4)]
+    assert player['dl_matches'] == [asdict(match) for match in league_db.get_player_double_league_matches('Celina', 4)]
+    league_db.close_connection()
+    assert main(['--db-name', db_name, 'player', 'Nobody']) == 1
+
+
+def test_cli_updates_stale_dl_points(db_name, capsys):
+    expected = _run(capsys, '--db-name', db_name, '--json', 'dl-standings')
+    with sqlite3.connect(db_name) as conn:
+        conn.execute("UPDATE current_dl_points SET dl_points = 0")
+        conn.execute("UPDATE current_dl_points_state SET last_dl_id = 0")
+    conn.close()
+    assert _run(capsys, '--db-name', db_name, '--json', 'dl-standings') == expected
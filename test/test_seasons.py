@@ -0,0 +1,91 @@
+import pytest
+
+from league_database import LeagueDatabase
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+
+
+PLAYERS = (('Anna', 500), ('Bartek', 600), ('Celina', 450), ('Dawid', 700), ('Edek', 550))
+
+
+def _create_database(create_league_db, file_name='test.db'):
+    return create_league_db([PlayerStartingData(name, dl_points, 0) for name, dl_points in PLAYERS], file_name)
+
+
+def _insert_matches(league_db, first, last):
+    players = [name for name, _ in PLAYERS]
+    for index in range(first, last):
+        league_db.insert_double_league_match(DoubleLeagueMatch(
+            None, *[players[(index * 3 + shift) % len(players)] for shift in range(4)], index % 11))
+        league_db.insert_single_league_match(SingleLeagueMatch(
+            None, players[index % len(players)], players[(index + 1) % len(players)], index % 11))
+
+
+def _get_dl_points(league_db):
+    return {name: league_db.get_player_dl_points(name) for name in league_db.get_player_names()}
+
+
+@pytest.fixture
+def database(create_league_db):
+    league_db = _create_database(create_league_db)
+    _insert_matches(league_db, 0, 20)
+    return league_db
+
+
+def test_close_season_freezes_standings_and_archives_matches(database, tmp_path):
+    dl_points = _get_dl_points(database)
+    sl_points = {name: database.get_player_sl_points(name) for name in database.get_player_names()}
+    dl_matches = database.get_double_league_matches()
+    season = database.close_season('Spring')
+    assert (season.name, season.last_sl_id, season.last_dl_id) == ('Spring', 20, 20)
+    assert database.get_seasons() == [season]
+    assert {standing.player: (standing.dl_points, standing.sl_points)
+            for standing in database.get_season_standings(season.season_id)} == {
+        name: (dl_points[name], sl_points[name]) for name in dl_points}
+    assert database.get_double_league_matches() == []
+    assert database.get_single_league_matches() == []
+    assert [match.id for match in database.get_archived_double_league_matches(season.season_id)] == [
+        match.id for match in reversed(dl_matches)]
+    assert len(database.get_archived_single_league_matches()) == 20
+    assert _get_dl_points(database) == dl_points
+    assert all(database.get_player_sl_points(name) == 0 for name in dl_points)
+    assert (tmp_path / 'test_archive.db').exists()
+
+
+def test_new_season_continues_from_final_dl_points(database, create_league_db):
+    database.close_season('Spring')
+    _insert_matches(database, 20, 30)
+    # Anna starts the season with her final points of the previous one
+    database.update_player_starting_dl_points('Anna', 900)
+    database.delete_dl_match(27)
+    reference_db = _create_database(create_league_db, 'reference.db')
+    _insert_matches(reference_db, 0, 30)
+    reference_db.delete_dl_match(27)
+    assert _get_dl_points(database) == _get_dl_points(reference_db)
+    assert database.simulate_dl_points([{}]) == [_get_dl_points(database)]
+    assert len(database.get_player_dl_rating_history('Anna')) < len(
+        database.get_player_dl_rating_history('Anna', all_seasons=True))
+
+
+def test_dl_points_after_match_of_closed_season(database):
+    dl_points_after_match = {name: database.get_player_dl_points_after_match(name, 5) for name, _ in PLAYERS}
+    final_dl_points = _get_dl_points(database)
+    database.close_season('Spring')
+    _insert_matches(database, 20, 25)
+    assert {name: database.get_player_dl_points_after_match(name, 5) for name, _ in PLAYERS} == dl_points_after_match
+    assert database.get_player_dl_points_after_match('Anna', 20) == final_dl_points['Anna']
+    # Edek didn't play the first match
+    assert database.get_player_dl_points_after_match('Edek', 1) == 550
+
+
+def test_database_reopens_after_closed_season(database, tmp_path):
+    database.close_season('Spring')
+    dl_points = _get_dl_points(database)
+    database.close_connection()
+    league_db = LeagueDatabase(str(tmp_path / 'test.db'))
+    assert _get_dl_points(league_db) == dl_points
+    league_db._calculate_dl_points(from_dl_id=0)
+    assert _get_dl_points(league_db) == dl_points
+    league_db.insert_player(PlayerStartingData('Franek', 400, 0))
+    assert league_db.get_player_dl_points('Franek') == 400
+    league_db.close_connection()
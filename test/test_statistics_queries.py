@@ -0,0 +1,74 @@
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from match import DoubleLeagueMatch, SingleLeagueMatch
+from player import PlayerStartingData
+from statistics_queries import get_dl_points, get_sl_points, get_teams_dl_points, is_dl_points_current
+
+
+PLAYERS = ('Anna', 'Bartek', 'Celina', 'Dawid', 'Edek')
+
+
+@pytest.fixture
+def database(create_league_db):
+    league_db = create_league_db(
+        [PlayerStartingData(name, 300 + 100 * index, index % 2) for index, name in enumerate(PLAYERS)])
+    rng = random.Random(0)
+    for _ in range(60):
+        league_db.insert_single_league_match(SingleLeagueMatch(None, *rng.sample(PLAYERS, 2), rng.randint(0, 10)))
+        league_db.insert_double_league_match(DoubleLeagueMatch(None, *rng.sample(PLAYERS, 4), rng.randint(0, 10)))
+    return league_db
+
+
+def test_statistics_queries_match_league_database(database):
+    pool = database.open_read_only_pool(1)
+    with pool.connection() as conn:
+        assert get_sl_points(conn) == {name: database.get_player_sl_points(name) for name in PLAYERS}
+        assert get_dl_points(conn) == {name: database.get_player_dl_points(name) for name in PLAYERS}
+        assert get_teams_dl_points(conn) == database.get_teams_dl_points()
+        assert conn.total_changes == 0
+    pool.close()
+
+
+def test_dl_points_are_not_current_after_match_deleted_by_other_means(database, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    assert is_dl_points_current(conn)
+    with conn:
+        conn.execute("DELETE FROM double_league_matches WHERE dl_id = 30")
+    assert not is_dl_points_current(conn)
+    conn.close()
+
+
+def test_read_only_pool_connections_cannot_write(database):
+    pool = database.open_read_only_pool(1)
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM players")
+    pool.close()
+
+
+def test_read_only_pool_reads_while_matches_are_recorded(database):
+    pool = database.open_read_only_pool(2)
+    errors = []
+
+    def read_standings():
+        try:
+            for _ in range(20):
+                with pool.connection() as conn:
+                    get_sl_points(conn)
+                    get_teams_dl_points(conn)
+        except sqlite3.Error as error:
+            errors.append(error)
+
+    readers = [threading.Thread(target=read_standings) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for _ in range(20):
+        database.insert_double_league_match(DoubleLeagueMatch(None, *PLAYERS[:4], 3))
+    for reader in readers:
+        reader.join()
+    assert errors == []
+    pool.close()
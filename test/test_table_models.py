@@ -0,0 +1,69 @@
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from table_models import ColumnarTableModel, to_columns, update_sorted_rows
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _changed_rows(model):
+    changed_rows = []
+    model.dataChanged.connect(lambda top_left, bottom_right: changed_rows.append((top_left.row(), bottom_right.row())))
+    return changed_rows
+
+
+def test_to_columns():
+    assert to_columns([('Anna', 1), ('Bartek', 2)], 2) == [['Anna', 'Bartek'], [1, 2]]
+    assert to_columns([], 2) == [[], []]
+
+
+def test_columnar_table_model_shows_columns(app):
+    model = ColumnarTableModel(('Name', 'Points'))
+    model.set_columns([['Anna', 'Bartek'], [1.5, 2]], row_ids=[10, 20])
+    assert (model.rowCount(), model.columnCount()) == (2, 2)
+    assert model.data(model.index(1, 1)) == '2'
+    assert model.headerData(0, 1) == 'Name'
+    assert model.row_id(1) == 20
+
+
+def test_columnar_table_model_signals_only_changed_rows(app):
+    model = ColumnarTableModel(('Name', 'Points'))
+    model.set_columns([['Anna', 'Bartek', 'Celina', 'Dawid'], [1, 2, 3, 4]])
+    changed_rows = _changed_rows(model)
+    inserted_rows = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted_rows.append((first, last)))
+    model.set_columns([['Anna', 'Bartek', 'Celina', 'Dawid', 'Ewa'], [1, 5, 6, 4, 7]])
+    assert changed_rows == [(1, 2)]
+    assert inserted_rows == [(4, 4)]
+
+
+def test_columnar_table_model_removes_rows(app):
+    model = ColumnarTableModel(('Name', 'Points'))
+    model.set_columns([['Anna', 'Bartek', 'Celina'], [1, 2, 3]])
+    changed_rows = _changed_rows(model)
+    removed_rows = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed_rows.append((first, last)))
+    model.set_columns([['Anna'], [1]])
+    assert changed_rows == []
+    assert removed_rows == [(1, 2)]
+    assert model.rowCount() == 1
+
+
+def test_update_sorted_rows_moves_only_changed_rows(app):
+    model = ColumnarTableModel(('Name', 'Points'))
+    model.set_columns([['Dawid', 'Anna', 'Bartek', 'Celina'], [4, 3, 3, 1]], ['Dawid', 'Anna', 'Bartek', 'Celina'])
+    changed_rows = _changed_rows(model)
+    inserted_rows = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted_rows.append((first, last)))
+    update_sorted_rows(model, {'Celina': ('Celina', 5), 'Bartek': None, 'Ewa': ('Ewa', 3)},
+                       lambda values: (-values[1], values[0]))
+    assert [model.get_row(row) for row in range(model.rowCount())] == [['Celina', 5], ['Dawid', 4], ['Anna', 3],
+                                                                        ['Ewa', 3]]
+    assert [model.row_id(row) for row in range(model.rowCount())] == ['Celina', 'Dawid', 'Anna', 'Ewa']
+    assert changed_rows == []
+    assert inserted_rows == [(0, 0), (3, 3)]
+    model.set_row(1, ['Dawid', 6])
+    assert changed_rows == [(1, 1)]
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+
+from view_data_loader import ViewDataLoader
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _wait_for(app, loader):
+    while loader.is_loading():
+        QThreadPool.globalInstance().waitForDone(10)
+        app.processEvents()
+
+
+def test_view_data_loader_delivers_data(app):
+    loader = ViewDataLoader()
+    loaded, finished = [], []
+    loader.load(lambda: threading.current_thread() is not threading.main_thread(), loaded.append,
+                lambda: finished.append(True))
+    _wait_for(app, loader)
+    assert loaded == [True]
+    assert finished == [True]
+
+
+def test_view_data_loader_drops_data_of_cancelled_load(app):
+    loader = ViewDataLoader()
+    release = threading.Event()
+    loaded = []
+    loader.load(lambda: release.wait() and 'old', loaded.append)
+    loader.load(lambda: 'new', loaded.append)
+    release.set()
+    _wait_for(app, loader)
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+    assert loaded == ['new']
+
+
+def test_view_data_loader_finishes_failed_load(app):
+    loader = ViewDataLoader()
+    finished = []
+    loader.load(lambda: 1 / 0, lambda data: None, lambda: finished.append(True))
+    _wait_for(app, loader)
+    assert finished == [True]
@@ -0,0 +1,85 @@
+import traceback
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _LoadSignals(QObject):
+    loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(int)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, generation: int, compute: Callable[[], Any], signals: _LoadSignals):
+        super().__init__()
+        self._generation = generation
+        self._compute = compute
+        self._signals = signals
+        self.cancelled = False
+
+    def run(self) -> None:
+        if self.cancelled:
+            return
+        try:
+            data = self._compute()
+        except Exception:
+            traceback.print_exc()
+            self._signals.failed.emit(self._generation)
+            return
+        if not self.cancelled:
+            self._signals.loaded.emit(self._generation, data)
+
+
+class ViewDataLoader(QObject):
+    # computes data of views in a thread pool and passes it back to the GUI thread,
+    # only the most recently requested data is delivered
+    def __init__(self, thread_pool: Optional[QThreadPool] = None):
+        super().__init__()
+        self._thread_pool = QThreadPool.globalInstance() if thread_pool is None else thread_pool
+        self._signals = _LoadSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._signals.failed.connect(self._on_failed)
+        self._generation = 0
+        self._task: Optional[_LoadTask] = None
+        self._on_loaded_action: Optional[Callable[[Any], None]] = None
+        self._on_finished_action: Optional[Callable[[], None]] = None
+
+    def load(self, compute: Callable[[], Any], on_loaded: Callable[[Any], None],
+             on_finished: Optional[Callable[[], None]] = None) -> None:
+        self.cancel()
+        self._generation += 1
+        self._on_loaded_action = on_loaded
+        self._on_finished_action = on_finished
+        self._task = _LoadTask(self._generation, compute, self._signals)
+        self._thread_pool.start(self._task)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancelled = True
+            self._task = None
+            self._finish()
+
+    def is_loading(self) -> bool:
+        return self._task is not None
+
+    def _on_loaded(self, generation: int, data: Any) -> None:
+        if generation != self._generation or self._task is None:
+            return
+        # on_loaded may start the next load, which mustn't be finished by this one
+        on_loaded, on_finished = self._on_loaded_action, self._on_finished_action
+        self._task = None
+        self._on_finished_action = None
+        on_loaded(data)
+        if on_finished is not None:
+            on_finished()
+
+    def _on_failed(self, generation: int) -> None:
+        if generation == self._generation and self._task is not None:
+            self._task = None
+            self._finish()
+
+    def _finish(self) -> None:
+        if self._on_finished_action is not None:
+            on_finished = self._on_finished_action
+            self._on_finished_action = None
+            on_finished()